@@ -0,0 +1,62 @@
+"""add book rating stats
+
+Revision ID: 4f8ab90ae363
+Revises: 8c0b1f4d9a21, 4634f0ac9905
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4f8ab90ae363"
+down_revision: Union[str, Sequence[str], None] = ("8c0b1f4d9a21", "4634f0ac9905")
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "book_rating_stats",
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("rating_sum", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rating_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rating_avg", sa.Float(), nullable=True),
+        sa.Column("rating_1_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rating_2_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rating_3_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rating_4_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rating_5_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("book_id"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO book_rating_stats (
+            book_id, rating_sum, rating_count, rating_avg,
+            rating_1_count, rating_2_count, rating_3_count, rating_4_count, rating_5_count
+        )
+        SELECT
+            book_id,
+            SUM(rating),
+            COUNT(id),
+            AVG(rating),
+            COUNT(*) FILTER (WHERE rating = 1),
+            COUNT(*) FILTER (WHERE rating = 2),
+            COUNT(*) FILTER (WHERE rating = 3),
+            COUNT(*) FILTER (WHERE rating = 4),
+            COUNT(*) FILTER (WHERE rating = 5)
+        FROM reviews
+        WHERE is_hidden = false
+        GROUP BY book_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("book_rating_stats")
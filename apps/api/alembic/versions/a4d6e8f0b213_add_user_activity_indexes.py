@@ -0,0 +1,27 @@
+"""add user activity indexes
+
+Revision ID: a4d6e8f0b213
+Revises: f2c84a6e1d57
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d6e8f0b213"
+down_revision: Union[str, None] = "f2c84a6e1d57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_reading_statuses_user_updated", "reading_statuses", ["user_id", "updated_at"])
+    op.create_index("ix_reviews_user_updated", "reviews", ["user_id", "updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reviews_user_updated", table_name="reviews")
+    op.drop_index("ix_reading_statuses_user_updated", table_name="reading_statuses")
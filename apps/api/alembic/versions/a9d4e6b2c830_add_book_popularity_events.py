@@ -0,0 +1,45 @@
+"""add book popularity events
+
+Revision ID: a9d4e6b2c830
+Revises: f3c7a9d2b481
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d4e6b2c830"
+down_revision: Union[str, None] = "f3c7a9d2b481"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "book_popularity_events",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "book_id", "kind"),
+    )
+    # reviews and statuses were already counted once; shelf adds carry no
+    # timestamp, so an existing shelving may count one more time
+    op.execute(
+        "INSERT INTO book_popularity_events (user_id, book_id, kind, created_at) "
+        "SELECT user_id, book_id, 'review', created_at FROM reviews"
+    )
+    op.execute(
+        "INSERT INTO book_popularity_events (user_id, book_id, kind, created_at) "
+        "SELECT user_id, book_id, 'status', created_at FROM reading_statuses"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("book_popularity_events")
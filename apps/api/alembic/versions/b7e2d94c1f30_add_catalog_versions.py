@@ -0,0 +1,28 @@
+"""add version counters to books and authors
+
+Revision ID: b7e2d94c1f30
+Revises: ead85c137a07
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2d94c1f30"
+down_revision: Union[str, None] = "ead85c137a07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("books", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+    op.add_column("authors", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("authors", "version")
+    op.drop_column("books", "version")
@@ -0,0 +1,49 @@
+"""add unread notification counters
+
+Revision ID: b8f3d5a7c914
+Revises: a4d6e8f0b213
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8f3d5a7c914"
+down_revision: Union[str, None] = "a4d6e8f0b213"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users", sa.Column("unread_requests_count", sa.Integer(), server_default="0", nullable=False)
+    )
+    op.add_column(
+        "users", sa.Column("unread_activity_count", sa.Integer(), server_default="0", nullable=False)
+    )
+
+    op.execute(
+        """
+        UPDATE users SET
+            unread_requests_count = (
+                SELECT count(*) FROM follows f
+                WHERE f.target_id = users.id AND f.status = 'pending'
+                  AND (users.last_requests_seen_at IS NULL OR f.created_at > users.last_requests_seen_at)
+            ),
+            unread_activity_count = (
+                SELECT count(*) FROM follows f
+                JOIN activity_events e ON e.user_id = f.target_id
+                WHERE f.requester_id = users.id AND f.status = 'accepted'
+                  AND (users.last_activity_seen_at IS NULL OR e.created_at > users.last_activity_seen_at)
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "unread_activity_count")
+    op.drop_column("users", "unread_requests_count")
@@ -0,0 +1,26 @@
+"""add user reviews version
+
+Revision ID: c2e9a6f4b751
+Revises: b8f3d5a7c914
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2e9a6f4b751"
+down_revision: Union[str, None] = "b8f3d5a7c914"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("reviews_version", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "reviews_version")
@@ -0,0 +1,39 @@
+"""add book neighbors
+
+Revision ID: d3a91c5e7b08
+Revises: b7e2d94c1f30
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a91c5e7b08"
+down_revision: Union[str, None] = "b7e2d94c1f30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # filled by `python -m app.scripts.rebuild_book_neighbors`
+    op.create_table(
+        "book_neighbors",
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("neighbor_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("reasons", sa.SmallInteger(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["neighbor_id"], ["books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("book_id", "neighbor_id"),
+    )
+    op.create_index("ix_book_neighbors_neighbor_id", "book_neighbors", ["neighbor_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_book_neighbors_neighbor_id", table_name="book_neighbors")
+    op.drop_table("book_neighbors")
@@ -0,0 +1,39 @@
+"""add user neighbors
+
+Revision ID: d6a1c8e3f592
+Revises: c2e9a6f4b751
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d6a1c8e3f592"
+down_revision: Union[str, None] = "c2e9a6f4b751"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # filled by `python -m app.scripts.rebuild_user_neighbors`
+    op.create_table(
+        "user_neighbors",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("neighbor_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("common_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["neighbor_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "neighbor_id"),
+    )
+    op.create_index("ix_user_neighbors_neighbor_id", "user_neighbors", ["neighbor_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_neighbors_neighbor_id", table_name="user_neighbors")
+    op.drop_table("user_neighbors")
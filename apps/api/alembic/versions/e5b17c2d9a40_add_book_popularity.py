@@ -0,0 +1,36 @@
+"""add book popularity
+
+Revision ID: e5b17c2d9a40
+Revises: d3a91c5e7b08
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b17c2d9a40"
+down_revision: Union[str, None] = "d3a91c5e7b08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # backfilled by `python -m app.scripts.compact_book_popularity --rebuild`
+    op.create_table(
+        "book_popularity",
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("book_id"),
+    )
+    op.create_index("ix_book_popularity_score", "book_popularity", ["score"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_book_popularity_score", table_name="book_popularity")
+    op.drop_table("book_popularity")
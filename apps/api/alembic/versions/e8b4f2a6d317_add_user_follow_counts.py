@@ -0,0 +1,40 @@
+"""add user follow counts
+
+Revision ID: e8b4f2a6d317
+Revises: d6a1c8e3f592
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b4f2a6d317"
+down_revision: Union[str, None] = "d6a1c8e3f592"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("followers_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("users", sa.Column("following_count", sa.Integer(), server_default="0", nullable=False))
+
+    op.execute(
+        """
+        UPDATE users SET
+            followers_count = (
+                SELECT count(*) FROM follows f WHERE f.target_id = users.id AND f.status = 'accepted'
+            ),
+            following_count = (
+                SELECT count(*) FROM follows f WHERE f.requester_id = users.id AND f.status = 'accepted'
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "following_count")
+    op.drop_column("users", "followers_count")
@@ -0,0 +1,36 @@
+"""add full-text and trigram search indexes
+
+Revision ID: ead85c137a07
+Revises: 4f8ab90ae363
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ead85c137a07"
+down_revision: Union[str, None] = "4f8ab90ae363"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.execute("CREATE INDEX ix_books_title_tsv ON books USING gin (to_tsvector('simple', title))")
+    op.execute("CREATE INDEX ix_books_title_trgm ON books USING gin (title gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_authors_name_tsv ON authors USING gin (to_tsvector('simple', name))")
+    op.execute("CREATE INDEX ix_authors_name_trgm ON authors USING gin (name gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_users_username_trgm ON users USING gin (username gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_username_trgm", table_name="users")
+    op.drop_index("ix_authors_name_trgm", table_name="authors")
+    op.drop_index("ix_authors_name_tsv", table_name="authors")
+    op.drop_index("ix_books_title_trgm", table_name="books")
+    op.drop_index("ix_books_title_tsv", table_name="books")
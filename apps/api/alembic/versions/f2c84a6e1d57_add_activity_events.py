@@ -0,0 +1,49 @@
+"""add activity events
+
+Revision ID: f2c84a6e1d57
+Revises: e5b17c2d9a40
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c84a6e1d57"
+down_revision: Union[str, None] = "e5b17c2d9a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "activity_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("book_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "kind", "book_id", name="uq_activity_events_user_kind_book"),
+    )
+    op.create_index("ix_activity_events_user_created", "activity_events", ["user_id", "created_at", "id"])
+
+    op.execute(
+        """
+        INSERT INTO activity_events (user_id, book_id, kind, status, created_at)
+        SELECT user_id, book_id, 'status', status, updated_at FROM reading_statuses
+        UNION ALL
+        SELECT user_id, book_id, 'review', NULL, updated_at FROM reviews WHERE is_hidden = false
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_activity_events_user_created", table_name="activity_events")
+    op.drop_table("activity_events")
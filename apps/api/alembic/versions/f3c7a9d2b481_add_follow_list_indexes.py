@@ -0,0 +1,29 @@
+"""add follow list indexes
+
+Revision ID: f3c7a9d2b481
+Revises: e8b4f2a6d317
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c7a9d2b481"
+down_revision: Union[str, None] = "e8b4f2a6d317"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_follows_requester_status_created", "follows", ["requester_id", "status", "created_at", "id"]
+    )
+    op.create_index("ix_follows_target_status_created", "follows", ["target_id", "status", "created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_follows_target_status_created", table_name="follows")
+    op.drop_index("ix_follows_requester_status_created", table_name="follows")
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Select, String, delete, literal, null, select, true, tuple_, union_all
+from sqlalchemy.orm import Session, aliased
+
+from app.core.book_fields import book_load_options
+from app.core.events import queue_event
+from app.core.notifications import activity_recorded, activity_removed
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models import ActivityEvent, Book, ReadingStatus, Review, User
+from app.schemas import ActivityItem
+
+ACTIVITY_BOOK_FIELDS = frozenset({"id", "title", "cover_url", "authors"})
+
+
+def record_activity(
+    db: Session,
+    user_id: int,
+    kind: str,
+    book_id: int,
+    status: str | None = None,
+    at: datetime | None = None,
+) -> None:
+    """Move `user_id`'s `kind` activity on `book_id` to the top of the feeds.
+
+    Runs inside the caller's transaction so the event and the followers'
+    unread counters commit together with the status or review.
+    """
+    at = at or datetime.now(timezone.utc)
+    event = db.execute(
+        select(ActivityEvent).where(
+            ActivityEvent.user_id == user_id, ActivityEvent.kind == kind, ActivityEvent.book_id == book_id
+        )
+    ).scalar_one_or_none()
+    if event is None:
+        db.add(ActivityEvent(user_id=user_id, kind=kind, book_id=book_id, status=status, created_at=at))
+        activity_recorded(db, user_id, None)
+    else:
+        activity_recorded(db, user_id, event.created_at)
+        event.status = status
+        event.created_at = at
+    queue_event(db, {"actor": user_id, "kind": kind, "book_id": book_id})
+
+
+def remove_activity(db: Session, user_id: int, kind: str, book_id: int) -> None:
+    previous_at = db.execute(
+        delete(ActivityEvent)
+        .where(ActivityEvent.user_id == user_id, ActivityEvent.kind == kind, ActivityEvent.book_id == book_id)
+        .returning(ActivityEvent.created_at)
+    ).scalar_one_or_none()
+    if previous_at is not None:
+        activity_removed(db, user_id, previous_at)
+        queue_event(db, {"actor": user_id})
+
+
+def activity_page(
+    db: Session,
+    actor_ids: Select,
+    limit: int,
+    after: str | None = None,
+    offset: int = 0,
+    since: datetime | None = None,
+) -> tuple[list[ActivityEvent], str | None]:
+    """Newest-first events of the users selected by `actor_ids`, one page at a time.
+
+    `since` keeps only events newer than it (the unseen ones).
+
+    On Postgres each actor contributes at most one page of rows through the
+    `(user_id, created_at, id)` index (a LATERAL top-N merged by the outer
+    ORDER BY), so cost follows the page size rather than the actors' history.
+    """
+    keyset: Any = None
+    if after:
+        at, event_id = decode_cursor(after, datetime, int)
+        keyset = (at, event_id)
+
+    fetch = offset + limit + 1
+    if db.get_bind().dialect.name == "postgresql":
+        actors = actor_ids.subquery()
+        per_actor = select(ActivityEvent).where(ActivityEvent.user_id == actors.c[0])
+        if keyset:
+            per_actor = per_actor.where(tuple_(ActivityEvent.created_at, ActivityEvent.id) < keyset)
+        if since is not None:
+            per_actor = per_actor.where(ActivityEvent.created_at > since)
+        per_actor = (
+            per_actor.order_by(ActivityEvent.created_at.desc(), ActivityEvent.id.desc()).limit(fetch).lateral()
+        )
+        event = aliased(ActivityEvent, per_actor)
+        stmt = select(event).select_from(actors).join(per_actor, true())
+    else:
+        event = ActivityEvent
+        stmt = select(ActivityEvent).where(ActivityEvent.user_id.in_(actor_ids))
+        if keyset:
+            stmt = stmt.where(tuple_(ActivityEvent.created_at, ActivityEvent.id) < keyset)
+        if since is not None:
+            stmt = stmt.where(ActivityEvent.created_at > since)
+
+    rows = list(
+        db.execute(stmt.order_by(event.created_at.desc(), event.id.desc()).offset(offset).limit(limit + 1))
+        .scalars()
+        .all()
+    )
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    return page, next_cursor
+
+
+def user_activity_page(
+    db: Session,
+    user_id: int,
+    limit: int,
+    after: str | None = None,
+    offset: int = 0,
+) -> tuple[list[Any], str | None]:
+    """Newest-first statuses and visible reviews of one user, merged in SQL.
+
+    Each branch is a top-N on its `(user_id, updated_at)` index and the
+    UNION ALL of the two is ordered and cut to one page, so only that page
+    is fetched. Rows carry the same attributes as ActivityEvent.
+    """
+    keyset: Any = None
+    if after:
+        keyset = decode_cursor(after, datetime, str, int)
+
+    def branch(model: Any, kind: str, status: Any, *criteria: Any) -> Select:
+        stmt = select(
+            literal(kind, String).label("kind"),
+            model.id.label("row_id"),
+            model.user_id.label("user_id"),
+            model.book_id.label("book_id"),
+            status.label("status"),
+            model.updated_at.label("created_at"),
+        ).where(model.user_id == user_id, *criteria)
+        if keyset:
+            stmt = stmt.where(tuple_(model.updated_at, literal(kind, String), model.id) < keyset)
+        stmt = stmt.order_by(model.updated_at.desc(), model.id.desc()).limit(offset + limit + 1)
+        return select(stmt.subquery())
+
+    merged = union_all(
+        branch(ReadingStatus, "status", ReadingStatus.status),
+        branch(Review, "review", null(), Review.is_hidden == False),  # noqa: E712
+    ).subquery()
+    rows = db.execute(
+        select(merged)
+        .order_by(merged.c.created_at.desc(), merged.c.kind.desc(), merged.c.row_id.desc())
+        .offset(offset)
+        .limit(limit + 1)
+    ).all()
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last.created_at, last.kind, last.row_id)
+    return page, next_cursor
+
+
+def activity_items(db: Session, events: Sequence[Any]) -> list[ActivityItem]:
+    """Hydrate one page of events with a fixed number of lookups.
+
+    `events` are ActivityEvent rows or anything with the same attributes.
+
+    Events whose review has since been hidden are skipped, so a page can come
+    back shorter than requested; the cursor still moves past them.
+    """
+    if not events:
+        return []
+
+    user_ids = {e.user_id for e in events}
+    book_ids = {e.book_id for e in events}
+    users = {u.id: u for u in db.execute(select(User).where(User.id.in_(user_ids))).scalars()}
+    books = {
+        b.id: b
+        for b in db.execute(
+            select(Book).where(Book.id.in_(book_ids)).options(*book_load_options(ACTIVITY_BOOK_FIELDS))
+        ).scalars()
+    }
+    pairs = list({(e.user_id, e.book_id) for e in events})
+    reviews = {
+        (r.user_id, r.book_id): r
+        for r in db.execute(
+            select(Review.user_id, Review.book_id, Review.rating, Review.body)
+            .where(tuple_(Review.user_id, Review.book_id).in_(pairs))
+            .where(Review.is_hidden == False)  # noqa: E712
+        )
+    }
+
+    items: list[ActivityItem] = []
+    for e in events:
+        user, book = users.get(e.user_id), books.get(e.book_id)
+        review = reviews.get((e.user_id, e.book_id))
+        if user is None or book is None or (e.kind == "review" and review is None):
+            continue
+        item: dict[str, Any] = {
+            "type": e.kind,
+            "user": {"id": user.id, "username": user.username, "avatar_url": user.avatar_url},
+            "book": {
+                "id": book.id,
+                "title": book.title,
+                "cover_url": book.cover_url,
+                "authors": [{"id": a.id, "name": a.name} for a in (book.authors or [])],
+            },
+            "updated_at": e.created_at,
+        }
+        if e.kind == "status":
+            item["status"] = e.status
+            item["rating"] = review.rating if review and e.status == "finished" else None
+        else:
+            item["rating"] = review.rating
+            item["body"] = review.body
+        items.append(ActivityItem(**item))
+    return items
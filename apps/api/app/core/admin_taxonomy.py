@@ -12,6 +12,10 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.book_neighbors import forget_trait
+from app.core.etag import bump_versions
+from app.models import Book
+
 
 def list_items(db: Session, model: Any, q: str | None, limit: int, offset: int) -> dict:
     stmt = select(model)
@@ -69,6 +73,7 @@ def update_item(db: Session, model: Any, item_id: int, name: str, not_found_deta
         raise HTTPException(status_code=409, detail=duplicate_detail)
 
     item.name = normalized
+    _bump_linked_books(db, model, item_id)
     try:
         db.commit()
     except IntegrityError:
@@ -84,10 +89,17 @@ def delete_item(db: Session, model: Any, item_id: int, not_found_detail: str) ->
     if not item:
         raise HTTPException(status_code=404, detail=not_found_detail)
 
+    _bump_linked_books(db, model, item_id)
+    forget_trait(db, model.books.property.secondary, item_id)
     db.delete(item)
     db.commit()
 
 
+def _bump_linked_books(db: Session, model: Any, item_id: int) -> None:
+    linked = select(Book.id).select_from(model).join(model.books).where(model.id == item_id)
+    bump_versions(db, Book, Book.id.in_(linked))
+
+
 class ListParams(NamedTuple):
     q: str | None
     limit: int
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+import sys
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Literal
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Author, AuthorLike, Book, BookRatingStats, Follow, User, book_authors
+
+logger = logging.getLogger(__name__)
+
+Kind = Literal["book", "author", "user"]
+KINDS: tuple[Kind, ...] = ("book", "author", "user")
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> tuple[str, ...]:
+    tokens: set[str] = set()
+    for word in WORD_RE.findall(normalize(text)):
+        tokens.add(word)
+        if "_" in word:
+            tokens.update(part for part in word.split("_") if part)
+    return tuple(sorted(tokens))
+
+
+@dataclass(slots=True)
+class Entry:
+    kind: Kind
+    id: int
+    label: str
+    image_url: str | None
+    popularity: int = 0
+    author_ids: tuple[int, ...] = ()
+    tokens: tuple[str, ...] = field(default=())
+    normalized: str = ""
+
+
+class AutocompleteIndex:
+    """Prefix index over book titles, author names and usernames.
+
+    Each kind keeps a sorted list of `(token, id)` pairs, so a prefix lookup
+    is two bisections plus a scan of the matching slice. Admin writes update
+    it incrementally; `rebuild` reloads everything from the database.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[Kind, dict[int, Entry]] = {kind: {} for kind in KINDS}
+        self._tokens: dict[Kind, list[tuple[str, int]]] = {kind: [] for kind in KINDS}
+        self.ready = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {kind: {} for kind in KINDS}
+            self._tokens = {kind: [] for kind in KINDS}
+            self.ready = False
+
+    def rebuild(self, db: Session) -> None:
+        entries: dict[Kind, dict[int, Entry]] = {kind: {} for kind in KINDS}
+
+        book_author_ids: dict[int, list[int]] = defaultdict(list)
+        for book_id, author_id in db.execute(select(book_authors.c.book_id, book_authors.c.author_id)):
+            book_author_ids[book_id].append(author_id)
+
+        books = db.execute(
+            select(Book.id, Book.title, Book.cover_url, BookRatingStats.rating_count).outerjoin(
+                BookRatingStats, BookRatingStats.book_id == Book.id
+            )
+        )
+        for book_id, title, cover_url, rating_count in books:
+            entries["book"][book_id] = self._make(
+                "book", book_id, title, cover_url, rating_count or 0, tuple(book_author_ids.get(book_id, ()))
+            )
+
+        authors = db.execute(
+            select(Author.id, Author.name, Author.photo_url, func.count(AuthorLike.id))
+            .outerjoin(AuthorLike, AuthorLike.author_id == Author.id)
+            .group_by(Author.id)
+        )
+        for author_id, name, photo_url, likes in authors:
+            entries["author"][author_id] = self._make("author", author_id, name, photo_url, likes or 0)
+
+        users = db.execute(
+            select(User.id, User.username, User.avatar_url, func.count(Follow.id))
+            .outerjoin(Follow, (Follow.target_id == User.id) & (Follow.status == "accepted"))
+            .group_by(User.id)
+        )
+        for user_id, username, avatar_url, followers in users:
+            entries["user"][user_id] = self._make("user", user_id, username, avatar_url, followers or 0)
+
+        tokens = {
+            kind: sorted((token, entry.id) for entry in entries[kind].values() for token in entry.tokens)
+            for kind in KINDS
+        }
+
+        with self._lock:
+            self._entries = entries
+            self._tokens = tokens
+            self.ready = True
+
+        logger.info("Autocomplete index rebuilt: %s", self.stats())
+
+    @staticmethod
+    def _make(
+        kind: Kind,
+        entry_id: int,
+        label: str,
+        image_url: str | None,
+        popularity: int = 0,
+        author_ids: tuple[int, ...] = (),
+    ) -> Entry:
+        return Entry(
+            kind=kind,
+            id=entry_id,
+            label=label,
+            image_url=image_url,
+            popularity=int(popularity),
+            author_ids=author_ids,
+            tokens=tokenize(label),
+            normalized=normalize(label),
+        )
+
+    def _remove_locked(self, kind: Kind, entry_id: int) -> Entry | None:
+        old = self._entries[kind].pop(entry_id, None)
+        if old is None:
+            return None
+        pairs = self._tokens[kind]
+        for token in old.tokens:
+            pos = bisect_left(pairs, (token, entry_id))
+            if pos < len(pairs) and pairs[pos] == (token, entry_id):
+                del pairs[pos]
+        return old
+
+    def _upsert(
+        self,
+        kind: Kind,
+        entry_id: int,
+        label: str,
+        image_url: str | None,
+        author_ids: tuple[int, ...] = (),
+    ) -> None:
+        with self._lock:
+            old = self._remove_locked(kind, entry_id)
+            entry = self._make(kind, entry_id, label, image_url, old.popularity if old else 0, author_ids)
+            self._entries[kind][entry_id] = entry
+            for token in entry.tokens:
+                insort(self._tokens[kind], (token, entry_id))
+
+    def upsert_book(self, book: Book) -> None:
+        self._upsert("book", book.id, book.title, book.cover_url, tuple(a.id for a in (book.authors or [])))
+
+    def upsert_author(self, author: Author) -> None:
+        self._upsert("author", author.id, author.name, author.photo_url)
+
+    def upsert_user(self, user: User) -> None:
+        self._upsert("user", user.id, user.username, user.avatar_url)
+
+    def remove(self, kind: Kind, entry_id: int) -> None:
+        with self._lock:
+            self._remove_locked(kind, entry_id)
+
+    def get(self, kind: Kind, entry_id: int) -> Entry | None:
+        return self._entries[kind].get(entry_id)
+
+    def search(self, kind: Kind, query: str, limit: int) -> list[Entry]:
+        """Entries whose tokens cover every query token as a prefix.
+
+        Ranked by exact label match, then label prefix match, then popularity.
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+        normalized = normalize(query).strip()
+        probe = max(query_tokens, key=len)
+        rest = [t for t in query_tokens if t != probe]
+
+        with self._lock:
+            pairs = self._tokens[kind]
+            entries = self._entries[kind]
+            lo = bisect_left(pairs, (probe,))
+            hi = bisect_left(pairs, (probe + "\U0010ffff",))
+            candidate_ids = {entry_id for _, entry_id in pairs[lo:hi]}
+            matches = [
+                entry
+                for entry in (entries[i] for i in candidate_ids)
+                if all(any(tok.startswith(q) for tok in entry.tokens) for q in rest)
+            ]
+
+        return heapq.nsmallest(
+            limit,
+            matches,
+            key=lambda e: (
+                e.normalized != normalized,
+                not e.normalized.startswith(normalized),
+                -e.popularity,
+                e.normalized,
+                e.id,
+            ),
+        )
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            out: dict[str, int] = {}
+            total = 0
+            for kind in KINDS:
+                entries = self._entries[kind]
+                pairs = self._tokens[kind]
+                size = sys.getsizeof(entries) + sys.getsizeof(pairs)
+                for entry in entries.values():
+                    size += sys.getsizeof(entry) + sys.getsizeof(entry.label) + sys.getsizeof(entry.normalized)
+                    size += sys.getsizeof(entry.tokens) + sys.getsizeof(entry.author_ids)
+                # token strings are shared with Entry.tokens, so only the pair tuples add up here
+                size += sum(sys.getsizeof(pair) for pair in pairs)
+                out[f"{kind}_entries"] = len(entries)
+                out[f"{kind}_tokens"] = len(pairs)
+                total += size
+            out["approx_bytes"] = total
+            return out
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only, noload, selectinload
+
+from app.models import Book
+from app.schemas.author import AuthorOut
+from app.schemas.book import BookOut
+from app.schemas.genre import GenreOut
+from app.schemas.tag import TagOut
+
+BOOK_FIELDS: tuple[str, ...] = tuple(BookOut.model_fields)
+
+COLUMNS = {
+    "title": Book.title,
+    "description": Book.description,
+    "published_year": Book.published_year,
+    "cover_url": Book.cover_url,
+}
+
+RELATIONSHIPS: dict[str, tuple[Any, type[BaseModel]]] = {
+    "authors": (Book.authors, AuthorOut),
+    "tags": (Book.tags, TagOut),
+    "genres": (Book.genres, GenreOut),
+}
+
+FIELDS_DESCRIPTION = f"Comma-separated subset of: {', '.join(BOOK_FIELDS)}"
+
+
+def parse_fields(raw: str | None) -> frozenset[str] | None:
+    """`None` means the full BookOut; otherwise the requested names plus `id`."""
+    if raw is None:
+        return None
+    fields = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = sorted(fields.difference(BOOK_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {unknown}")
+    return frozenset(fields | {"id"})
+
+
+def book_load_options(fields: frozenset[str] | None) -> list[Any]:
+    """Loader profile for `fields`: only the requested columns and relationships."""
+    if fields is None:
+        return []
+    columns = [col for name, col in COLUMNS.items() if name in fields]
+    options: list[Any] = [load_only(*(columns or [Book.id]))]
+    for name, (rel, _) in RELATIONSHIPS.items():
+        options.append(selectinload(rel) if name in fields else noload(rel))
+    return options
+
+
+def serialize_book(book: Book, fields: frozenset[str] | None) -> dict[str, Any]:
+    if fields is None:
+        return BookOut.model_validate(book).model_dump()
+    out: dict[str, Any] = {}
+    for name in BOOK_FIELDS:
+        if name not in fields:
+            continue
+        if name in RELATIONSHIPS:
+            schema = RELATIONSHIPS[name][1]
+            out[name] = [schema.model_validate(item).model_dump() for item in getattr(book, name)]
+        else:
+            out[name] = getattr(book, name)
+    return out
+
+
+def books_response(response: Response, books: Book | Iterable[Book], fields: frozenset[str] | None) -> Any:
+    """Return `books` for the route's response_model, or a trimmed JSON body when `fields` is set.
+
+    The trimmed body bypasses response_model, which would fill the skipped
+    fields back in with defaults; headers already set on `response` are kept.
+    """
+    if fields is None:
+        return books
+    if isinstance(books, Book):
+        content = jsonable_encoder(serialize_book(books, fields))
+    else:
+        content = jsonable_encoder([serialize_book(b, fields) for b in books])
+    return JSONResponse(content, headers=dict(response.headers))
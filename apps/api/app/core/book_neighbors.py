@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import Table, delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models import Book, BookNeighbor, book_authors, book_genres, book_tags
+
+logger = logging.getLogger(__name__)
+
+NEIGHBORS_PER_BOOK = 50
+BLOCK_SIZE = 512
+
+REASON_AUTHOR = 1
+REASON_GENRE = 2
+REASON_TAGS = 4
+REASON_LABELS = (
+    (REASON_AUTHOR, "Same author"),
+    (REASON_GENRE, "Same genre"),
+    (REASON_TAGS, "Similar tags"),
+)
+
+# (link table, trait column) in author, tag, genre order
+TRAIT_TABLES = (
+    (book_authors, "author_id"),
+    (book_tags, "tag_id"),
+    (book_genres, "genre_id"),
+)
+
+
+@dataclass(slots=True)
+class TraitMatrices:
+    """Binary book x trait incidence matrices; row `i` is `book_ids[i]`."""
+
+    book_ids: np.ndarray
+    authors: sparse.csr_matrix
+    tags: sparse.csr_matrix
+    genres: sparse.csr_matrix
+
+
+def _incidence(db: Session, table, trait_col: str, book_ids: np.ndarray) -> sparse.csr_matrix:
+    pairs = np.array(db.execute(select(table.c.book_id, table.c[trait_col])).all(), dtype=np.int64).reshape(-1, 2)
+    rows = np.searchsorted(book_ids, pairs[:, 0])
+    _, cols = np.unique(pairs[:, 1], return_inverse=True)
+    n_traits = int(cols.max()) + 1 if len(cols) else 0
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(book_ids), n_traits)
+    )
+    # a trait carried by a single book can never be shared, so it only costs memory
+    keep = np.flatnonzero(np.asarray(matrix.sum(axis=0)).ravel() >= 2)
+    return matrix[:, keep].tocsr()
+
+
+def load_trait_matrices(db: Session) -> TraitMatrices:
+    book_ids = np.array(db.execute(select(Book.id).order_by(Book.id)).scalars().all(), dtype=np.int64)
+    return TraitMatrices(
+        book_ids=book_ids,
+        authors=_incidence(db, book_authors, "author_id", book_ids),
+        tags=_incidence(db, book_tags, "tag_id", book_ids),
+        genres=_incidence(db, book_genres, "genre_id", book_ids),
+    )
+
+
+def _combine(shared_authors: np.ndarray, shared_tags: np.ndarray, shared_genres: np.ndarray):
+    """Scores and reason flags from per-kind shared trait counts."""
+    scores = 2.0 * (shared_authors > 0) + shared_tags + shared_genres
+    reasons = (
+        (shared_authors > 0) * REASON_AUTHOR + (shared_genres > 0) * REASON_GENRE + (shared_tags > 0) * REASON_TAGS
+    ).astype(np.int16)
+    return scores, reasons
+
+
+def _score_rows(m: TraitMatrices, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Dense scores and reason flags of `rows` against every book."""
+    scores, reasons = _combine(
+        (m.authors[rows] @ m.authors.T).toarray(),
+        (m.tags[rows] @ m.tags.T).toarray(),
+        (m.genres[rows] @ m.genres.T).toarray(),
+    )
+    scores[np.arange(len(rows)), rows] = 0.0  # never your own neighbor
+    return scores, reasons
+
+
+def _top_k(m: TraitMatrices, rows: np.ndarray, scores: np.ndarray, reasons: np.ndarray, k: int) -> list[dict]:
+    n = scores.shape[1]
+    k = min(k, n)
+    if k == 0:
+        return []
+
+    # ties go to the lower book id, so results do not depend on partition order
+    key = scores.astype(np.float64) * (n + 1) - np.arange(n)
+    top = np.argpartition(-key, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(key, top, axis=1), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    top_reasons = np.take_along_axis(reasons, top, axis=1)
+    keep = top_scores > 0
+    owners = np.broadcast_to(m.book_ids[rows][:, None], top.shape)
+    return [
+        {"book_id": b, "neighbor_id": n, "score": sc, "reasons": r}
+        for b, n, sc, r in zip(
+            owners[keep].tolist(),
+            m.book_ids[top[keep]].tolist(),
+            top_scores[keep].tolist(),
+            top_reasons[keep].tolist(),
+        )
+    ]
+
+
+def rebuild_book_neighbors(db: Session, k: int = NEIGHBORS_PER_BOOK, block_size: int = BLOCK_SIZE) -> int:
+    """Recompute the top-`k` neighbors of every book; returns rows written.
+
+    Scores a block of books against the whole catalog at a time, so memory is
+    bounded by `block_size` x number of books.
+    """
+    m = load_trait_matrices(db)
+    db.execute(delete(BookNeighbor))
+
+    written = 0
+    for start in range(0, len(m.book_ids), block_size):
+        rows = np.arange(start, min(start + block_size, len(m.book_ids)))
+        batch = _top_k(m, rows, *_score_rows(m, rows), k)
+        if batch:
+            db.execute(insert(BookNeighbor.__table__), batch)
+            written += len(batch)
+
+    db.commit()
+    return written
+
+
+def _shared_with(db: Session, book_id: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Ids, scores and reason flags of every book sharing a trait with `book_id`.
+
+    Reads only the link rows of `book_id`'s own traits, so the cost follows
+    the size of those traits rather than the catalog.
+    """
+    per_kind = []
+    for table, trait_col in TRAIT_TABLES:
+        own = select(table.c[trait_col]).where(table.c.book_id == book_id)
+        stmt = select(table.c.book_id).where(table.c[trait_col].in_(own), table.c.book_id != book_id)
+        per_kind.append(np.fromiter(db.execute(stmt).scalars(), dtype=np.int64))
+
+    other_ids = np.unique(np.concatenate(per_kind))
+    counts = [np.bincount(np.searchsorted(other_ids, ids), minlength=len(other_ids)) for ids in per_kind]
+    return other_ids, *_combine(*counts)
+
+
+def refresh_book_neighbors(db: Session, book_id: int, k: int = NEIGHBORS_PER_BOOK) -> None:
+    """Update neighbors after `book_id`'s authors, tags or genres changed.
+
+    Rewrites the book's own list and its entry in every other list it now
+    belongs to, looking only at books that share a trait with it. Until the
+    next full rebuild, a list the book drops out of is one entry short and a
+    list it joins may hold more than `k` entries. Runs inside the caller's
+    transaction (flush first).
+    """
+    db.execute(delete(BookNeighbor).where(BookNeighbor.book_id == book_id))
+    db.execute(delete(BookNeighbor).where(BookNeighbor.neighbor_id == book_id))
+
+    other_ids, scores, reasons = _shared_with(db, book_id)
+    if len(other_ids) == 0:
+        return
+
+    # ties go to the lower book id, like _top_k
+    top = np.lexsort((other_ids, -scores))[:k]
+    db.execute(
+        insert(BookNeighbor.__table__),
+        [
+            {"book_id": book_id, "neighbor_id": n, "score": sc, "reasons": r}
+            for n, sc, r in zip(other_ids[top].tolist(), scores[top].tolist(), reasons[top].tolist())
+        ],
+    )
+
+    # scores are symmetric: this book's scores are its entries in everyone else's lists
+    other_ids = other_ids.tolist()
+    lists: dict[int, tuple[int, float]] = {}
+    for start in range(0, len(other_ids), 1000):
+        chunk = other_ids[start : start + 1000]
+        for other_id, count, min_score in db.execute(
+            select(BookNeighbor.book_id, func.count(), func.min(BookNeighbor.score))
+            .where(BookNeighbor.book_id.in_(chunk))
+            .group_by(BookNeighbor.book_id)
+        ):
+            lists[other_id] = (count, min_score)
+
+    entries = []
+    for other_id, score, flags in zip(other_ids, scores.tolist(), reasons.tolist()):
+        count, min_score = lists.get(other_id, (0, 0.0))
+        if count < k or score > min_score:
+            entries.append({"book_id": other_id, "neighbor_id": book_id, "score": score, "reasons": flags})
+    if entries:
+        db.execute(insert(BookNeighbor.__table__), entries)
+    logger.debug("Refreshed neighbors of book %s (%d reverse entries)", book_id, len(entries))
+
+
+def forget_trait(db: Session, table: Table, trait_id: int) -> None:
+    """Rescore neighbor pairs that share a trait about to be deleted.
+
+    `table` is the trait's link table. Only pairs whose books both carry the
+    trait can change, and each book keeps at most `NEIGHBORS_PER_BOOK` rows, so the work is
+    bounded by the stored lists rather than the catalog. Pairs left with no
+    shared trait are dropped; like `refresh_book_neighbors`, those lists stay
+    short until the next full rebuild. Runs inside the caller's transaction,
+    before the trait is deleted.
+    """
+    trait_col = next(col for link, col in TRAIT_TABLES if link is table)
+    linked = select(table.c.book_id).where(table.c[trait_col] == trait_id)
+    bn = BookNeighbor.__table__
+    in_pair = bn.c.book_id.in_(linked) & bn.c.neighbor_id.in_(linked)
+
+    pairs = db.execute(select(bn.c.book_id, bn.c.neighbor_id).where(in_pair)).all()
+    counts = {(b, n): [0] * len(TRAIT_TABLES) for b, n in pairs}
+    if not counts:
+        return
+
+    for kind, (link, col) in enumerate(TRAIT_TABLES):
+        mine, theirs = link.alias(), link.alias()
+        stmt = (
+            select(bn.c.book_id, bn.c.neighbor_id, func.count())
+            .select_from(
+                bn.join(mine, mine.c.book_id == bn.c.book_id).join(
+                    theirs, (theirs.c.book_id == bn.c.neighbor_id) & (theirs.c[col] == mine.c[col])
+                )
+            )
+            .where(in_pair)
+            .group_by(bn.c.book_id, bn.c.neighbor_id)
+        )
+        if link is table:
+            stmt = stmt.where(mine.c[col] != trait_id)
+        for book, neighbor, count in db.execute(stmt):
+            counts[(book, neighbor)][kind] = count
+
+    pairs = list(counts)
+    scores, reasons = _combine(*np.array(list(counts.values()), dtype=np.int64).T)
+    keep = scores > 0
+    stale = [pair for pair, kept in zip(pairs, keep.tolist()) if not kept]
+    for start in range(0, len(stale), 1000):
+        chunk = stale[start : start + 1000]
+        db.execute(delete(BookNeighbor).where(tuple_(BookNeighbor.book_id, BookNeighbor.neighbor_id).in_(chunk)))
+    rescored = [
+        {"book_id": b, "neighbor_id": n, "score": sc, "reasons": r}
+        for (b, n), sc, r, kept in zip(pairs, scores.tolist(), reasons.tolist(), keep.tolist())
+        if kept
+    ]
+    if rescored:
+        db.execute(update(BookNeighbor), rescored)
+    logger.debug("Rescored %d neighbor pairs after deleting trait %s", len(pairs), trait_id)
+
+
+def reason_labels(flags: int) -> list[str]:
+    return [label for bit, label in REASON_LABELS if flags & bit]
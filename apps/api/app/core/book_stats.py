@@ -1,24 +1,30 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import case, delete, func, insert, select
 from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
 
-from app.models import Book, Review
+from app.db.upsert import insert_if_missing
+from app.models import Book, BookRatingStats, Review
+
+STAR_COLUMNS = {
+    1: "rating_1_count",
+    2: "rating_2_count",
+    3: "rating_3_count",
+    4: "rating_4_count",
+    5: "rating_5_count",
+}
 
 
 def book_with_stats_stmt():
-    return (
-        select(
-            Book,
-            func.avg(Review.rating).filter(Review.is_hidden == False).label("rating_avg"),  # noqa: E712
-            func.count(Review.id).filter(Review.is_hidden == False).label("rating_count"),  # noqa: E712
-        )
-        .outerjoin(Review, Review.book_id == Book.id)
-        .group_by(Book.id)
-    )
+    return select(
+        Book,
+        BookRatingStats.rating_avg.label("rating_avg"),
+        BookRatingStats.rating_count.label("rating_count"),
+    ).outerjoin(BookRatingStats, BookRatingStats.book_id == Book.id)
 
 
 def hydrate_books(rows: Iterable[tuple[Book, float | None, int | None] | Row[Any]]) -> list[Book]:
@@ -29,3 +35,78 @@ def hydrate_books(rows: Iterable[tuple[Book, float | None, int | None] | Row[Any
         book.rating_count = int(rating_count or 0)
         out.append(book)
     return out
+
+
+def books_by_ids(db: Session, ids: Sequence[int], options: Sequence[Any] = ()) -> list[Book]:
+    """Hydrated books for `ids` in the same order; unknown ids are skipped."""
+    if not ids:
+        return []
+    stmt = book_with_stats_stmt().where(Book.id.in_(ids)).options(*options)
+    by_id = {b.id: b for b in hydrate_books(db.execute(stmt).all())}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def visible_rating(review: Review | None) -> int | None:
+    if review is None or review.is_hidden:
+        return None
+    return review.rating
+
+
+def apply_rating_change(db: Session, book_id: int, old_rating: int | None, new_rating: int | None) -> None:
+    """Move one visible rating of a book from `old_rating` to `new_rating`.
+
+    `None` means "not counted" (no review, or a hidden one). Runs inside the
+    caller's transaction so the stats row commits together with the review.
+    """
+    if old_rating == new_rating:
+        return
+
+    # create the row race-free, then lock it; concurrent changes apply in turn
+    insert_if_missing(db, BookRatingStats, book_id=book_id)
+    stats = db.get(BookRatingStats, book_id, with_for_update=True, populate_existing=True)
+
+    if old_rating is not None:
+        stats.rating_sum -= old_rating
+        stats.rating_count -= 1
+        column = STAR_COLUMNS[old_rating]
+        setattr(stats, column, getattr(stats, column) - 1)
+
+    if new_rating is not None:
+        stats.rating_sum += new_rating
+        stats.rating_count += 1
+        column = STAR_COLUMNS[new_rating]
+        setattr(stats, column, getattr(stats, column) + 1)
+
+    stats.rating_avg = stats.rating_sum / stats.rating_count if stats.rating_count > 0 else None
+
+
+def rebuild_book_rating_stats(db: Session) -> int:
+    """Recompute every stats row from `reviews`. Returns the number of rows written."""
+    visible = Review.is_hidden == False  # noqa: E712
+    aggregates = (
+        select(
+            Review.book_id,
+            func.sum(Review.rating),
+            func.count(Review.id),
+            func.avg(Review.rating),
+            *[func.count(case((Review.rating == star, 1))) for star in STAR_COLUMNS],
+        )
+        .where(visible)
+        .group_by(Review.book_id)
+    )
+
+    db.execute(delete(BookRatingStats))
+    result = db.execute(
+        insert(BookRatingStats).from_select(
+            [
+                "book_id",
+                "rating_sum",
+                "rating_count",
+                "rating_avg",
+                *STAR_COLUMNS.values(),
+            ],
+            aggregates,
+        )
+    )
+    db.commit()
+    return int(result.rowcount or 0)
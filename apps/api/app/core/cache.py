@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from app.core.metrics import cache_lookups
+
+
+class GroupedTTLCache:
+    """Per-process TTL cache whose entries are grouped (e.g. per user).
+
+    `get_or_compute` runs `compute` at most once per key at a time: concurrent
+    callers for a missing key wait for the first one instead of stampeding.
+    `invalidate(group)` drops a group's entries and also discards results of
+    computations that were already in flight, so a write is never followed by
+    a stale read from this process.
+
+    With `latest_key_only`, storing a key replaces the group's other entries.
+    Use it when keys are versions of the same value, so a superseded version
+    is freed right away instead of living until its TTL.
+    """
+
+    def __init__(
+        self, name: str, ttl_seconds: float, max_groups: int = 10_000, latest_key_only: bool = False
+    ) -> None:
+        self.name = name
+        self.ttl = ttl_seconds
+        self.max_groups = max_groups
+        self.latest_key_only = latest_key_only
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, dict[Hashable, tuple[float, Any]]] = {}
+        self._generations: dict[Hashable, int] = {}
+        self._epoch = 0
+        self._key_locks: dict[tuple[Hashable, Hashable], threading.Lock] = {}
+
+    def _generation(self, group: Hashable) -> tuple[int, int]:
+        return self._epoch, self._generations.get(group, 0)
+
+    def _fresh(self, group: Hashable, key: Hashable) -> tuple[bool, Any]:
+        entry = self._entries.get(group, {}).get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    def get_or_compute(self, group: Hashable, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            hit, value = self._fresh(group, key)
+            if hit:
+                cache_lookups.inc(self.name, "hit")
+                return value
+            key_lock = self._key_locks.setdefault((group, key), threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                hit, value = self._fresh(group, key)
+                generation = self._generation(group)
+            if hit:
+                cache_lookups.inc(self.name, "wait")
+                return value
+
+            cache_lookups.inc(self.name, "miss")
+            value = compute()
+            with self._lock:
+                if self._generation(group) == generation:
+                    if group not in self._entries and len(self._entries) >= self.max_groups:
+                        self._evict()
+                    entry = (time.monotonic() + self.ttl, value)
+                    if self.latest_key_only:
+                        self._entries[group] = {key: entry}
+                    else:
+                        self._entries.setdefault(group, {})[key] = entry
+                self._key_locks.pop((group, key), None)
+            return value
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for group in [g for g, keys in self._entries.items() if all(exp <= now for exp, _ in keys.values())]:
+            del self._entries[group]
+        if len(self._entries) >= self.max_groups:
+            # still full of live entries: drop the oldest group (dicts keep insertion order)
+            del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, group: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(group, None)
+            self._generations[group] = self._generations.get(group, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Review, Shelf, shelf_books
+
+logger = logging.getLogger(__name__)
+
+NEIGHBORS_PER_ITEM = 50
+SHRINKAGE = 10.0
+BLOCK_SIZE = 1024
+# users with fewer known interactions get the trait-based recommender instead
+MIN_USER_INTERACTIONS = 3
+
+
+def interaction_weight(rating: int | None) -> float:
+    """Preference strength of a shelved or reviewed book (`None`: shelved, no visible review).
+
+    A low rating cancels the shelf signal rather than counting as interest.
+    """
+    if rating is None:
+        return 1.0
+    return 0.0 if rating <= 2 else rating / 2.5
+
+
+def _interactions(db: Session, user_id: int | None = None) -> dict[tuple[int, int], float]:
+    reviews = select(Review.user_id, Review.book_id, Review.rating).where(Review.is_hidden == False)  # noqa: E712
+    shelved = select(Shelf.user_id, shelf_books.c.book_id).join(Shelf, Shelf.id == shelf_books.c.shelf_id)
+    if user_id is not None:
+        reviews = reviews.where(Review.user_id == user_id)
+        shelved = shelved.where(Shelf.user_id == user_id)
+
+    ratings = {(u, b): r for u, b, r in db.execute(reviews)}
+    pairs = set(ratings) | {(u, b) for u, b in db.execute(shelved)}
+    out = {}
+    for pair in pairs:
+        weight = interaction_weight(ratings.get(pair))
+        if weight > 0:
+            out[pair] = weight
+    return out
+
+
+def user_interactions(db: Session, user_id: int) -> dict[int, float]:
+    return {book_id: w for (_, book_id), w in _interactions(db, user_id).items()}
+
+
+@dataclass(slots=True)
+class ItemKnnModel:
+    """Item-item cosine neighbors over the user x book interaction matrix.
+
+    `neighbors` is an items x items CSR matrix holding each item's top
+    similarities; scoring a user is one sparse row-vector product.
+    """
+
+    item_ids: np.ndarray
+    neighbors: sparse.csr_matrix
+    meta: dict = field(default_factory=dict)
+    _index: dict[int, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._index = {int(book_id): i for i, book_id in enumerate(self.item_ids)}
+
+    def known(self, interactions: dict[int, float]) -> dict[int, float]:
+        return {b: w for b, w in interactions.items() if b in self._index}
+
+    def recommend(self, interactions: dict[int, float], exclude: set[int], n: int) -> list[int]:
+        known = self.known(interactions)
+        if not known or n <= 0:
+            return []
+        rows = np.fromiter((self._index[b] for b in known), dtype=np.int64, count=len(known))
+        weights = np.fromiter(known.values(), dtype=np.float32, count=len(known))
+        scores = np.asarray(self.neighbors[rows].T @ weights).ravel()
+
+        drop = [self._index[b] for b in exclude if b in self._index]
+        scores[drop] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > n:
+            candidates = candidates[np.argpartition(-scores[candidates], n - 1)[:n]]
+        order = np.lexsort((self.item_ids[candidates], -scores[candidates]))
+        return self.item_ids[candidates[order]].tolist()
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez_compressed(
+            tmp,
+            item_ids=self.item_ids,
+            data=self.neighbors.data,
+            indices=self.neighbors.indices,
+            indptr=self.neighbors.indptr,
+            meta=np.array(json.dumps(self.meta)),
+        )
+        os.replace(tmp, path)  # readers never see a half-written file
+
+    @classmethod
+    def load(cls, path: str | Path) -> ItemKnnModel:
+        with np.load(path) as f:
+            n = len(f["item_ids"])
+            neighbors = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=(n, n))
+            return cls(item_ids=f["item_ids"], neighbors=neighbors, meta=json.loads(str(f["meta"])))
+
+
+def train_item_knn(
+    db: Session,
+    k: int = NEIGHBORS_PER_ITEM,
+    shrinkage: float = SHRINKAGE,
+    block_size: int = BLOCK_SIZE,
+) -> ItemKnnModel:
+    started = time.perf_counter()
+    interactions = _interactions(db)
+    if not interactions:
+        return ItemKnnModel(np.empty(0, dtype=np.int64), sparse.csr_matrix((0, 0), dtype=np.float32))
+
+    users = np.fromiter((u for u, _ in interactions), dtype=np.int64, count=len(interactions))
+    books = np.fromiter((b for _, b in interactions), dtype=np.int64, count=len(interactions))
+    weights = np.fromiter(interactions.values(), dtype=np.float32, count=len(interactions))
+    user_ids, user_rows = np.unique(users, return_inverse=True)
+    item_ids, item_cols = np.unique(books, return_inverse=True)
+
+    # items x users, so a block of item rows times the transpose gives co-occurrence
+    x = sparse.csr_matrix((weights, (item_cols, user_rows)), shape=(len(item_ids), len(user_ids)))
+    norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+    xt = x.T.tocsc()
+
+    n_items = len(item_ids)
+    k = min(k, max(n_items - 1, 0))
+    data: list[np.ndarray] = []
+    cols: list[np.ndarray] = []
+    counts = np.zeros(n_items, dtype=np.int64)
+    for start in range(0, n_items, block_size):
+        stop = min(start + block_size, n_items)
+        # stays sparse: only co-occurring pairs are scored, so memory follows
+        # the block's co-occurrences rather than block_size x number of items
+        sims = (x[start:stop] @ xt).tocsr()
+        rows = np.repeat(np.arange(start, stop), np.diff(sims.indptr))
+        sims.data /= norms[rows] * norms[sims.indices] + shrinkage
+        sims.data[sims.indices == rows] = 0.0  # never your own neighbor
+        if k == 0:
+            continue
+        for i in range(stop - start):
+            lo, hi = sims.indptr[i], sims.indptr[i + 1]
+            row_sims, row_cols = sims.data[lo:hi], sims.indices[lo:hi]
+            if hi - lo > k:
+                top = np.argpartition(-row_sims, k - 1)[:k]
+                row_sims, row_cols = row_sims[top], row_cols[top]
+            keep = row_sims > 0
+            data.append(row_sims[keep].astype(np.float32))
+            cols.append(row_cols[keep].astype(np.int64))
+            counts[start + i] = int(keep.sum())
+
+    indptr = np.concatenate(([0], np.cumsum(counts)))
+    neighbors = sparse.csr_matrix(
+        (
+            np.concatenate(data) if data else np.empty(0, dtype=np.float32),
+            np.concatenate(cols) if cols else np.empty(0, dtype=np.int64),
+            indptr,
+        ),
+        shape=(n_items, n_items),
+    )
+    meta = {
+        "trained_at": time.time(),
+        "users": int(len(user_ids)),
+        "items": int(n_items),
+        "interactions": int(len(interactions)),
+        "neighbors_per_item": k,
+        "shrinkage": shrinkage,
+        "train_seconds": round(time.perf_counter() - started, 3),
+    }
+    return ItemKnnModel(item_ids=item_ids, neighbors=neighbors, meta=meta)
+
+
+_lock = threading.Lock()
+_loaded: tuple[float, ItemKnnModel] | None = None
+
+
+def get_cf_model() -> ItemKnnModel | None:
+    """The model at CF_MODEL_PATH, reloaded when the file changes; None if absent."""
+    global _loaded
+    path = Path(settings.CF_MODEL_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    if _loaded is not None and _loaded[0] == mtime:
+        return _loaded[1]
+    with _lock:
+        if _loaded is None or _loaded[0] != mtime:
+            try:
+                _loaded = (mtime, ItemKnnModel.load(path))
+                logger.info("Loaded CF model from %s: %s", path, _loaded[1].meta)
+            except Exception:
+                logger.exception("Could not load CF model from %s", path)
+                return None
+        return _loaded[1]
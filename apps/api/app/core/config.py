@@ -15,6 +15,14 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_TTL_DAYS: int = 14
     MEDIA_DIR: str = "media"
 
+    AUTOCOMPLETE_REFRESH_SECONDS: int = 300
+    QUERY_STATS_ENABLED: bool = True
+    N_PLUS_ONE_THRESHOLD: int = 5
+    METRICS_ENABLED: bool = True
+    CF_MODEL_PATH: str = "data/item_knn.npz"
+    RECOMMENDATION_CACHE_TTL_SECONDS: int = 600
+    TASTE_COMPARE_CACHE_TTL_SECONDS: int = 600
+
     class Config:
         env_file = ".env"
 
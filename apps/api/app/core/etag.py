@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+ETAG_HEADER = "ETag"
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    # weak comparison: W/"x" and "x" refer to the same representation
+    bare = etag.removeprefix("W/")
+    return "*" in candidates or any(c.removeprefix("W/") == bare for c in candidates)
+
+
+def conditional_get(request: Request, response: Response, *parts: Any) -> Response | None:
+    """Tag `response` with an ETag built from `parts`.
+
+    Returns a ready 304 when the client's `If-None-Match` already names it, so
+    callers should pass only cheap version data and build the body afterwards.
+    """
+    etag = make_etag(*parts)
+    headers = {ETAG_HEADER: etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def bump_versions(db: Session, model: Any, *criteria: Any) -> None:
+    """Increment `model.version` for matching rows as part of the caller's transaction."""
+    db.execute(
+        update(model)
+        .where(*criteria)
+        .values(version=model.version + 1)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.models import ActivityEvent, Follow, User
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "nukbook_events"
+HEARTBEAT_SECONDS = 15.0
+QUEUE_SIZE = 64
+RECONNECT_SECONDS = 5.0
+
+_PENDING = "pending_events"
+
+# Messages are small JSON objects, so they fit NOTIFY's 8000 byte payload:
+#   {"user": id}                              counters of one user changed
+#   {"actor": id}                             counters of the actor's followers changed
+#   {"actor": id, "kind": k, "book_id": b}    ... and they get a new activity item
+# Each worker resolves them against its own connections only.
+
+
+def queue_event(db: Session, message: dict[str, Any]) -> None:
+    """Publish `message` once the caller's transaction commits.
+
+    On Postgres this is a transactional NOTIFY, delivered to every worker on
+    commit and dropped on rollback. Elsewhere there is a single process and
+    the message is handed to the local broker after commit.
+    """
+    payload = json.dumps(message, sort_keys=True, separators=(",", ":"))
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_notify(CHANNEL, payload)))
+    else:
+        db.info.setdefault(_PENDING, {})[payload] = message
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for message in session.info.pop(_PENDING, {}).values():
+        event_broker.publish(message)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, previous_transaction: Any) -> None:
+    session.info.pop(_PENDING, None)
+
+
+class EventBroker:
+    """Per-worker registry of open event streams.
+
+    An idle stream is one queue and one suspended coroutine. Messages are
+    resolved once per worker (one lookup of which local users they concern),
+    not once per connection.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._session_factory: Callable[[], Session] | None = None
+        self._listener: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def connections(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def start(self, session_factory: Callable[[], Session], database_url: str | None = None) -> None:
+        """Attach to the running loop; with a Postgres URL also LISTEN for other workers."""
+        self._loop = asyncio.get_running_loop()
+        self._session_factory = session_factory
+        if database_url and make_url(database_url).get_backend_name() == "postgresql":
+            self._listener = asyncio.create_task(self._listen(database_url))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._loop = None
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def publish(self, message: dict[str, Any]) -> None:
+        """Deliver `message` to this worker's streams; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._spawn, message)
+
+    def _spawn(self, message: dict[str, Any]) -> None:
+        task = asyncio.get_running_loop().create_task(self.dispatch(message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def dispatch(self, message: dict[str, Any]) -> None:
+        local = set(self._subscribers)
+        if not local or self._session_factory is None:
+            return
+        try:
+            deliveries = await run_in_threadpool(self._resolve, message, local)
+        except Exception:
+            logger.exception("Could not resolve event %s", message)
+            return
+        for user_id, name, data in deliveries:
+            for queue in list(self._subscribers.get(user_id, ())):
+                try:
+                    queue.put_nowait((name, data))
+                except asyncio.QueueFull:
+                    pass  # a stalled client; it resyncs from the next counters event
+
+    def _resolve(self, message: dict[str, Any], local: set[int]) -> list[tuple[int, str, Any]]:
+        from app.core.activity import activity_items
+
+        db = self._session_factory()
+        try:
+            if "user" in message:
+                targets = {message["user"]} & local
+            else:
+                targets = set(
+                    db.execute(
+                        select(Follow.requester_id).where(
+                            Follow.target_id == message["actor"],
+                            Follow.status == "accepted",
+                            Follow.requester_id.in_(local),
+                        )
+                    ).scalars()
+                )
+            if not targets:
+                return []
+
+            out: list[tuple[int, str, Any]] = []
+            if "book_id" in message:
+                item = db.execute(
+                    select(ActivityEvent).where(
+                        ActivityEvent.user_id == message["actor"],
+                        ActivityEvent.kind == message["kind"],
+                        ActivityEvent.book_id == message["book_id"],
+                    )
+                ).scalar_one_or_none()
+                items = activity_items(db, [item]) if item is not None else []
+                if items:
+                    data = items[0].model_dump(mode="json")
+                    out.extend((user_id, "activity", data) for user_id in targets)
+
+            for user_id, requests, activity in db.execute(
+                select(User.id, User.unread_requests_count, User.unread_activity_count).where(User.id.in_(targets))
+            ):
+                out.append((user_id, "notifications", {"requests": requests, "activity": activity}))
+            return out
+        finally:
+            db.close()
+
+    async def _listen(self, database_url: str) -> None:
+        import psycopg
+
+        conninfo = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    logger.info("Listening for events on %s", CHANNEL)
+                    async for notify in conn.notifies():
+                        try:
+                            message = json.loads(notify.payload)
+                        except ValueError:
+                            continue
+                        self._spawn(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event listener lost its connection; retrying")
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+
+event_broker = EventBroker()
+
+
+def format_sse(name: str, data: Any) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def event_stream(
+    queue: asyncio.Queue,
+    initial: dict[str, int],
+    is_disconnected: Callable[[], Awaitable[bool]],
+) -> AsyncIterator[str]:
+    """SSE frames for one client: current counters first, then pushed events."""
+    yield "retry: 5000\n\n"
+    yield format_sse("notifications", initial)
+    while not await is_disconnected():
+        try:
+            name, data = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            yield ": ping\n\n"  # keeps proxies from closing the stream and surfaces disconnects
+            continue
+        yield format_sse(name, data)
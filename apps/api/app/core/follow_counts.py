@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Follow, User
+
+
+def apply_follow_change(db: Session, requester_id: int, target_id: int, delta: int) -> None:
+    """An accepted follow was added (`delta=1`) or removed (`delta=-1`).
+
+    Runs inside the caller's transaction, next to the insert, status change
+    or delete of the `Follow` row.
+    """
+    db.execute(
+        update(User)
+        .where(User.id == requester_id)
+        .values(following_count=User.following_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(User)
+        .where(User.id == target_id)
+        .values(followers_count=User.followers_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def repair_follow_counts(db: Session, user_ids: list[int] | None = None) -> int:
+    """Recompute both counters from accepted follows; returns users updated."""
+    followers = (
+        select(func.count(Follow.id))
+        .where(Follow.target_id == User.id, Follow.status == "accepted")
+        .scalar_subquery()
+    )
+    following = (
+        select(func.count(Follow.id))
+        .where(Follow.requester_id == User.id, Follow.status == "accepted")
+        .scalar_subquery()
+    )
+    stmt = update(User).values(followers_count=followers, following_count=following)
+    if user_ids is not None:
+        stmt = stmt.where(User.id.in_(user_ids))
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount or 0
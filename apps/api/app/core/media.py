@@ -8,6 +8,7 @@ from fastapi import HTTPException, UploadFile
 from PIL import Image, ImageOps
 
 from app.core.config import settings
+from app.core.metrics import thumbnail_seconds
 
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/jpg", "image/png", "image/webp", "image/gif"}
 
@@ -91,7 +92,8 @@ def save_media_with_thumbs(file: UploadFile, subdir: str, sizes: dict[str, tuple
     thumbs: dict[str, str] = {}
 
     for label, size in sizes.items():
-        _save_thumbnail(path, label, size[0], size[1])
+        with thumbnail_seconds.time(label):
+            _save_thumbnail(path, label, size[0], size[1])
         thumbs[label] = _thumb_url(url, label)
 
     thumbs["original"] = url
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.events import queue_event
+from app.models import ActivityEvent, Follow, User
+
+PREVIEW_LIMIT = 5
+
+# The counters are maintained on write with the same meaning the old count
+# queries had: pending requests created after `last_requests_seen_at`, and
+# followees' activity events newer than `last_activity_seen_at` (NULL: never
+# looked, everything counts). Every update runs in the caller's transaction.
+
+
+def _shifted(column: Any, delta: Any) -> Any:
+    return case((column + delta > 0, column + delta), else_=0)
+
+
+def _execute(db: Session, stmt: Any) -> None:
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def _unseen_request(follow: Follow) -> Any:
+    return or_(User.last_requests_seen_at.is_(None), User.last_requests_seen_at < follow.created_at)
+
+
+def request_created(db: Session, target_id: int) -> None:
+    _execute(
+        db,
+        update(User)
+        .where(User.id == target_id)
+        .values(unread_requests_count=User.unread_requests_count + 1),
+    )
+    queue_event(db, {"user": target_id})
+
+
+def request_closed(db: Session, follow: Follow) -> None:
+    """`follow` stopped being pending (approved, denied or withdrawn)."""
+    _execute(
+        db,
+        update(User)
+        .where(User.id == follow.target_id, _unseen_request(follow))
+        .values(unread_requests_count=_shifted(User.unread_requests_count, -1)),
+    )
+    queue_event(db, {"user": follow.target_id})
+
+
+def _followers(actor_id: int) -> Any:
+    return select(Follow.requester_id).where(Follow.target_id == actor_id, Follow.status == "accepted")
+
+
+def activity_recorded(db: Session, actor_id: int, previous_at: datetime | None) -> None:
+    """An event of `actor_id` was created, or moved up from `previous_at`."""
+    stmt = update(User).where(User.id.in_(_followers(actor_id)))
+    if previous_at is not None:
+        # followers who had not seen the old position already count it
+        stmt = stmt.where(User.last_activity_seen_at >= previous_at)
+    _execute(db, stmt.values(unread_activity_count=User.unread_activity_count + 1))
+
+
+def activity_removed(db: Session, actor_id: int, previous_at: datetime) -> None:
+    _execute(
+        db,
+        update(User)
+        .where(
+            User.id.in_(_followers(actor_id)),
+            or_(User.last_activity_seen_at.is_(None), User.last_activity_seen_at < previous_at),
+        )
+        .values(unread_activity_count=_shifted(User.unread_activity_count, -1)),
+    )
+
+
+def follow_changed(db: Session, follower_id: int, target_id: int, sign: int) -> None:
+    """An accepted follow was added (`sign=1`) or removed (`sign=-1`).
+
+    The target's unseen events join or leave the follower's count; the
+    lookup is bounded by the target's `(user_id, created_at)` index.
+    """
+    unseen = (
+        select(func.count(ActivityEvent.id))
+        .where(
+            ActivityEvent.user_id == target_id,
+            or_(User.last_activity_seen_at.is_(None), ActivityEvent.created_at > User.last_activity_seen_at),
+        )
+        .scalar_subquery()
+    )
+    _execute(
+        db,
+        update(User)
+        .where(User.id == follower_id)
+        .values(unread_activity_count=_shifted(User.unread_activity_count, sign * unseen)),
+    )
+    queue_event(db, {"user": follower_id})
+
+
+def mark_seen(db: Session, user: User, now: datetime, requests: bool, activity: bool) -> None:
+    queue_event(db, {"user": user.id})  # the user's other tabs
+    if requests:
+        user.last_requests_seen_at = now
+        user.unread_requests_count = 0
+    if activity:
+        user.last_activity_seen_at = now
+        user.unread_activity_count = 0
+
+
+def repair_notification_counters(db: Session, user_ids: list[int] | None = None) -> int:
+    """Recompute both counters from follows and activity events; returns users updated."""
+    requests = (
+        select(func.count(Follow.id))
+        .where(
+            Follow.target_id == User.id,
+            Follow.status == "pending",
+            or_(User.last_requests_seen_at.is_(None), Follow.created_at > User.last_requests_seen_at),
+        )
+        .scalar_subquery()
+    )
+    activity = (
+        select(func.count(ActivityEvent.id))
+        .select_from(Follow)
+        .join(ActivityEvent, ActivityEvent.user_id == Follow.target_id)
+        .where(
+            Follow.requester_id == User.id,
+            Follow.status == "accepted",
+            or_(User.last_activity_seen_at.is_(None), ActivityEvent.created_at > User.last_activity_seen_at),
+        )
+        .scalar_subquery()
+    )
+    stmt = update(User).values(unread_requests_count=requests, unread_activity_count=activity)
+    if user_ids is not None:
+        stmt = stmt.where(User.id.in_(user_ids))
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount or 0
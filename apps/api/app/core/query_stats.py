@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+_PARAM = r"(?:\?|%\(\w+\)s|\$\d+)"
+_IN_LIST_RE = re.compile(rf"IN \({_PARAM}(?:,\s*{_PARAM})*\)", re.IGNORECASE)
+_WS_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with expanded IN lists collapsed, so batches of any size compare equal."""
+    return _IN_LIST_RE.sub("IN (...)", _WS_RE.sub(" ", statement).strip())
+
+
+@dataclass(slots=True)
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter[str] = field(default_factory=Counter)
+    statements: list[str] = field(default_factory=list)
+    keep_statements: bool = False
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[statement_shape(statement)] += 1
+        if self.keep_statements:
+            self.statements.append(statement)
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+# Sync routes run in a threadpool with a copy of the request context, so the
+# listeners see the same QueryStats objects the middleware installed. Nested
+# collectors (a test budget around a request) all receive every statement.
+_active: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+_START_KEY = "query_stats_started"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active.get():
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    collectors = _active.get()
+    started = conn.info.get(_START_KEY)
+    if not collectors or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    for stats in collectors:
+        stats.record(statement, elapsed)
+
+
+_installed = False
+
+
+def install() -> None:
+    """Attach the counting hooks to every Engine; safe to call more than once."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+@contextmanager
+def collect_queries(keep_statements: bool = False) -> Iterator[QueryStats]:
+    install()
+    stats = QueryStats(keep_statements=keep_statements)
+    token = _active.set((*_active.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+class QueryStatsMiddleware:
+    """Counts statements and DB time per request.
+
+    Adds `X-DB-Queries` and `Server-Timing` response headers and logs
+    statement shapes repeated `n_plus_one_threshold` times or more.
+    """
+
+    def __init__(self, app: Any, n_plus_one_threshold: int = 5) -> None:
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        install()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with collect_queries() as stats:
+
+            async def send_with_stats(message) -> None:
+                if message["type"] == "http.response.start":
+                    total_ms = (time.perf_counter() - started) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((DB_QUERIES_HEADER.lower().encode(), str(stats.count).encode()))
+                    headers.append(
+                        (
+                            SERVER_TIMING_HEADER.lower().encode(),
+                            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                            f"app;dur={total_ms:.1f}".encode(),
+                        )
+                    )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        if self.n_plus_one_threshold > 0:
+            for shape, n in stats.repeated_shapes(self.n_plus_one_threshold):
+                logger.warning("Possible N+1 on %s %s: %d x %s", scope["method"], scope["path"], n, shape[:300])
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """Test helper: fail if the block runs more than `max_queries` statements.
+
+    Wrap `TestClient` calls with it; the in-process client runs the request
+    under this block's context, so the count covers the whole endpoint.
+    """
+    with collect_queries(keep_statements=True) as stats:
+        yield stats
+    if stats.count > max_queries:
+        listing = "\n".join(f"  {s}" for s in stats.statements)
+        raise AssertionError(f"Expected at most {max_queries} queries, ran {stats.count}:\n{listing}")
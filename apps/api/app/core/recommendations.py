@@ -1,16 +1,42 @@
 from __future__ import annotations
 
-from app.models import Book
+from dataclasses import dataclass
+from typing import Any
 
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
 
-def score_candidate(book: Book, author_ids: set[int], tag_ids: set[int], genre_ids: set[int]) -> float:
-    score = 0.0
-    if any(a.id in author_ids for a in (book.authors or [])):
-        score += 2.0
-    score += sum(1.0 for t in (book.tags or []) if t.id in tag_ids)
-    score += sum(1.0 for g in (book.genres or []) if g.id in genre_ids)
-    score += (book.rating_avg or 0.0) / 5.0
-    return score
+from app.core.cache import GroupedTTLCache
+from app.core.config import settings
+from app.core.trait_index import trait_index
+from app.models import Book, BookRatingStats, book_authors, book_genres, book_tags
+
+# Most recent liked books used as seeds; older ones rarely change the ranking.
+MAX_SEEDS = 50
+# Length of the cached ranked list; pages past it come back empty.
+RANKED_LIMIT = 500
+
+AUTHOR_WEIGHT = 2.0
+# Candidate ids per rating lookup on the trait-index path
+RATING_CHUNK = 10_000
+
+# (link table, trait column) in the order seed_traits() returns them
+TRAIT_LINKS = (
+    (book_authors, book_authors.c.author_id),
+    (book_tags, book_tags.c.tag_id),
+    (book_genres, book_genres.c.genre_id),
+)
+
+
+# Ranked book ids per user, dropped whenever the user's reviews, reading
+# statuses or shelves change.
+recommendation_cache = GroupedTTLCache("recommendations", settings.RECOMMENDATION_CACHE_TTL_SECONDS)
+
+
+def invalidate_recommendations(user_id: int) -> None:
+    recommendation_cache.invalidate(user_id)
 
 
 def seed_traits(seed: Book) -> tuple[set[int], set[int], set[int]]:
@@ -20,5 +46,140 @@ def seed_traits(seed: Book) -> tuple[set[int], set[int], set[int]]:
     return author_ids, tag_ids, genre_ids
 
 
-def has_traits(author_ids: set[int], tag_ids: set[int], genre_ids: set[int]) -> bool:
-    return bool(author_ids or tag_ids or genre_ids)
+@dataclass(slots=True)
+class CandidateScores:
+    """Trait scores of every candidate against every seed.
+
+    `trait_scores` is a sparse candidate x seed matrix: entry `(i, j)` is the
+    score of `book_ids[i]` for `seeds[j]`, 2 for a shared author plus 1 per
+    shared tag and genre. The final score adds the candidate's average
+    rating / 5. Only the column or row maxima being ranked are made dense.
+    """
+
+    book_ids: np.ndarray
+    trait_scores: sparse.csr_matrix
+    ratings: np.ndarray
+
+    def _order(self, scores: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        idx = np.flatnonzero(mask)
+        # highest score first, lower id on ties
+        return self.book_ids[idx[np.lexsort((self.book_ids[idx], -scores[idx]))]]
+
+    def ranked_ids(self) -> list[int]:
+        """All candidates by their best score over any seed."""
+        if not len(self.book_ids):
+            return []
+        best = self.trait_scores.max(axis=1).toarray().ravel()
+        return self._order(best + self.ratings / 5.0, best > 0).tolist()
+
+    def top_for_seed(self, seed_index: int, limit: int) -> list[int]:
+        if not len(self.book_ids):
+            return []
+        column = self.trait_scores[:, seed_index].toarray().ravel()
+        return self._order(column + self.ratings / 5.0, column > 0)[:limit].tolist()
+
+
+def _index_links(db: Session, vocab: list[np.ndarray], excluded: Any):
+    trait_ids = [v.tolist() for v in vocab]
+    shelved = np.fromiter(db.execute(excluded).scalars(), dtype=np.int64)
+    candidates = trait_index.candidates(trait_ids, shelved).tolist()
+    book_col, kind_col, trait_col = trait_index.links(candidates, trait_ids)
+
+    ratings: dict[int, float] = {}
+    for start in range(0, len(candidates), RATING_CHUNK):
+        chunk = candidates[start : start + RATING_CHUNK]
+        ratings.update(
+            db.execute(
+                select(BookRatingStats.book_id, BookRatingStats.rating_avg).where(BookRatingStats.book_id.in_(chunk))
+            ).all()
+        )
+    return book_col, kind_col, trait_col, ratings
+
+
+def _sql_links(db: Session, vocab: list[np.ndarray], excluded: Any):
+    kinds = [(kind, table, trait_col) for kind, (table, trait_col) in enumerate(TRAIT_LINKS) if len(vocab[kind])]
+    # same candidates as TraitIndex.candidates(): the best-rated unshelved books of each trait
+    ranked = union_all(
+        *(
+            select(
+                table.c.book_id.label("book_id"),
+                func.row_number()
+                .over(
+                    partition_by=trait_col,
+                    order_by=(func.coalesce(BookRatingStats.rating_avg, 0.0).desc(), table.c.book_id),
+                )
+                .label("rank"),
+            )
+            .select_from(table.outerjoin(BookRatingStats, BookRatingStats.book_id == table.c.book_id))
+            .where(trait_col.in_(vocab[kind].tolist()))
+            .where(table.c.book_id.notin_(excluded))
+            for kind, table, trait_col in kinds
+        )
+    ).subquery()
+    candidates = select(ranked.c.book_id).where(ranked.c.rank <= trait_index.top_per_trait)
+
+    links = union_all(
+        *(
+            select(table.c.book_id.label("book_id"), literal(kind).label("kind"), trait_col.label("trait_id")).where(
+                trait_col.in_(vocab[kind].tolist())
+            )
+            for kind, table, trait_col in kinds
+        )
+    ).subquery()
+    rows = db.execute(
+        select(links.c.book_id, links.c.kind, links.c.trait_id, BookRatingStats.rating_avg)
+        .outerjoin(BookRatingStats, BookRatingStats.book_id == links.c.book_id)
+        .where(links.c.book_id.in_(candidates))
+    ).all()
+    book_col = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    kind_col = np.fromiter((r[1] for r in rows), dtype=np.int8, count=len(rows))
+    trait_col = np.fromiter((r[2] for r in rows), dtype=np.int64, count=len(rows))
+    return book_col, kind_col, trait_col, {r[0]: r[3] for r in rows}
+
+
+def score_candidates(db: Session, seeds: list[Book], excluded: Any) -> CandidateScores:
+    """Score the best-rated books of every trait shared with any seed.
+
+    `excluded` is a select of book ids to leave out (the user's shelves).
+    Each author, tag and genre contributes at most `trait_index.top_per_trait`
+    candidates, so the work is bounded by the seeds' traits rather than the
+    catalog; a candidate is then scored on all of its links to the seeds.
+    Candidates come from the in-memory trait index once it is built, and from
+    a single link-table query before that.
+    """
+    traits = [seed_traits(seed) for seed in seeds]
+    vocab = [
+        np.array(sorted(set().union(*(t[kind] for t in traits))), dtype=np.int64) for kind in range(len(TRAIT_LINKS))
+    ]
+    n_seeds = len(seeds)
+    empty = CandidateScores(np.empty(0, dtype=np.int64), sparse.csr_matrix((0, n_seeds)), np.empty(0))
+    if not any(len(v) for v in vocab):
+        return empty
+
+    fetch = _index_links if trait_index.ready else _sql_links
+    book_col, kind_col, trait_col, ratings_by_book = fetch(db, vocab, excluded)
+    if not len(book_col):
+        return empty
+
+    book_ids, cand_rows = np.unique(book_col, return_inverse=True)
+    ratings = np.array([ratings_by_book.get(b) or 0.0 for b in book_ids.tolist()])
+
+    trait_scores = sparse.csr_matrix((len(book_ids), n_seeds))
+    for kind in range(len(TRAIT_LINKS)):
+        if not len(vocab[kind]):
+            continue
+        sel = kind_col == kind
+        cols = np.searchsorted(vocab[kind], trait_col[sel])
+        cand = sparse.csr_matrix(
+            (np.ones(len(cols)), (cand_rows[sel], cols)), shape=(len(book_ids), len(vocab[kind]))
+        )
+        seed_rows = [j for j, t in enumerate(traits) for _ in t[kind]]
+        seed_cols = np.searchsorted(vocab[kind], [trait_id for t in traits for trait_id in sorted(t[kind])])
+        seed_matrix = sparse.csr_matrix(
+            (np.ones(len(seed_rows)), (seed_rows, seed_cols)), shape=(n_seeds, len(vocab[kind]))
+        )
+
+        shared = (cand @ seed_matrix.T).tocsr()
+        trait_scores = trait_scores + (AUTHOR_WEIGHT * shared.sign() if kind == 0 else shared)
+
+    return CandidateScores(book_ids, trait_scores.tocsr(), ratings)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import re
+from typing import Any, NamedTuple
+
+from sqlalchemy import Select, case, column, func, literal_column, or_, select, table
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.models import Author, Book, User
+from app.models.search_index import FTS_TABLES
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+TS_CONFIG = literal_column("'simple'")
+
+
+class SearchField(NamedTuple):
+    column: InstrumentedAttribute
+    fts_table: str
+    use_tsvector: bool
+
+
+SEARCH_FIELDS: dict[type, SearchField] = {
+    Book: SearchField(Book.title, FTS_TABLES["books"][0], True),
+    Author: SearchField(Author.name, FTS_TABLES["authors"][0], True),
+    User: SearchField(User.username, FTS_TABLES["users"][0], False),
+}
+
+
+def query_tokens(query: str) -> list[str]:
+    return TOKEN_RE.findall(query.lower())
+
+
+def _exactness(col: InstrumentedAttribute, query: str):
+    return case(
+        (func.lower(col) == query.lower(), 2),
+        (col.ilike(f"{query}%"), 1),
+        else_=0,
+    )
+
+
+def _postgres_stmt(model: type, field: SearchField, query: str, tokens: list[str]) -> Select[Any]:
+    col = field.column
+    conditions = [col.ilike(f"%{query}%"), col.bool_op("%")(query)]
+    rank = func.similarity(col, query)
+
+    if field.use_tsvector and tokens:
+        tsv = func.to_tsvector(TS_CONFIG, col)
+        tsq = func.to_tsquery(TS_CONFIG, " & ".join(f"{t}:*" for t in tokens))
+        conditions.append(tsv.bool_op("@@")(tsq))
+        rank = func.greatest(rank, func.ts_rank(tsv, tsq))
+
+    return (
+        select(model)
+        .where(or_(*conditions))
+        .order_by(_exactness(col, query).desc(), rank.desc(), col.asc())
+    )
+
+
+def _sqlite_stmt(model: type, field: SearchField, query: str, tokens: list[str]) -> Select[Any]:
+    fts = table(field.fts_table, column("rowid"))
+    fts_ref = literal_column(field.fts_table)
+    match = " ".join(f'"{t}"*' for t in tokens)
+
+    return (
+        select(model)
+        .join(fts, fts.c.rowid == model.id)
+        .where(fts_ref.match(match))
+        .order_by(_exactness(field.column, query).desc(), func.bm25(fts_ref), field.column.asc())
+    )
+
+
+def ranked_search_stmt(db: Session, model: type, query: str) -> Select[Any]:
+    """Relevance-ordered `select(model)` for a free-text query; callers add options and limit.
+
+    Postgres is served by the tsvector and pg_trgm GIN indexes, SQLite by the
+    FTS5 tables from `app.models.search_index`. Anything else (or a query with
+    no word characters) falls back to a plain substring match.
+    """
+    field = SEARCH_FIELDS[model]
+    tokens = query_tokens(query)
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        return _postgres_stmt(model, field, query, tokens)
+    if dialect == "sqlite" and tokens:
+        return _sqlite_stmt(model, field, query, tokens)
+
+    return (
+        select(model)
+        .where(field.column.ilike(f"%{query}%"))
+        .order_by(_exactness(field.column, query).desc(), field.column.asc())
+    )
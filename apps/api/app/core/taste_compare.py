@@ -1,6 +1,19 @@
 from __future__ import annotations
 
+import heapq
 import math
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core.cache import GroupedTTLCache
+from app.core.config import settings
+from app.models import Book, Review, User
 
 
 def compute_similarity_score(mean_abs_diff: float, common_count: int) -> float:
@@ -30,3 +43,219 @@ def compute_pearson_from_aggregates(
     if denom == 0:
         return None
     return numerator / denom
+
+
+def similarity_scores(mean_abs_diff: np.ndarray, common_count: np.ndarray) -> np.ndarray:
+    """Array version of `compute_similarity_score`."""
+    score = np.maximum(0.0, 1.0 - mean_abs_diff / 4.0) * 100.0
+    return np.where(common_count > 0, np.round(score, 1), 0.0)
+
+
+def pearson_from_aggregates(
+    count: np.ndarray,
+    sum_x: np.ndarray,
+    sum_y: np.ndarray,
+    sum_x2: np.ndarray,
+    sum_y2: np.ndarray,
+    sum_xy: np.ndarray,
+) -> np.ndarray:
+    """Array version of `compute_pearson_from_aggregates`; NaN where it returns None."""
+    n = np.maximum(count, 1).astype(np.float64)
+    mean_x = sum_x / n
+    mean_y = sum_y / n
+    numerator = sum_xy - n * mean_x * mean_y
+    denom = np.sqrt((sum_x2 - n * mean_x * mean_x) * (sum_y2 - n * mean_y * mean_y))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = numerator / denom
+    out[(count < 5) | (denom == 0) | ~np.isfinite(denom)] = np.nan
+    return out
+
+
+class SharedRating(NamedTuple):
+    book_id: int
+    title: str
+    viewer_rating: int
+    target_rating: int
+    diff: int
+
+
+@dataclass(frozen=True, slots=True)
+class PairSummary:
+    shared: tuple[SharedRating, ...]
+    common_count: int
+    mean_abs_diff: float
+    similarity_score: float
+    pearson: float | None
+    agreements: tuple[SharedRating, ...]
+    disagreements: tuple[SharedRating, ...]
+
+
+SHARED_SORTS: dict[str, Callable[[SharedRating], tuple]] = {
+    "diff_desc": lambda r: (-r.diff, r.title),
+    "diff_asc": lambda r: (r.diff, r.title),
+    "title": lambda r: (r.title,),
+    "viewer_rating": lambda r: (-r.viewer_rating, r.title),
+    "target_rating": lambda r: (-r.target_rating, r.title),
+}
+
+# One entry per pair, keyed by both users' reviews_version: any review write
+# makes the old entry unreachable on every worker without an invalidation
+# message, and the next compute replaces it.
+pair_summary_cache = GroupedTTLCache(
+    "taste_compare", settings.TASTE_COMPARE_CACHE_TTL_SECONDS, latest_key_only=True
+)
+
+
+def bump_reviews_version(db: Session, user_id: int) -> None:
+    """Call in the same transaction as any change to `user_id`'s reviews."""
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(reviews_version=User.reviews_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bump_book_reviewers_version(db: Session, book_id: int) -> None:
+    """Call when `book_id`'s title changes or it is deleted along with its reviews."""
+    db.execute(
+        update(User)
+        .where(User.id.in_(select(Review.user_id).where(Review.book_id == book_id)))
+        .values(reviews_version=User.reviews_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def compute_pair_summary(db: Session, viewer_id: int, target_id: int) -> PairSummary:
+    """Everything derived from the two users' co-rated books, from one query."""
+    viewer_review = aliased(Review)
+    target_review = aliased(Review)
+    rows = db.execute(
+        select(viewer_review.book_id, Book.title, viewer_review.rating, target_review.rating)
+        .select_from(viewer_review)
+        .join(
+            target_review,
+            and_(
+                target_review.book_id == viewer_review.book_id,
+                target_review.user_id == target_id,
+                target_review.is_hidden == False,  # noqa: E712
+            ),
+        )
+        .join(Book, Book.id == viewer_review.book_id)
+        .where(
+            viewer_review.user_id == viewer_id,
+            viewer_review.is_hidden == False,  # noqa: E712
+        )
+    ).all()
+
+    shared = tuple(SharedRating(b, title, x, y, abs(x - y)) for b, title, x, y in rows)
+    n = len(shared)
+    mean_abs_diff = sum(r.diff for r in shared) / n if n else 0.0
+    pearson = compute_pearson_from_aggregates(
+        n,
+        float(sum(r.viewer_rating for r in shared)),
+        float(sum(r.target_rating for r in shared)),
+        float(sum(r.viewer_rating * r.viewer_rating for r in shared)),
+        float(sum(r.target_rating * r.target_rating for r in shared)),
+        float(sum(r.viewer_rating * r.target_rating for r in shared)),
+    )
+    agreements = heapq.nsmallest(
+        5, shared, key=lambda r: (r.diff, -(r.viewer_rating + r.target_rating), r.title)
+    )
+    disagreements = heapq.nsmallest(
+        5, shared, key=lambda r: (-r.diff, -max(r.viewer_rating, r.target_rating), r.title)
+    )
+    return PairSummary(
+        shared=shared,
+        common_count=n,
+        mean_abs_diff=mean_abs_diff,
+        similarity_score=compute_similarity_score(mean_abs_diff, n),
+        pearson=pearson,
+        agreements=tuple(agreements),
+        disagreements=tuple(disagreements),
+    )
+
+
+def pair_summary(db: Session, viewer: User, target: User) -> PairSummary:
+    return pair_summary_cache.get_or_compute(
+        (viewer.id, target.id),
+        (viewer.reviews_version, target.reviews_version),
+        lambda: compute_pair_summary(db, viewer.id, target.id),
+    )
+
+
+def shared_page(summary: PairSummary, sort: str, limit: int, offset: int) -> list[SharedRating]:
+    return sorted(summary.shared, key=SHARED_SORTS[sort])[offset : offset + limit]
+
+
+@dataclass(frozen=True, slots=True)
+class Compatibility:
+    user_id: int
+    common_count: int
+    similarity_score: float
+    pearson: float | None
+
+
+def compute_compatibility(db: Session, viewer_id: int, user_ids: list[int]) -> list[Compatibility]:
+    """Taste compare summaries of `viewer_id` against each of `user_ids` at once.
+
+    One query joins the viewer's visible ratings to the others'; per-user
+    sums then come from `np.bincount` over the joined rating pairs.
+    """
+    if not user_ids:
+        return []
+    viewer_review = aliased(Review)
+    other_review = aliased(Review)
+    rows = np.array(
+        db.execute(
+            select(other_review.user_id, viewer_review.rating, other_review.rating)
+            .select_from(viewer_review)
+            .join(
+                other_review,
+                and_(
+                    other_review.book_id == viewer_review.book_id,
+                    other_review.user_id.in_(user_ids),
+                    other_review.is_hidden == False,  # noqa: E712
+                ),
+            )
+            .where(viewer_review.user_id == viewer_id, viewer_review.is_hidden == False)  # noqa: E712
+        ).all(),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+
+    ids = np.asarray(user_ids, dtype=np.int64)
+    order = np.argsort(ids)
+    slot = order[np.searchsorted(ids, rows[:, 0], sorter=order)]
+    x = rows[:, 1].astype(np.float64)
+    y = rows[:, 2].astype(np.float64)
+
+    def per_user(weights: np.ndarray | None = None) -> np.ndarray:
+        return np.bincount(slot, weights=weights, minlength=len(ids))
+
+    count = per_user().astype(np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_abs_diff = np.where(count > 0, per_user(np.abs(x - y)) / count, 0.0)
+    scores = similarity_scores(mean_abs_diff, count)
+    pearson = pearson_from_aggregates(
+        count, per_user(x), per_user(y), per_user(x * x), per_user(y * y), per_user(x * y)
+    )
+
+    return [
+        Compatibility(
+            user_id=int(user_id),
+            common_count=int(n),
+            similarity_score=float(score),
+            pearson=None if np.isnan(r) else float(r),
+        )
+        for user_id, n, score, r in zip(ids.tolist(), count.tolist(), scores.tolist(), pearson.tolist())
+    ]
+
+
+def followee_compatibility(db: Session, viewer: User, followees: list[tuple[int, int]]) -> list[Compatibility]:
+    """`followees` are `(user_id, reviews_version)` pairs; cached like `pair_summary`."""
+    key = (viewer.reviews_version, tuple(sorted(followees)))
+    return pair_summary_cache.get_or_compute(
+        ("followees", viewer.id),
+        key,
+        lambda: compute_compatibility(db, viewer.id, [user_id for user_id, _ in followees]),
+    )
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Book, BookRatingStats, book_authors, book_genres, book_tags
+
+logger = logging.getLogger(__name__)
+
+# Same order as recommendations.TRAIT_LINKS / seed_traits()
+KINDS = ("author", "tag", "genre")
+_LINKS = {
+    "author": (book_authors, "author_id"),
+    "tag": (book_tags, "tag_id"),
+    "genre": (book_genres, "genre_id"),
+}
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+# Best-rated unshelved books per trait that may become recommendation
+# candidates, so a broad genre does not pull in most of the catalog.
+TOP_PER_TRAIT = 200
+
+
+class TraitIndex:
+    """Inverted index from author, tag and genre ids to book id arrays.
+
+    Each posting lists the trait's books best-rated first, so candidates are
+    read from its head. Posting arrays are replaced rather than mutated, so a
+    reader holding one never sees a half-applied update. Admin book writes
+    update it incrementally; `rebuild` reloads everything from the link tables.
+    Ratings are read at rebuild time only: until the next rebuild a newly
+    linked book is placed last, like an unrated one.
+    """
+
+    def __init__(self, top_per_trait: int = TOP_PER_TRAIT) -> None:
+        self._lock = threading.Lock()
+        self._postings: dict[str, dict[int, np.ndarray]] = {kind: {} for kind in KINDS}
+        self._book_traits: dict[int, tuple[tuple[int, ...], ...]] = {}
+        self.top_per_trait = top_per_trait
+        self.ready = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings = {kind: {} for kind in KINDS}
+            self._book_traits = {}
+            self.ready = False
+
+    def rebuild(self, db: Session) -> None:
+        ratings = dict(db.execute(select(BookRatingStats.book_id, BookRatingStats.rating_avg)).all())
+
+        def best_rated(books: np.ndarray) -> np.ndarray:
+            avgs = np.fromiter((ratings.get(b) or 0.0 for b in books.tolist()), dtype=np.float64, count=len(books))
+            # highest rating first, lower id on ties
+            return books[np.lexsort((books, -avgs))]
+
+        postings: dict[str, dict[int, np.ndarray]] = {}
+        per_book: dict[int, list[list[int]]] = defaultdict(lambda: [[] for _ in KINDS])
+        for k, kind in enumerate(KINDS):
+            table, column = _LINKS[kind]
+            pairs = np.array(
+                db.execute(select(table.c[column], table.c.book_id)).all(), dtype=np.int64
+            ).reshape(-1, 2)
+            pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+            trait_ids, starts = np.unique(pairs[:, 0], return_index=True)
+            postings[kind] = {
+                int(t): best_rated(books) for t, books in zip(trait_ids.tolist(), np.split(pairs[:, 1], starts[1:]))
+            }
+            for trait_id, book_id in pairs.tolist():
+                per_book[book_id][k].append(trait_id)
+
+        book_traits = {book_id: tuple(tuple(ids) for ids in lists) for book_id, lists in per_book.items()}
+        with self._lock:
+            self._postings = postings
+            self._book_traits = book_traits
+            self.ready = True
+
+        logger.info("Trait index rebuilt: %s", self.stats())
+
+    def _set_book_locked(self, book_id: int, traits: tuple[tuple[int, ...], ...]) -> None:
+        old = self._book_traits.pop(book_id, tuple(() for _ in KINDS))
+        for k, kind in enumerate(KINDS):
+            postings = self._postings[kind]
+            for trait_id in set(old[k]) - set(traits[k]):
+                books = postings.get(trait_id, _EMPTY)
+                remaining = books[books != book_id]
+                if len(remaining):
+                    postings[trait_id] = remaining
+                else:
+                    postings.pop(trait_id, None)
+            for trait_id in set(traits[k]) - set(old[k]):
+                postings[trait_id] = np.append(postings.get(trait_id, _EMPTY), book_id)
+        if any(traits):
+            self._book_traits[book_id] = traits
+
+    def upsert_book(self, book: Book) -> None:
+        traits = (
+            tuple(sorted(a.id for a in (book.authors or []))),
+            tuple(sorted(t.id for t in (book.tags or []))),
+            tuple(sorted(g.id for g in (book.genres or []))),
+        )
+        with self._lock:
+            self._set_book_locked(book.id, traits)
+
+    def remove_book(self, book_id: int) -> None:
+        with self._lock:
+            self._set_book_locked(book_id, tuple(() for _ in KINDS))
+
+    def candidates(self, trait_ids: list[list[int]], excluded: np.ndarray = _EMPTY) -> np.ndarray:
+        """Sorted ids of the `top_per_trait` best-rated books of every trait in `trait_ids`.
+
+        `trait_ids[k]` lists the wanted ids of `KINDS[k]`. Books in `excluded`
+        are skipped before the cut, so they never take a trait's slots. Only
+        the head of each posting is read: at most `top_per_trait` plus the
+        number of excluded books.
+        """
+        depth = self.top_per_trait + len(excluded)
+        with self._lock:
+            heads = [
+                self._postings[kind].get(trait_id, _EMPTY)[:depth]
+                for k, kind in enumerate(KINDS)
+                for trait_id in trait_ids[k]
+            ]
+        tops = [head[~np.isin(head, excluded)][: self.top_per_trait] for head in heads]
+        if not tops:
+            return _EMPTY
+        return np.unique(np.concatenate(tops))
+
+    def links(self, book_ids: list[int], trait_ids: list[list[int]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """`(book_id, kind, trait_id)` columns for every link of `book_ids` to one of `trait_ids`.
+
+        One entry per (book, trait) link, like a scan of the link tables would.
+        """
+        wanted = [set(ids) for ids in trait_ids]
+        with self._lock:
+            found = [
+                (book_id, k, trait_id)
+                for book_id in book_ids
+                for k, ids in enumerate(self._book_traits.get(book_id, ()))
+                for trait_id in ids
+                if trait_id in wanted[k]
+            ]
+        if not found:
+            return _EMPTY, np.empty(0, dtype=np.int8), _EMPTY
+        books, kinds, traits = zip(*found)
+        return np.array(books, dtype=np.int64), np.array(kinds, dtype=np.int8), np.array(traits, dtype=np.int64)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            out = {"books": len(self._book_traits)}
+            size = 0
+            for kind in KINDS:
+                postings = self._postings[kind]
+                out[f"{kind}_traits"] = len(postings)
+                out[f"{kind}_links"] = int(sum(len(p) for p in postings.values()))
+                size += sum(p.nbytes for p in postings.values())
+            out["posting_bytes"] = size
+            return out
+
+
+trait_index = TraitIndex()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import insert_if_missing
+from app.models import BookPopularity, BookPopularityEvent, ReadingStatus, Review, book_genres
+
+HALF_LIFE_DAYS = 7.0
+DECAY_PER_SECOND = math.log(2) / (HALF_LIFE_DAYS * 86400)
+
+# Forward decay: an event at time t adds weight * 2^((t - EPOCH) / half-life),
+# so stored scores never need rewriting as time passes and ordering by the
+# stored score is ordering by the decayed score. Doubles hold about 1000
+# half-lives (~19 years at 7 days) before the epoch has to move.
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+EVENT_WEIGHTS = {
+    "review": 3.0,
+    "status": 2.0,
+    "shelf": 1.0,
+}
+
+# compaction drops rows whose decayed score fell below this (~one shelf add
+# five half-lives ago)
+MIN_DECAYED_SCORE = 1.0 / 32
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(at: datetime) -> datetime:
+    return at if at.tzinfo is not None else at.replace(tzinfo=timezone.utc)
+
+
+def growth(at: datetime) -> float:
+    return math.exp(DECAY_PER_SECOND * (_as_utc(at) - EPOCH).total_seconds())
+
+
+def record_popularity(db: Session, user_id: int, book_id: int, kind: str, at: datetime | None = None) -> None:
+    """Add one `kind` event for `book_id` unless `user_id` already caused one.
+
+    Each user counts at most once per kind and book, so toggling a reading
+    status or re-shelving a book does not move its score. Runs inside the
+    caller's transaction so the score commits together with the review,
+    status or shelf change.
+    """
+    at = at or _now()
+    # the event's primary key decides who counts; a concurrent duplicate inserts nothing
+    if not insert_if_missing(db, BookPopularityEvent, user_id=user_id, book_id=book_id, kind=kind, created_at=at):
+        return
+
+    # create the row race-free, then lock it; concurrent boosts apply in turn
+    insert_if_missing(db, BookPopularity, book_id=book_id, score=0.0)
+    row = db.get(BookPopularity, book_id, with_for_update=True, populate_existing=True)
+    row.score += EVENT_WEIGHTS[kind] * growth(at)
+    db.flush()  # a later get(populate_existing=True) would drop an unflushed score
+
+
+def trending_book_ids(db: Session, limit: int, genre_id: int | None = None) -> list[int]:
+    stmt = select(BookPopularity.book_id).order_by(BookPopularity.score.desc(), BookPopularity.book_id.asc())
+    if genre_id is not None:
+        stmt = stmt.join(book_genres, book_genres.c.book_id == BookPopularity.book_id).where(
+            book_genres.c.genre_id == genre_id
+        )
+    return list(db.execute(stmt.limit(limit)).scalars().all())
+
+
+def compact_book_popularity(db: Session, now: datetime | None = None) -> int:
+    """Delete rows that decayed below MIN_DECAYED_SCORE; returns rows removed."""
+    threshold = MIN_DECAYED_SCORE * growth(now or _now())
+    result = db.execute(delete(BookPopularity).where(BookPopularity.score < threshold))
+    db.commit()
+    return result.rowcount or 0
+
+
+def rebuild_book_popularity(db: Session, now: datetime | None = None) -> int:
+    """Recompute scores from reviews, reading statuses and shelf adds; returns rows written.
+
+    Reviews and statuses are one row per user and book already; shelf adds
+    come from the recorded first-shelving events. Events that would already
+    be compacted away are skipped.
+    """
+    now = now or _now()
+    shelf_event = BookPopularityEvent.kind == "shelf"
+    sources = (
+        ("review", select(Review.book_id, Review.created_at), Review.created_at),
+        ("status", select(ReadingStatus.book_id, ReadingStatus.created_at), ReadingStatus.created_at),
+        (
+            "shelf",
+            select(BookPopularityEvent.book_id, BookPopularityEvent.created_at).where(shelf_event),
+            BookPopularityEvent.created_at,
+        ),
+    )
+
+    scores: dict[int, float] = {}
+    for kind, stmt, at_col in sources:
+        weight = EVENT_WEIGHTS[kind]
+        # weight * growth(at) >= MIN * growth(now)  <=>  age <= log(weight / MIN) / decay
+        horizon = timedelta(seconds=math.log(weight / MIN_DECAYED_SCORE) / DECAY_PER_SECOND)
+        for book_id, at in db.execute(stmt.where(at_col >= now - horizon)):
+            scores[book_id] = scores.get(book_id, 0.0) + weight * growth(at)
+
+    db.execute(delete(BookPopularity))
+    if scores:
+        db.execute(insert(BookPopularity.__table__), [{"book_id": b, "score": s} for b, s in scores.items()])
+    db.commit()
+    return len(scores)
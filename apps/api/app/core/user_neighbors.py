@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import Review, UserNeighbor
+
+logger = logging.getLogger(__name__)
+
+NEIGHBORS_PER_USER = 50
+BLOCK_SIZE = 512
+# users with fewer visible ratings have no usable taste vector
+MIN_RATINGS = 3
+# pairs sharing fewer rated books are too noisy to suggest
+MIN_COMMON = 3
+
+LSH_TABLES = 8
+LSH_BITS = 12
+# buckets larger than this are skipped (degenerate hash, e.g. very sparse vectors)
+LSH_MAX_BUCKET = 2000
+
+
+@dataclass(slots=True)
+class RatingVectors:
+    """Per-user rating vectors over books; row `i` is `user_ids[i]`.
+
+    `vectors` holds mean-centered ratings scaled to unit length, so a dot
+    product is the cosine of the centered vectors (Pearson over the union of
+    rated books). `rated` is the 0/1 pattern, for co-rated counts.
+    """
+
+    user_ids: np.ndarray
+    vectors: sparse.csr_matrix
+    rated: sparse.csr_matrix
+
+
+def load_rating_vectors(db: Session, min_ratings: int = MIN_RATINGS) -> RatingVectors:
+    rows = np.array(
+        db.execute(
+            select(Review.user_id, Review.book_id, Review.rating).where(Review.is_hidden == False)  # noqa: E712
+        ).all(),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    user_ids, users = np.unique(rows[:, 0], return_inverse=True)
+    _, books = np.unique(rows[:, 1], return_inverse=True)
+    n_books = int(books.max()) + 1 if len(books) else 0
+
+    ratings = rows[:, 2].astype(np.float64)
+    counts = np.bincount(users, minlength=len(user_ids))
+    means = np.bincount(users, weights=ratings, minlength=len(user_ids)) / np.maximum(counts, 1)
+    centered = ratings - means[users]
+    norms = np.sqrt(np.bincount(users, weights=centered * centered, minlength=len(user_ids)))
+
+    # someone who gives every book the same rating has no direction to compare
+    kept = (counts >= min_ratings) & (norms > 0)
+    mask = kept[users]
+    new_rows = (np.cumsum(kept) - 1)[users[mask]]
+    shape = (int(kept.sum()), n_books)
+    vectors = sparse.csr_matrix(
+        ((centered[mask] / norms[users[mask]]).astype(np.float32), (new_rows, books[mask])), shape=shape
+    )
+    rated = sparse.csr_matrix((np.ones(len(new_rows), dtype=np.float32), (new_rows, books[mask])), shape=shape)
+    return RatingVectors(user_ids=user_ids[kept], vectors=vectors, rated=rated)
+
+
+def _rows_out(
+    rv: RatingVectors, owners: np.ndarray, others: np.ndarray, scores: np.ndarray, common: np.ndarray
+) -> list[dict]:
+    return [
+        {"user_id": u, "neighbor_id": n, "score": s, "common_count": c}
+        for u, n, s, c in zip(
+            rv.user_ids[owners].tolist(),
+            rv.user_ids[others].tolist(),
+            scores.tolist(),
+            common.astype(np.int64).tolist(),
+        )
+    ]
+
+
+def exact_neighbors(
+    rv: RatingVectors,
+    k: int = NEIGHBORS_PER_USER,
+    min_common: int = MIN_COMMON,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[list[dict]]:
+    """Top-`k` neighbors of every user by blocked sparse x sparse products.
+
+    Memory is bounded by `block_size` x number of users; time is quadratic
+    in users, see `lsh_neighbors` for large user bases.
+    """
+    n = len(rv.user_ids)
+    k = min(k, max(n - 1, 0))
+    if k == 0:
+        return
+    vt = rv.vectors.T.tocsc()
+    rt = rv.rated.T.tocsc()
+    for start in range(0, n, block_size):
+        rows = np.arange(start, min(start + block_size, n))
+        sims = (rv.vectors[rows] @ vt).toarray()
+        common = (rv.rated[rows] @ rt).toarray()
+        sims[common < min_common] = 0.0
+        sims[np.arange(len(rows)), rows] = 0.0  # never your own neighbor
+
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_sims = np.take_along_axis(top_sims, order, axis=1)
+        keep = top_sims > 0
+        owners = np.broadcast_to(rows[:, None], top.shape)
+        yield _rows_out(
+            rv, owners[keep], top[keep], top_sims[keep], np.take_along_axis(common, top, axis=1)[keep]
+        )
+
+
+def lsh_neighbors(
+    rv: RatingVectors,
+    k: int = NEIGHBORS_PER_USER,
+    min_common: int = MIN_COMMON,
+    tables: int = LSH_TABLES,
+    bits: int = LSH_BITS,
+    seed: int = 0,
+    max_bucket: int = LSH_MAX_BUCKET,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[list[dict]]:
+    """Approximate top-`k` neighbors via random-hyperplane LSH.
+
+    Each table hashes users by the signs of `bits` random projections, so
+    users with a small angle between them tend to share a bucket; only pairs
+    that share a bucket in some table are scored (exactly). More tables raise
+    recall, more bits shrink the buckets.
+
+    Candidates are gathered and scored for `block_size` users at a time, so
+    memory is bounded by `block_size` x `tables` x `max_bucket` pairs rather
+    than by every pair of every bucket.
+    """
+    n, n_books = rv.vectors.shape
+    if n < 2:
+        return
+    rng = np.random.default_rng(seed)
+    weights = 1 << np.arange(bits, dtype=np.int64)
+    # per table: users in bucket order, and where each user's bucket starts and how long it is
+    buckets: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    for _ in range(tables):
+        planes = rng.standard_normal((n_books, bits)).astype(np.float32)
+        codes = (np.asarray(rv.vectors @ planes) > 0).astype(np.int64) @ weights
+        order = np.argsort(codes, kind="stable")
+        _, starts, inverse, sizes = np.unique(
+            codes[order], return_index=True, return_inverse=True, return_counts=True
+        )
+        bucket_start = np.empty(n, dtype=np.int64)
+        bucket_size = np.empty(n, dtype=np.int64)
+        bucket_start[order] = starts[inverse]
+        bucket_size[order] = sizes[inverse]
+        bucket_size[(bucket_size < 2) | (bucket_size > max_bucket)] = 0
+        buckets.append((order, bucket_start, bucket_size))
+
+    vt = rv.vectors.T.tocsc()
+    rt = rv.rated.T.tocsc()
+    for start in range(0, n, block_size):
+        rows = np.arange(start, min(start + block_size, n))
+        pair_i: list[np.ndarray] = []
+        pair_j: list[np.ndarray] = []
+        for order, bucket_start, bucket_size in buckets:
+            sizes = bucket_size[rows]
+            offsets = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            pair_i.append(np.repeat(rows, sizes))
+            pair_j.append(order[np.repeat(bucket_start[rows], sizes) + offsets])
+
+        pairs = np.unique(np.concatenate(pair_i) * n + np.concatenate(pair_j))
+        owners, others = pairs // n, pairs % n
+        keep = owners != others
+        owners, others = owners[keep], others[keep]
+        if not len(owners):
+            continue
+
+        # products of the block against its candidates only, read at the candidate pairs
+        candidates, cols = np.unique(others, return_inverse=True)
+        local = owners - start
+        sims = np.asarray((rv.vectors[rows] @ vt[:, candidates]).tocsr()[local, cols]).ravel()
+        common = np.asarray((rv.rated[rows] @ rt[:, candidates]).tocsr()[local, cols]).ravel()
+        keep = (sims > 0) & (common >= min_common)
+        owners, others, sims, common = owners[keep], others[keep], sims[keep], common[keep]
+
+        order = np.lexsort((others, -sims, owners))
+        owners, others, sims, common = owners[order], others[order], sims[order], common[order]
+        first = np.searchsorted(owners, owners)  # index where each owner's run starts
+        top = np.arange(len(owners)) - first < k
+        yield _rows_out(rv, owners[top], others[top], sims[top], common[top])
+
+
+def rebuild_user_neighbors(
+    db: Session,
+    k: int = NEIGHBORS_PER_USER,
+    lsh: bool = False,
+    **options,
+) -> int:
+    """Recompute every user's top-`k` neighbors; returns rows written.
+
+    `options` go to `exact_neighbors` or, with `lsh`, to `lsh_neighbors`.
+    """
+    rv = load_rating_vectors(db)
+    batches = lsh_neighbors(rv, k, **options) if lsh else exact_neighbors(rv, k, **options)
+    db.execute(delete(UserNeighbor))
+
+    written = 0
+    for batch in batches:
+        if batch:
+            db.execute(insert(UserNeighbor.__table__), batch)
+            written += len(batch)
+
+    db.commit()
+    logger.info("Rebuilt user neighbors for %d users (%d rows, lsh=%s)", len(rv.user_ids), written, lsh)
+    return written
@@ -1,7 +1,15 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import InstrumentedQueuePool, register_pool_gauges
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+_engine_kwargs = {}
+if make_url(settings.DATABASE_URL).get_backend_name() != "sqlite":
+    # SQLite picks its own pool class; everything else gets checkout-wait timing
+    _engine_kwargs["poolclass"] = InstrumentedQueuePool
+
+engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, **_engine_kwargs)
+register_pool_gauges(engine)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
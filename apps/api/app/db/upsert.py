@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def insert_if_missing(db: Session, model: Any, **values: Any) -> bool:
+    """`INSERT ... ON CONFLICT DO NOTHING` of one `model` row; True if it was inserted.
+
+    Unlike `db.add`, two transactions racing to create the same row never
+    fail: the loser waits for the winner and inserts nothing. Runs inside the
+    caller's transaction.
+    """
+    dialect = sqlite if db.get_bind().dialect.name == "sqlite" else postgresql
+    stmt = dialect.insert(model).values(**values).on_conflict_do_nothing()
+    return db.execute(stmt).rowcount == 1
@@ -1,10 +1,22 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from app.core.autocomplete import autocomplete_index
 from app.core.config import settings
+from app.core.etag import ETAG_HEADER
+from app.core.events import event_broker
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, registry
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_stats import DB_QUERIES_HEADER, SERVER_TIMING_HEADER, QueryStatsMiddleware
+from app.core.trait_index import trait_index
+from app.db.session import SessionLocal
 from app.routers.auth import router as auth_router
 from app.routers.books import router as books_router
 from app.routers.authors import router as authors_router
@@ -22,8 +34,66 @@ from app.routers.recommendations import router as recommendations_router
 from app.routers.social import router as social_router
 from app.routers.search import router as search_router
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="nukBook API")
+
+def _rebuild_autocomplete() -> None:
+    db = SessionLocal()
+    try:
+        autocomplete_index.rebuild(db)
+    finally:
+        db.close()
+
+
+def _rebuild_trait_index() -> None:
+    db = SessionLocal()
+    try:
+        trait_index.rebuild(db)
+    finally:
+        db.close()
+
+
+async def _refresh_autocomplete(interval: int) -> None:
+    # Incremental updates only reach the worker that handled the write,
+    # so every worker also reloads the indexes on a timer.
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_rebuild_autocomplete)
+        except Exception:
+            logger.exception("Autocomplete index refresh failed")
+        try:
+            await run_in_threadpool(_rebuild_trait_index)
+        except Exception:
+            logger.exception("Trait index refresh failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await run_in_threadpool(_rebuild_autocomplete)
+    except Exception:
+        logger.exception("Autocomplete index build failed; /search falls back to the database")
+    try:
+        await run_in_threadpool(_rebuild_trait_index)
+    except Exception:
+        logger.exception("Trait index build failed; recommendations fall back to the database")
+
+    refresher = None
+    if settings.AUTOCOMPLETE_REFRESH_SECONDS > 0:
+        refresher = asyncio.create_task(_refresh_autocomplete(settings.AUTOCOMPLETE_REFRESH_SECONDS))
+
+    # /me/events; on Postgres every worker LISTENs so writes reach streams held by the others
+    event_broker.start(SessionLocal, settings.DATABASE_URL)
+
+    yield
+
+    if refresher is not None:
+        refresher.cancel()
+    await event_broker.stop()
+
+
+app = FastAPI(title="nukBook API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,8 +101,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, DB_QUERIES_HEADER, SERVER_TIMING_HEADER],
 )
 
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 media_root = Path(settings.MEDIA_DIR)
 media_root.mkdir(parents=True, exist_ok=True)
 app.mount("/media", StaticFiles(directory=media_root), name="media")
@@ -58,3 +135,10 @@ app.include_router(search_router)
 @app.get("/health")
 def health():
     return {"ok": True}
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
@@ -1,5 +1,9 @@
+from .activity_event import ActivityEvent
 from .author import Author
 from .book import Book
+from .book_rating_stats import BookRatingStats
+from .book_neighbor import BookNeighbor
+from .book_popularity import BookPopularity, BookPopularityEvent
 from .book_author import book_authors
 from .book_genre import book_genres
 from .book_tag import book_tags
@@ -9,13 +13,20 @@ from .reading_status import ReadingStatus
 from .follow import Follow
 from .author_like import AuthorLike
 from .user import User
+from .user_neighbor import UserNeighbor
 from .review import Review
 from .shelf import Shelf
 from .shelf_book import shelf_books
+from . import search_index  # noqa: F401 (registers SQLite FTS tables)
 
 __all__ = [
+    "ActivityEvent",
     "Author",
     "Book",
+    "BookRatingStats",
+    "BookNeighbor",
+    "BookPopularity",
+    "BookPopularityEvent",
     "book_authors",
     "book_genres",
     "book_tags",
@@ -25,6 +36,7 @@ __all__ = [
     "Follow",
     "AuthorLike",
     "User",
+    "UserNeighbor",
     "Review",
     "Shelf",
     "shelf_books"
@@ -23,6 +23,7 @@ class Book(Base):
     description: Mapped[str | None] = mapped_column(Text(), nullable=True)
     published_year: Mapped[int | None] = mapped_column(Integer(), nullable=True)
     cover_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    version: Mapped[int] = mapped_column(Integer(), default=1, server_default="1", nullable=False)
     rating_avg: float | None = None
     rating_count: int = 0
 
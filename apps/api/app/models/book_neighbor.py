@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, SmallInteger, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class BookNeighbor(Base):
+    __tablename__ = "book_neighbors"
+
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id", ondelete="CASCADE"), primary_key=True)
+    neighbor_id: Mapped[int] = mapped_column(ForeignKey("books.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+    # shared-trait score (2 for a shared author, +1 per shared tag or genre)
+    score: Mapped[float] = mapped_column(Float(), nullable=False)
+    # bit flags, see app.core.book_neighbors.REASON_*
+    reasons: Mapped[int] = mapped_column(SmallInteger(), default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class BookPopularity(Base):
+    __tablename__ = "book_popularity"
+
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id", ondelete="CASCADE"), primary_key=True)
+    # forward-decayed activity score, see app.core.trending
+    score: Mapped[float] = mapped_column(Float(), default=0.0, nullable=False, index=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class BookPopularityEvent(Base):
+    """First event of each kind a user caused on a book; later ones are not counted."""
+
+    __tablename__ = "book_popularity_events"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id", ondelete="CASCADE"), primary_key=True)
+    # key of app.core.trending.EVENT_WEIGHTS
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class BookRatingStats(Base):
+    __tablename__ = "book_rating_stats"
+
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id", ondelete="CASCADE"), primary_key=True)
+
+    rating_sum: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    rating_count: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    rating_avg: Mapped[float | None] = mapped_column(Float(), nullable=True)
+
+    rating_1_count: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    rating_2_count: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    rating_3_count: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    rating_4_count: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    rating_5_count: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -0,0 +1,44 @@
+"""SQLite FTS5 mirrors of the searchable text columns.
+
+Postgres gets tsvector/pg_trgm GIN indexes from an alembic migration instead;
+these tables only exist when the metadata is created on SQLite (tests, local
+scripts). External-content tables keep no copy of the text, triggers keep
+them in sync with the base table.
+"""
+
+from sqlalchemy import DDL, Table, event
+
+from app.models.author import Author
+from app.models.book import Book
+from app.models.user import User
+
+FTS_TABLES = {
+    "books": ("books_fts", "title"),
+    "authors": ("authors_fts", "name"),
+    "users": ("users_fts", "username"),
+}
+
+
+def _fts_ddl(source: str, fts: str, col: str) -> list[str]:
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({col}, content='{source}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {col}) VALUES (new.id, new.{col}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col}) VALUES ('delete', old.id, old.{col}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {col} ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {col}) VALUES ('delete', old.id, old.{col}); "
+        f"INSERT INTO {fts}(rowid, {col}) VALUES (new.id, new.{col}); END",
+    ]
+
+
+def _register(table: Table) -> None:
+    fts, col = FTS_TABLES[table.name]
+    for statement in _fts_ddl(table.name, fts, col):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(table, "before_drop", DDL(f"DROP TABLE IF EXISTS {fts}").execute_if(dialect="sqlite"))
+
+
+for _model in (Book, Author, User):
+    _register(_model.__table__)
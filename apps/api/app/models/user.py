@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, String, func
+from sqlalchemy import Boolean, DateTime, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -23,6 +23,14 @@ class User(Base):
     is_private: Mapped[bool] = mapped_column(Boolean(), default=False, nullable=False)
     last_activity_seen_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     last_requests_seen_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # maintained on write by app.core.follow_counts
+    followers_count: Mapped[int] = mapped_column(Integer(), default=0, server_default="0", nullable=False)
+    following_count: Mapped[int] = mapped_column(Integer(), default=0, server_default="0", nullable=False)
+    # maintained on write by app.core.notifications
+    unread_requests_count: Mapped[int] = mapped_column(Integer(), default=0, server_default="0", nullable=False)
+    unread_activity_count: Mapped[int] = mapped_column(Integer(), default=0, server_default="0", nullable=False)
+    # bumped with every review write; part of the taste-compare cache key
+    reviews_version: Mapped[int] = mapped_column(Integer(), default=0, server_default="0", nullable=False)
     avatar_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     cover_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
 
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends
 
+from app.core.autocomplete import autocomplete_index
+from app.core.trait_index import trait_index
 from app.deps import require_admin
 from app.models import User
 
@@ -17,3 +19,13 @@ def admin_ping(user: User = Depends(require_admin)):
             "role": user.role,
         },
     }
+
+
+@router.get("/search-index")
+def search_index_stats(_admin: User = Depends(require_admin)):
+    return {"ready": autocomplete_index.ready, **autocomplete_index.stats()}
+
+
+@router.get("/trait-index")
+def trait_index_stats(_admin: User = Depends(require_admin)):
+    return {"ready": trait_index.ready, **trait_index.stats()}
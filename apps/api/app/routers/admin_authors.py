@@ -3,9 +3,12 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.autocomplete import autocomplete_index
+from app.core.book_neighbors import forget_trait
+from app.core.etag import bump_versions
 from app.core.media import AUTHOR_PHOTO_SIZES, save_media_with_thumbs
 from app.deps import get_db, require_admin
-from app.models import Author, User
+from app.models import Author, Book, User, book_authors
 from app.schemas import AuthorCreate, AuthorUpdate
 
 
@@ -86,6 +89,7 @@ def create_author(
         raise HTTPException(status_code=409, detail="Author with this name already exists")
 
     db.refresh(a)
+    autocomplete_index.upsert_author(a)
     return {
         "id": a.id,
         "name": a.name,
@@ -125,6 +129,10 @@ def update_author(
     if "bio" in data:
         a.bio = data["bio"]  # can be None
 
+    a.version = Author.version + 1
+    # books embed the author, so their representations change too
+    bump_versions(db, Book, Book.authors.any(Author.id == author_id))
+
     try:
         db.commit()
     except IntegrityError:
@@ -132,6 +140,7 @@ def update_author(
         raise HTTPException(status_code=409, detail="Author with this name already exists")
 
     db.refresh(a)
+    autocomplete_index.upsert_author(a)
     return {
         "id": a.id,
         "name": a.name,
@@ -151,8 +160,11 @@ def delete_author(
     if not a:
         raise HTTPException(status_code=404, detail="Author not found")
 
+    bump_versions(db, Book, Book.authors.any(Author.id == author_id))
+    forget_trait(db, book_authors, author_id)
     db.delete(a)
     db.commit()
+    autocomplete_index.remove("author", author_id)
     return None
 
 
@@ -169,7 +181,10 @@ def upload_author_photo(
 
     thumbs = save_media_with_thumbs(file, f"authors/{author_id}", AUTHOR_PHOTO_SIZES)
     a.photo_url = thumbs["original"]
+    a.version = Author.version + 1
+    bump_versions(db, Book, Book.authors.any(Author.id == author_id))
     db.commit()
     db.refresh(a)
+    autocomplete_index.upsert_author(a)
 
     return {"id": a.id, "photo_url": a.photo_url, "photo_thumbs": thumbs}
@@ -2,7 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File,
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.autocomplete import autocomplete_index
+from app.core.book_neighbors import refresh_book_neighbors
 from app.core.media import BOOK_COVER_SIZES, save_media_with_thumbs
+from app.core.taste_compare import bump_book_reviewers_version
+from app.core.trait_index import trait_index
 from app.deps import get_db, require_admin
 from app.models import Author, Book, Genre, Tag, User
 from app.schemas import BookCreate, BookUpdate
@@ -96,8 +100,13 @@ def create_book(
         book.genres = genres
 
     db.add(book)
+    if payload.author_ids or payload.tag_ids or payload.genre_ids:
+        db.flush()
+        refresh_book_neighbors(db, book.id)
     db.commit()
     db.refresh(book)
+    autocomplete_index.upsert_book(book)
+    trait_index.upsert_book(book)
 
     return {
         "id": book.id,
@@ -129,6 +138,8 @@ def update_book(
         title = data["title"].strip()
         if not title:
             raise HTTPException(status_code=422, detail="Title cannot be empty")
+        if title != b.title:
+            bump_book_reviewers_version(db, b.id)
         b.title = title
 
     if "description" in data:
@@ -174,8 +185,15 @@ def update_book(
         else:
             b.genres = []
 
+    b.version = Book.version + 1
+    if data.keys() & {"author_ids", "tag_ids", "genre_ids"}:
+        db.flush()
+        refresh_book_neighbors(db, b.id)
     db.commit()
     db.refresh(b)
+    autocomplete_index.upsert_book(b)
+    if data.keys() & {"author_ids", "tag_ids", "genre_ids"}:
+        trait_index.upsert_book(b)
 
     return {
         "id": b.id,
@@ -200,8 +218,11 @@ def delete_book(
     if not b:
         raise HTTPException(status_code=404, detail="Book not found")
 
+    bump_book_reviewers_version(db, book_id)
     db.delete(b)
     db.commit()
+    autocomplete_index.remove("book", book_id)
+    trait_index.remove_book(book_id)
     return None
 
 
@@ -218,7 +239,9 @@ def upload_book_cover(
 
     thumbs = save_media_with_thumbs(file, f"books/{book_id}", BOOK_COVER_SIZES)
     b.cover_url = thumbs["original"]
+    b.version = Book.version + 1
     db.commit()
     db.refresh(b)
+    autocomplete_index.upsert_book(b)
 
     return {"id": b.id, "cover_url": b.cover_url, "cover_thumbs": thumbs}
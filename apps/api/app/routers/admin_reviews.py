@@ -2,6 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
+from app.core.activity import remove_activity
+from app.core.book_stats import apply_rating_change, visible_rating
+from app.core.etag import bump_versions
+from app.core.recommendations import invalidate_recommendations
+from app.core.taste_compare import bump_reviews_version
 from app.deps import get_db, require_admin
 from app.models import Book, Review, User
 
@@ -64,6 +69,12 @@ def delete_review(
     if not r:
         raise HTTPException(status_code=404, detail="Review not found")
 
+    apply_rating_change(db, r.book_id, visible_rating(r), None)
+    bump_versions(db, Book, Book.id == r.book_id)
+    author_id = r.user_id
+    remove_activity(db, author_id, "review", r.book_id)
+    bump_reviews_version(db, author_id)
     db.delete(r)
     db.commit()
+    invalidate_recommendations(author_id)
     return None
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.autocomplete import autocomplete_index
 from app.core.security import create_access_token, hash_password, verify_password
 from app.deps import get_current_user, get_db
 from app.models import User
@@ -32,6 +33,7 @@ def register(payload: RegisterIn, db: Session = Depends(get_db)):
     db.add(user)
     db.commit()
     db.refresh(user)
+    autocomplete_index.upsert_user(user)
     return user
 
 
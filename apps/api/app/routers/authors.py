@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, noload
 
+from app.core.book_fields import FIELDS_DESCRIPTION, book_load_options, books_response, parse_fields
 from app.core.book_stats import book_with_stats_stmt, hydrate_books
+from app.core.etag import conditional_get
+from app.core.pagination import decode_cursor, encode_cursor, set_next_cursor
 from app.deps import get_current_user, get_db
-from app.models import Author, AuthorLike, Book, User
+from app.models import Author, AuthorLike, Book, User, book_authors
 from app.schemas.author import AuthorLikeIn, AuthorOut, AuthorTopOut
 from app.schemas.book import BookOut
 
@@ -13,16 +16,29 @@ router = APIRouter(prefix="/authors", tags=["authors"])
 
 @router.get("", response_model=list[AuthorOut])
 def list_authors(
+    response: Response,
     q: str | None = Query(default=None, description="Search in author name"),
     limit: int = Query(default=20, ge=1, le=100),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, description="Deprecated, use `after`"),
+    after: str | None = Query(default=None, description="Cursor from the X-Next-Cursor header"),
     db: Session = Depends(get_db),
 ):
-    stmt = select(Author).order_by(Author.id.desc()).limit(limit).offset(offset)
+    stmt = select(Author)
     if q:
-        stmt = select(Author).where(Author.name.ilike(f"%{q}%")).order_by(Author.id.desc()).limit(limit).offset(offset)
+        stmt = stmt.where(Author.name.ilike(f"%{q}%"))
 
-    return list(db.execute(stmt).scalars().all())
+    if after:
+        (after_id,) = decode_cursor(after, int)
+        stmt = stmt.where(Author.id < after_id)
+    elif offset:
+        stmt = stmt.offset(offset)
+
+    authors = list(db.execute(stmt.order_by(Author.id.desc()).limit(limit + 1)).scalars().all())
+    if len(authors) > limit:
+        authors = authors[:limit]
+        set_next_cursor(response, encode_cursor(authors[-1].id))
+
+    return authors
 
 
 @router.get("/top", response_model=list[AuthorTopOut])
@@ -55,11 +71,16 @@ def list_top_authors(
 
 
 @router.get("/{author_id}", response_model=AuthorOut)
-def get_author(author_id: int, db: Session = Depends(get_db)):
-    author = db.get(Author, author_id)
-    if not author:
+def get_author(author_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    version = db.execute(select(Author.version).where(Author.id == author_id)).scalar_one_or_none()
+    if version is None:
         raise HTTPException(status_code=404, detail="Author not found")
-    return author
+    not_modified = conditional_get(request, response, "author", author_id, version)
+    if not_modified:
+        return not_modified
+
+    # AuthorOut has no books, so skip the selectin load of the whole bibliography
+    return db.execute(select(Author).options(noload(Author.books)).where(Author.id == author_id)).scalar_one()
 
 
 @router.get("/{author_id}/liked")
@@ -105,15 +126,42 @@ def set_liked_author(
 
 
 @router.get("/{author_id}/books", response_model=list[BookOut])
-def list_author_books(author_id: int, db: Session = Depends(get_db)):
-    author = db.get(Author, author_id)
-    if not author:
+def list_author_books(
+    author_id: int,
+    request: Request,
+    response: Response,
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    selected = parse_fields(fields)
+    version = db.execute(select(Author.version).where(Author.id == author_id)).scalar_one_or_none()
+    if version is None:
         raise HTTPException(status_code=404, detail="Author not found")
 
+    # membership changes and per-book edits both show up in the (id, version) list
+    book_versions = db.execute(
+        select(Book.id, Book.version)
+        .join(book_authors, book_authors.c.book_id == Book.id)
+        .where(book_authors.c.author_id == author_id)
+        .order_by(Book.id)
+    ).all()
+    not_modified = conditional_get(
+        request,
+        response,
+        "author-books",
+        author_id,
+        version,
+        [tuple(row) for row in book_versions],
+        sorted(selected) if selected is not None else None,
+    )
+    if not_modified:
+        return not_modified
+
     stmt = (
         book_with_stats_stmt()
         .where(Book.authors.any(Author.id == author_id))
         .order_by(Book.id.desc())
+        .options(*book_load_options(selected))
     )
 
-    return hydrate_books(db.execute(stmt).all())
+    return books_response(response, hydrate_books(db.execute(stmt).all()), selected)
@@ -1,98 +1,157 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import cast
-from sqlalchemy import false, or_, select
-from sqlalchemy.orm import Session, selectinload
-
-from app.core.book_stats import book_with_stats_stmt, hydrate_books
-from app.core.recommendations import has_traits, score_candidate, seed_traits
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.book_fields import FIELDS_DESCRIPTION, book_load_options, books_response, parse_fields, serialize_book
+from app.core.book_neighbors import reason_labels
+from app.core.book_stats import book_with_stats_stmt, books_by_ids, hydrate_books
+from app.core.etag import conditional_get
+from app.core.pagination import decode_cursor, encode_cursor, set_next_cursor
+from app.core.trending import trending_book_ids
 from app.deps import get_db
-from app.models import Author, Book, Genre, Tag
+from app.models import Book, BookNeighbor, BookRatingStats
 from app.schemas.book import BookOut
 
 router = APIRouter(prefix="/books", tags=["books"])
 
+MAX_BATCH_IDS = 200
+# ASCII digits only (str.isdigit() accepts "²"), short enough to fit a bigint
+_BOOK_ID_RE = re.compile(r"[0-9]{1,18}")
+
+
+def _parse_ids(raw: str) -> list[int]:
+    ids: list[int] = []
+    seen: set[int] = set()
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not _BOOK_ID_RE.fullmatch(part):
+            raise HTTPException(status_code=422, detail=f"Invalid book id: {part!r}")
+        book_id = int(part)
+        if book_id not in seen:
+            seen.add(book_id)
+            ids.append(book_id)
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return ids
+
 
 @router.get("", response_model=list[BookOut])
 def list_books(
+    response: Response,
     q: str | None = Query(default=None, description="Search in book title"),
     limit: int = Query(default=20, ge=1, le=100),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, description="Deprecated, use `after`"),
+    after: str | None = Query(default=None, description="Cursor from the X-Next-Cursor header"),
+    ids: str | None = Query(
+        default=None,
+        description=f"Comma-separated book ids (max {MAX_BATCH_IDS}); returned in input order, other filters ignored",
+    ),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db),
 ):
-    stmt = book_with_stats_stmt().order_by(Book.id.desc()).limit(limit).offset(offset)
+    selected = parse_fields(fields)
+
+    if ids is not None:
+        wanted = _parse_ids(ids)
+        return books_response(response, books_by_ids(db, wanted, book_load_options(selected)), selected)
+
+    stmt = book_with_stats_stmt().options(*book_load_options(selected))
 
     if q:
-        stmt = (
-            book_with_stats_stmt()
-            .where(Book.title.ilike(f"%{q}%"))
-            .order_by(Book.id.desc())
-            .limit(limit)
-            .offset(offset)
-        )
+        stmt = stmt.where(Book.title.ilike(f"%{q}%"))
+
+    if after:
+        (after_id,) = decode_cursor(after, int)
+        stmt = stmt.where(Book.id < after_id)
+    elif offset:
+        stmt = stmt.offset(offset)
 
-    return hydrate_books(db.execute(stmt).all())
+    rows = db.execute(stmt.order_by(Book.id.desc()).limit(limit + 1)).all()
+    books = hydrate_books(rows[:limit])
+    if len(rows) > limit:
+        set_next_cursor(response, encode_cursor(books[-1].id))
+
+    return books_response(response, books, selected)
+
+
+# declared before /{book_id} so "trending" is not parsed as an id
+@router.get("/trending", response_model=list[BookOut])
+def trending_books(
+    response: Response,
+    limit: int = Query(default=20, ge=1, le=100),
+    genre_id: int | None = Query(default=None),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    selected = parse_fields(fields)
+    ids = trending_book_ids(db, limit, genre_id)
+    return books_response(response, books_by_ids(db, ids, book_load_options(selected)), selected)
 
 
 @router.get("/{book_id}", response_model=BookOut)
-def get_book(book_id: int, db: Session = Depends(get_db)):
-    stmt = book_with_stats_stmt().where(Book.id == book_id)
+def get_book(
+    book_id: int,
+    request: Request,
+    response: Response,
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    selected = parse_fields(fields)
+    version = db.execute(select(Book.version).where(Book.id == book_id)).scalar_one_or_none()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    not_modified = conditional_get(
+        request, response, "book", book_id, version, sorted(selected) if selected is not None else None
+    )
+    if not_modified:
+        return not_modified
+
+    stmt = book_with_stats_stmt().where(Book.id == book_id).options(*book_load_options(selected))
     row = db.execute(stmt).first()
     if row is None:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    return hydrate_books([row])[0]
+    return books_response(response, hydrate_books([row])[0], selected)
 
 
 @router.get("/{book_id}/similar", response_model=list[dict])
 def similar_books(
     book_id: int,
     limit: int = Query(default=6, ge=1, le=20),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
     db: Session = Depends(get_db),
 ):
-    seed = cast(Book | None, db.get(Book, book_id))
-    if seed is None:
+    selected = parse_fields(fields)
+    if db.execute(select(Book.id).where(Book.id == book_id)).first() is None:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    author_ids, tag_ids, genre_ids = seed_traits(seed)
-    if not has_traits(author_ids, tag_ids, genre_ids):
-        return []
-
+    # trait scores come precomputed from book_neighbors; the rating part stays live
+    rank = BookNeighbor.score + func.coalesce(BookRatingStats.rating_avg, 0.0) / 5.0
     stmt = (
         book_with_stats_stmt()
-        .where(Book.id != seed.id)
-        .where(
-            or_(
-                Book.authors.any(Author.id.in_(author_ids)) if author_ids else false(),
-                Book.tags.any(Tag.id.in_(tag_ids)) if tag_ids else false(),
-                Book.genres.any(Genre.id.in_(genre_ids)) if genre_ids else false(),
-            )
-        )
-        .options(selectinload(Book.authors), selectinload(Book.tags), selectinload(Book.genres))
-        .limit(60)
+        .add_columns(BookNeighbor.reasons)
+        .join(BookNeighbor, BookNeighbor.neighbor_id == Book.id)
+        .where(BookNeighbor.book_id == book_id)
+        .order_by(rank.desc(), Book.id.asc())
+        .limit(limit)
+        .options(*book_load_options(selected))
     )
-
-    candidates = hydrate_books(db.execute(stmt).all())
-    scored = [
-        (b, score_candidate(b, author_ids, tag_ids, genre_ids) + (b.rating_avg or 0.0) / 5.0)
-        for b in candidates
-    ]
-    scored.sort(key=lambda x: x[1], reverse=True)
+    rows = db.execute(stmt).all()
+    books = hydrate_books(row[:3] for row in rows)
 
     out = []
-    for b, _ in scored[:limit]:
-        reasons = []
-        if author_ids and any(a.id in author_ids for a in (b.authors or [])):
-            reasons.append("Same author")
-        if genre_ids and any(g.id in genre_ids for g in (b.genres or [])):
-            reasons.append("Same genre")
-        if tag_ids and any(t.id in tag_ids for t in (b.tags or [])):
-            reasons.append("Similar tags")
+    for b, row in zip(books, rows):
+        reasons = reason_labels(row.reasons)
         if b.rating_avg is not None and b.rating_avg >= 4.0:
             reasons.append("Highly rated")
 
         out.append(
             {
-                "book": BookOut.model_validate(b),
+                "book": serialize_book(b, selected),
                 "reasons": reasons,
             }
         )
@@ -4,6 +4,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
+from app.core.activity import record_activity, remove_activity
+from app.core.recommendations import invalidate_recommendations
+from app.core.trending import record_popularity
 from app.deps import get_current_user, get_db
 from app.models import Book, ReadingStatus, User
 from app.schemas import ReadingStatusIn, ReadingStatusOut
@@ -76,7 +79,9 @@ def upsert_status(
                 payload.status, existing.started_at, existing.finished_at
             )
 
+        record_activity(db, user.id, "status", book_id, status=payload.status)
         db.commit()
+        invalidate_recommendations(user.id)
         db.refresh(existing)
         return existing
 
@@ -90,7 +95,10 @@ def upsert_status(
         finished_at=finished_at,
     )
     db.add(rs)
+    record_popularity(db, user.id, book_id, "status")
+    record_activity(db, user.id, "status", book_id, status=payload.status)
     db.commit()
+    invalidate_recommendations(user.id)
     db.refresh(rs)
     return rs
 
@@ -109,5 +117,7 @@ def delete_status(
         return None
 
     db.delete(rs)
+    remove_activity(db, user.id, "status", book_id)
     db.commit()
+    invalidate_recommendations(user.id)
     return None
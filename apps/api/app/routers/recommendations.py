@@ -1,19 +1,20 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import false, or_, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
-from app.core.book_stats import book_with_stats_stmt, hydrate_books
-from app.core.recommendations import has_traits, score_candidate, seed_traits
+from app.core.book_fields import FIELDS_DESCRIPTION, book_load_options, parse_fields, serialize_book
+from app.core.book_stats import books_by_ids
+from app.core.cf_model import MIN_USER_INTERACTIONS, get_cf_model, user_interactions
+from app.core.recommendations import MAX_SEEDS, RANKED_LIMIT, recommendation_cache, score_candidates
 from app.deps import get_current_user, get_db
-from app.models import Author, Book, Genre, Review, Shelf, Tag, User, shelf_books
-from app.schemas.book import BookOut
+from app.models import Book, Review, Shelf, User, shelf_books
 
 router = APIRouter(prefix="/me/recommendations", tags=["recommendations"])
 
 
-def _liked_books(db: Session, user: User) -> list[Book]:
+def _liked_books(db: Session, user: User, limit: int = MAX_SEEDS) -> list[Book]:
     stmt = (
         select(Book)
         .join(shelf_books, shelf_books.c.book_id == Book.id)
@@ -29,6 +30,7 @@ def _liked_books(db: Session, user: User) -> list[Book]:
         .where(Shelf.name == "read")
         .order_by(Review.updated_at.desc())
         .options(selectinload(Book.authors), selectinload(Book.tags), selectinload(Book.genres))
+        .limit(limit)
     )
     return list(db.execute(stmt).scalars().all())
 
@@ -41,73 +43,71 @@ def _excluded_books_subquery(user_id: int):
     )
 
 
-def _recommend_for_book(db: Session, user: User, seed: Book, limit: int) -> list[Book]:
-    author_ids, tag_ids, genre_ids = seed_traits(seed)
-    if not has_traits(author_ids, tag_ids, genre_ids):
+def _rank_sections(db: Session, user: User, sections: int, per: int) -> list[tuple[int, list[int]]]:
+    liked = _liked_books(db, user, limit=sections)
+    if not liked:
         return []
+    scores = score_candidates(db, liked, _excluded_books_subquery(user.id))
+    return [(seed.id, scores.top_for_seed(j, per)) for j, seed in enumerate(liked)]
 
-    excluded = _excluded_books_subquery(user.id)
-    stmt = (
-        book_with_stats_stmt()
-        .where(Book.id.notin_(excluded))
-        .where(Book.id != seed.id)
-        .where(
-            or_(
-                Book.authors.any(Author.id.in_(author_ids)) if author_ids else false(),
-                Book.tags.any(Tag.id.in_(tag_ids)) if tag_ids else false(),
-                Book.genres.any(Genre.id.in_(genre_ids)) if genre_ids else false(),
-            )
-        )
-        .options(selectinload(Book.authors), selectinload(Book.tags), selectinload(Book.genres))
-        .limit(50)
-    )
 
-    candidates = hydrate_books(db.execute(stmt).all())
-    scored = [(b, score_candidate(b, author_ids, tag_ids, genre_ids)) for b in candidates]
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return [b for (b, _) in scored[:limit]]
+def _rank_books(db: Session, user: User) -> list[int]:
+    ranked: list[int] = []
+
+    model = get_cf_model()
+    if model is not None:
+        interactions = user_interactions(db, user.id)
+        if len(model.known(interactions)) >= MIN_USER_INTERACTIONS:
+            shelved = set(db.execute(_excluded_books_subquery(user.id)).scalars())
+            ranked = model.recommend(interactions, shelved | set(interactions), RANKED_LIMIT)
+
+    # cold-start users, or a collaborative list shorter than the cached length
+    if len(ranked) < RANKED_LIMIT:
+        liked = _liked_books(db, user)
+        if liked:
+            seen = set(ranked)
+            trait_ranked = score_candidates(db, liked, _excluded_books_subquery(user.id)).ranked_ids()
+            ranked += [book_id for book_id in trait_ranked if book_id not in seen]
+    return ranked[:RANKED_LIMIT]
 
 
 @router.get("/sections")
 def recommendation_sections(
     sections: int = Query(default=3, ge=1, le=6),
     per: int = Query(default=3, ge=1, le=8),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    liked = _liked_books(db, user)
-    liked = liked[:sections]
+    selected = parse_fields(fields)
+    picks = recommendation_cache.get_or_compute(
+        user.id, ("sections", sections, per), lambda: _rank_sections(db, user, sections, per)
+    )
+    if not picks:
+        return []
 
-    out = []
-    for seed in liked:
-        items = _recommend_for_book(db, user, seed, per)
-        out.append({"seed": BookOut.model_validate(seed), "items": [BookOut.model_validate(b) for b in items]})
+    ids = {seed_id for seed_id, _ in picks} | {i for _, book_ids in picks for i in book_ids}
+    books = {b.id: b for b in books_by_ids(db, sorted(ids), book_load_options(selected))}
 
-    return out
+    return [
+        {
+            "seed": serialize_book(books[seed_id], selected),
+            "items": [serialize_book(books[i], selected) for i in book_ids if i in books],
+        }
+        for seed_id, book_ids in picks
+        if seed_id in books
+    ]
 
 
 @router.get("")
 def recommendation_list(
     limit: int = Query(default=12, ge=1, le=50),
     offset: int = Query(default=0, ge=0),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    liked = _liked_books(db, user)
-    if not liked:
-        return []
-
-    scored: dict[int, tuple[Book, float]] = {}
-
-    for seed in liked:
-        candidates = _recommend_for_book(db, user, seed, limit=50)
-        author_ids, tag_ids, genre_ids = seed_traits(seed)
-
-        for b in candidates:
-            score = score_candidate(b, author_ids, tag_ids, genre_ids)
-            if b.id not in scored or score > scored[b.id][1]:
-                scored[b.id] = (b, score)
-
-    ordered = sorted(scored.values(), key=lambda x: x[1], reverse=True)
-    page = ordered[offset : offset + limit]
-    return [BookOut.model_validate(b) for (b, _) in page]
+    selected = parse_fields(fields)
+    ranked = recommendation_cache.get_or_compute(user.id, ("list",), lambda: _rank_books(db, user))
+    page = books_by_ids(db, ranked[offset : offset + limit], book_load_options(selected))
+    return [serialize_book(b, selected) for b in page]
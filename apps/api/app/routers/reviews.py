@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.activity import record_activity, remove_activity
+from app.core.book_stats import apply_rating_change, visible_rating
+from app.core.etag import bump_versions, conditional_get
+from app.core.recommendations import invalidate_recommendations
+from app.core.taste_compare import bump_reviews_version
+from app.core.trending import record_popularity
 from app.deps import get_current_user, get_db
 from app.models import Book, Review, User
 from app.schemas.review import ReviewIn, ReviewOut
@@ -10,10 +16,13 @@ router = APIRouter(tags=["reviews"])
 
 
 @router.get("/books/{book_id}/reviews", response_model=list[ReviewOut])
-def list_reviews(book_id: int, db: Session = Depends(get_db)):
-    # Ensure book exists
-    if not db.get(Book, book_id):
+def list_reviews(book_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    version = db.execute(select(Book.version).where(Book.id == book_id)).scalar_one_or_none()
+    if version is None:
         raise HTTPException(status_code=404, detail="Book not found")
+    not_modified = conditional_get(request, response, "book-reviews", book_id, version)
+    if not_modified:
+        return not_modified
 
     stmt = (
         select(Review)
@@ -40,11 +49,16 @@ def upsert_my_review(
     ).scalar_one_or_none()
 
     if existing:
+        apply_rating_change(db, book_id, visible_rating(existing), payload.rating)
         existing.rating = payload.rating
         existing.body = payload.body
         existing.is_hidden = False  # if user edits, re-show
         db.add(existing)
+        record_activity(db, user.id, "review", book_id)
+        bump_versions(db, Book, Book.id == book_id)
+        bump_reviews_version(db, user.id)
         db.commit()
+        invalidate_recommendations(user.id)
         db.refresh(existing)
         return existing
 
@@ -56,7 +70,13 @@ def upsert_my_review(
         is_hidden=False,
     )
     db.add(review)
+    apply_rating_change(db, book_id, None, payload.rating)
+    record_popularity(db, user.id, book_id, "review")
+    record_activity(db, user.id, "review", book_id)
+    bump_versions(db, Book, Book.id == book_id)
+    bump_reviews_version(db, user.id)
     db.commit()
+    invalidate_recommendations(user.id)
     db.refresh(review)
     return review
 
@@ -73,6 +93,11 @@ def delete_my_review(
 
     if not r:
         return
+    apply_rating_change(db, book_id, visible_rating(r), None)
+    bump_versions(db, Book, Book.id == book_id)
+    remove_activity(db, user.id, "review", book_id)
+    bump_reviews_version(db, user.id)
     db.delete(r)
     db.commit()
+    invalidate_recommendations(user.id)
     return
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
+from app.core.autocomplete import autocomplete_index
+from app.core.search import ranked_search_stmt
 from app.deps import get_db
 from app.models import Author, Book, User
 from app.schemas.search import SearchAuthorOut, SearchBookOut, SearchResultsOut, SearchUserOut
@@ -9,6 +10,30 @@ from app.schemas.search import SearchAuthorOut, SearchBookOut, SearchResultsOut,
 router = APIRouter(prefix="/search", tags=["search"])
 
 
+def _author_out(author_id: int) -> SearchAuthorOut | None:
+    entry = autocomplete_index.get("author", author_id)
+    if entry is None:
+        return None
+    return SearchAuthorOut(id=entry.id, name=entry.label, photo_url=entry.image_url)
+
+
+def _search_from_index(query: str, limit: int) -> SearchResultsOut:
+    books = [
+        SearchBookOut(
+            id=e.id,
+            title=e.label,
+            cover_url=e.image_url,
+            authors=[a for a in (_author_out(aid) for aid in e.author_ids) if a is not None],
+        )
+        for e in autocomplete_index.search("book", query, limit)
+    ]
+    authors = [
+        SearchAuthorOut(id=e.id, name=e.label, photo_url=e.image_url)
+        for e in autocomplete_index.search("author", query, limit)
+    ]
+    return SearchResultsOut(books=books, authors=authors)
+
+
 @router.get("", response_model=SearchResultsOut)
 def search(
     q: str = Query(min_length=1, description="Search query"),
@@ -23,33 +48,27 @@ def search(
         username = query[1:].strip()
         if not username:
             return SearchResultsOut()
-        like = f"%{username}%"
-        users = db.execute(
-            select(User).where(User.username.ilike(like)).order_by(User.username.asc()).limit(limit)
-        ).scalars().all()
+        if autocomplete_index.ready:
+            return SearchResultsOut(
+                users=[
+                    SearchUserOut(id=e.id, username=e.label, avatar_url=e.image_url)
+                    for e in autocomplete_index.search("user", username, limit)
+                ]
+            )
+        users = db.execute(ranked_search_stmt(db, User, username).limit(limit)).scalars().all()
         return SearchResultsOut(
             users=[SearchUserOut(id=u.id, username=u.username, avatar_url=u.avatar_url) for u in users]
         )
 
-    like = f"%{query}%"
+    if autocomplete_index.ready:
+        return _search_from_index(query, limit)
+
     book_rows = (
-        db.execute(
-            select(Book)
-            .options(selectinload(Book.authors))
-            .where(Book.title.ilike(like))
-            .order_by(Book.title.asc())
-            .limit(limit)
-        )
-        .scalars()
-        .all()
-    )
-    author_rows = (
-        db.execute(
-            select(Author).where(Author.name.ilike(like)).order_by(Author.name.asc()).limit(limit)
-        )
+        db.execute(ranked_search_stmt(db, Book, query).options(selectinload(Book.authors)).limit(limit))
         .scalars()
         .all()
     )
+    author_rows = db.execute(ranked_search_stmt(db, Author, query).limit(limit)).scalars().all()
 
     books: list[SearchBookOut] = []
     for b in book_rows:
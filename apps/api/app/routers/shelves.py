@@ -3,6 +3,8 @@ from sqlalchemy import delete, select, func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.recommendations import invalidate_recommendations
+from app.core.trending import record_popularity
 from app.crud.shelves import ensure_system_shelves
 from app.deps import get_current_user, get_db
 from app.models import Book, ReadingStatus, Shelf, User, shelf_books
@@ -240,8 +242,10 @@ def add_book_to_shelf(
 
     if not exists:
         db.execute(shelf_books.insert().values(shelf_id=shelf_id, book_id=book_id))
+        record_popularity(db, user.id, book_id, "shelf")
 
     db.commit()
+    invalidate_recommendations(user.id)
     return
 
 
@@ -260,6 +264,7 @@ def delete_shelf(
 
     db.delete(shelf)
     db.commit()
+    invalidate_recommendations(user.id)
     return
 
 
@@ -280,4 +285,5 @@ def remove_book_from_shelf(
         .where(shelf_books.c.book_id == book_id)
     )
     db.commit()
+    invalidate_recommendations(user.id)
     return
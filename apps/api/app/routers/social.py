@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
-from sqlalchemy import and_, case, func, or_, select
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select, tuple_
 from sqlalchemy.orm import Session, aliased, selectinload
 
-from app.core.taste_compare import compute_pearson_from_aggregates, compute_similarity_score
+from app.core.activity import activity_items, activity_page, user_activity_page
+from app.core.autocomplete import autocomplete_index
+from app.core.etag import bump_versions
+from app.core.events import event_broker, event_stream
+from app.core.follow_counts import apply_follow_change
+from app.core.pagination import decode_cursor, encode_cursor, set_next_cursor
+from app.core.taste_compare import SHARED_SORTS, followee_compatibility, pair_summary, shared_page
 from app.deps import get_current_user, get_db
-from app.models import Author, AuthorLike, Book, Follow, ReadingStatus, Review, Shelf, User, shelf_books
+from app.models import Author, AuthorLike, Book, Follow, ReadingStatus, Review, Shelf, User, UserNeighbor, shelf_books
 from app.schemas import (
     ActivityItem,
     AuthorOut,
@@ -14,19 +23,21 @@ from app.schemas import (
     PrivacyUpdateIn,
     ProfileOut,
     TasteCompareOut,
+    TasteCompatibilityOut,
+    SimilarReaderOut,
+)
+from app.core.notifications import (
+    PREVIEW_LIMIT,
+    follow_changed,
+    mark_seen,
+    request_closed,
+    request_created,
 )
 from app.core.media import save_media_with_thumbs, USER_AVATAR_SIZES, USER_COVER_SIZES
 
 router = APIRouter(tags=["social"])
 
 
-def _follow_status(db: Session, me_id: int, target_id: int) -> str:
-    row = db.execute(
-        select(Follow.status).where(Follow.requester_id == me_id, Follow.target_id == target_id)
-    ).scalar_one_or_none()
-    return row or "none"
-
-
 def _is_following(db: Session, me_id: int, target_id: int) -> bool:
     row = db.execute(
         select(Follow.id).where(
@@ -36,33 +47,55 @@ def _is_following(db: Session, me_id: int, target_id: int) -> bool:
     return row is not None
 
 
+def _follow_accepted(db: Session, f: Follow, delta: int) -> None:
+    apply_follow_change(db, f.requester_id, f.target_id, delta)
+    follow_changed(db, f.requester_id, f.target_id, delta)
+
+
+def _close_follow(db: Session, f: Follow) -> None:
+    """Settle the counters before `f` is deleted.
+
+    `f` must be loaded with FOR UPDATE: a concurrent close then waits and
+    finds the row gone instead of settling the counters a second time.
+    """
+    if f.status == "pending":
+        request_closed(db, f)
+    else:
+        _follow_accepted(db, f, -1)
+
+
 @router.get("/users/{user_id}", response_model=ProfileOut)
 def get_profile(
     user_id: int,
     me: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    u = db.get(User, user_id)
+    # one primary-key read plus a probe of the (requester_id, target_id) unique index
+    u = db.execute(
+        select(
+            User.id,
+            User.username,
+            User.is_private,
+            User.followers_count,
+            User.following_count,
+            User.avatar_url,
+            User.cover_url,
+            Follow.status.label("follow_status"),
+        )
+        .outerjoin(Follow, and_(Follow.requester_id == me.id, Follow.target_id == User.id))
+        .where(User.id == user_id)
+    ).one_or_none()
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
 
-    followers_count = db.execute(
-        select(func.count(Follow.id)).where(Follow.target_id == user_id, Follow.status == "accepted")
-    ).scalar_one()
-    following_count = db.execute(
-        select(func.count(Follow.id)).where(Follow.requester_id == user_id, Follow.status == "accepted")
-    ).scalar_one()
-
-    status_value = "none" if me.id == user_id else _follow_status(db, me.id, user_id)
-
     return ProfileOut(
         id=u.id,
         username=u.username,
         is_private=u.is_private,
-        followers_count=int(followers_count or 0),
-        following_count=int(following_count or 0),
+        followers_count=u.followers_count,
+        following_count=u.following_count,
         is_me=u.id == me.id,
-        follow_status=status_value,
+        follow_status="none" if me.id == user_id else (u.follow_status or "none"),
         avatar_url=u.avatar_url,
         cover_url=u.cover_url,
     )
@@ -88,8 +121,11 @@ def upload_avatar(
 ):
     thumbs = save_media_with_thumbs(file, f"users/{me.id}/avatar", USER_AVATAR_SIZES)
     me.avatar_url = thumbs["original"]
+    # review lists show the reviewer's avatar
+    bump_versions(db, Book, Book.id.in_(select(Review.book_id).where(Review.user_id == me.id)))
     db.commit()
     db.refresh(me)
+    autocomplete_index.upsert_user(me)
     return {"id": me.id, "avatar_url": me.avatar_url, "avatar_thumbs": thumbs}
 
 
@@ -129,6 +165,10 @@ def follow_user(
     status_value = "pending" if target.is_private else "accepted"
     f = Follow(requester_id=me.id, target_id=user_id, status=status_value)
     db.add(f)
+    if status_value == "pending":
+        request_created(db, user_id)
+    else:
+        _follow_accepted(db, f, 1)
     db.commit()
     db.refresh(f)
     return {"status": f.status}
@@ -141,10 +181,11 @@ def unfollow_user(
     db: Session = Depends(get_db),
 ):
     row = db.execute(
-        select(Follow).where(Follow.requester_id == me.id, Follow.target_id == user_id)
+        select(Follow).where(Follow.requester_id == me.id, Follow.target_id == user_id).with_for_update()
     ).scalar_one_or_none()
     if not row:
         return None
+    _close_follow(db, row)
     db.delete(row)
     db.commit()
     return None
@@ -179,31 +220,29 @@ def list_follow_requests(
 @router.get("/me/notifications")
 def notification_counts(
     me: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
-    req_stmt = select(func.count(Follow.id)).where(Follow.target_id == me.id, Follow.status == "pending")
-    if me.last_requests_seen_at:
-        req_stmt = req_stmt.where(Follow.created_at > me.last_requests_seen_at)
-    pending = db.execute(req_stmt).scalar_one()
+    return {"requests": me.unread_requests_count, "activity": me.unread_activity_count}
 
-    follow_ids = db.execute(
-        select(Follow.target_id).where(Follow.requester_id == me.id, Follow.status == "accepted")
-    ).scalars().all()
 
-    activity = 0
-    if follow_ids:
-        status_stmt = select(func.count(ReadingStatus.id)).where(ReadingStatus.user_id.in_(follow_ids))
-        review_stmt = (
-            select(func.count(Review.id))
-            .where(Review.user_id.in_(follow_ids))
-            .where(Review.is_hidden == False)  # noqa: E712
-        )
-        if me.last_activity_seen_at:
-            status_stmt = status_stmt.where(ReadingStatus.updated_at > me.last_activity_seen_at)
-            review_stmt = review_stmt.where(Review.updated_at > me.last_activity_seen_at)
-        activity = (db.execute(status_stmt).scalar_one() or 0) + (db.execute(review_stmt).scalar_one() or 0)
-
-    return {"requests": int(pending or 0), "activity": int(activity)}
+@router.get("/me/events")
+async def notification_events(
+    request: Request,
+    me: User = Depends(get_current_user),
+):
+    """Server-sent `notifications` (counters) and `activity` (new feed item) events."""
+    user_id = me.id
+    initial = {"requests": me.unread_requests_count, "activity": me.unread_activity_count}
+
+    async def frames():
+        async with event_broker.subscribe(user_id) as queue:
+            async for frame in event_stream(queue, initial, request.is_disconnected):
+                yield frame
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/me/notifications/preview")
@@ -215,91 +254,13 @@ def notification_preview(
     if me.last_requests_seen_at:
         req_stmt = req_stmt.where(Follow.created_at > me.last_requests_seen_at)
     req_rows = (
-        db.execute(req_stmt.options(selectinload(Follow.requester)).order_by(Follow.created_at.desc()))
+        db.execute(req_stmt.order_by(Follow.created_at.desc(), Follow.id.desc()).limit(PREVIEW_LIMIT))
         .scalars()
         .all()
     )
 
-    follow_ids = db.execute(
-        select(Follow.target_id).where(Follow.requester_id == me.id, Follow.status == "accepted")
-    ).scalars().all()
-
-    activity_items: list[ActivityItem] = []
-    if follow_ids:
-        status_stmt = select(ReadingStatus).where(ReadingStatus.user_id.in_(follow_ids))
-        review_stmt = (
-            select(Review)
-            .where(Review.user_id.in_(follow_ids))
-            .where(Review.is_hidden == False)  # noqa: E712
-        )
-        if me.last_activity_seen_at:
-            status_stmt = status_stmt.where(ReadingStatus.updated_at > me.last_activity_seen_at)
-            review_stmt = review_stmt.where(Review.updated_at > me.last_activity_seen_at)
-
-        status_rows = (
-            db.execute(
-                status_stmt.options(selectinload(ReadingStatus.book).selectinload(Book.authors))
-            )
-            .scalars()
-            .all()
-        )
-        review_rows = (
-            db.execute(
-                review_stmt.options(selectinload(Review.book).selectinload(Book.authors), selectinload(Review.user))
-            )
-            .scalars()
-            .all()
-        )
-
-        users = db.execute(select(User).where(User.id.in_(follow_ids))).scalars().all()
-        user_map = {u.id: u.username for u in users}
-        user_avatar_map = {u.id: u.avatar_url for u in users}
-        review_map = {(r.user_id, r.book_id): r for r in review_rows}
-
-        for rs in status_rows:
-            review = review_map.get((rs.user_id, rs.book_id))
-            activity_items.append(
-                ActivityItem(
-                    type="status",
-                    user={
-                        "id": rs.user_id,
-                        "username": user_map.get(rs.user_id, "user"),
-                        "avatar_url": user_avatar_map.get(rs.user_id),
-                    },
-                    book={
-                        "id": rs.book.id,
-                        "title": rs.book.title,
-                        "cover_url": getattr(rs.book, "cover_url", None),
-                        "authors": [{"id": a.id, "name": a.name} for a in (rs.book.authors or [])],
-                    },
-                    status=rs.status,
-                    rating=review.rating if review and rs.status == "finished" else None,
-                    updated_at=rs.updated_at,
-                )
-            )
-
-        for r in review_rows:
-            activity_items.append(
-                ActivityItem(
-                    type="review",
-                    user={
-                        "id": r.user_id,
-                        "username": r.user.username,
-                        "avatar_url": r.user.avatar_url,
-                    },
-                    book={
-                        "id": r.book.id,
-                        "title": r.book.title,
-                        "cover_url": getattr(r.book, "cover_url", None),
-                        "authors": [{"id": a.id, "name": a.name} for a in (r.book.authors or [])],
-                    },
-                    rating=r.rating,
-                    body=r.body,
-                    updated_at=r.updated_at,
-                )
-            )
-
-        activity_items.sort(key=lambda x: x.updated_at, reverse=True)
+    followees = select(Follow.target_id).where(Follow.requester_id == me.id, Follow.status == "accepted")
+    events, _ = activity_page(db, followees, PREVIEW_LIMIT, since=me.last_activity_seen_at)
 
     return {
         "requests": [
@@ -314,7 +275,7 @@ def notification_preview(
             }
             for f in req_rows
         ],
-        "activity": activity_items[:5],
+        "activity": activity_items(db, events),
     }
 
 
@@ -326,12 +287,13 @@ def mark_notifications_seen(
 ):
     from datetime import datetime, timezone
 
-    now = datetime.now(timezone.utc)
-    if payload.get("requests"):
-        me.last_requests_seen_at = now
-    if payload.get("activity"):
-        me.last_activity_seen_at = now
-
+    mark_seen(
+        db,
+        me,
+        datetime.now(timezone.utc),
+        requests=bool(payload.get("requests")),
+        activity=bool(payload.get("activity")),
+    )
     db.commit()
     db.refresh(me)
     return {"ok": True}
@@ -343,10 +305,14 @@ def approve_follow_request(
     me: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    f = db.get(Follow, request_id)
+    # locked so a concurrent approve or deny sees this one's outcome
+    f = db.get(Follow, request_id, with_for_update=True)
     if not f or f.target_id != me.id:
         raise HTTPException(status_code=404, detail="Request not found")
 
+    if f.status == "pending":
+        request_closed(db, f)
+        _follow_accepted(db, f, 1)
     f.status = "accepted"
     db.commit()
     db.refresh(f)
@@ -359,89 +325,114 @@ def deny_follow_request(
     me: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    f = db.get(Follow, request_id)
+    f = db.get(Follow, request_id, with_for_update=True)
     if not f or f.target_id != me.id:
         raise HTTPException(status_code=404, detail="Request not found")
 
+    _close_follow(db, f)
     db.delete(f)
     db.commit()
     return None
 
 
+FOLLOW_PAGE_MAX = 200
+
+
+def _follow_list(
+    db: Session,
+    response: Response,
+    user_id: int,
+    followers: bool,
+    limit: int,
+    after: str | None,
+    ids_only: bool,
+) -> list:
+    """One newest-first page of `user_id`'s accepted followers (or followees).
+
+    Only the listed users' columns are selected; the keyset walks the
+    `(target_id|requester_id, status, created_at, id)` indexes.
+    """
+    owner, other = (Follow.target_id, Follow.requester_id) if followers else (Follow.requester_id, Follow.target_id)
+    columns = [User.id] if ids_only else [User.id, User.username, User.avatar_url]
+    stmt = (
+        select(*columns, Follow.created_at, Follow.id.label("follow_id"))
+        .select_from(Follow)
+        .join(User, User.id == other)
+        .where(owner == user_id, Follow.status == "accepted")
+    )
+    if after:
+        stmt = stmt.where(tuple_(Follow.created_at, Follow.id) < decode_cursor(after, datetime, int))
+    if not ids_only:
+        limit = min(limit, FOLLOW_PAGE_MAX)
+    rows = db.execute(stmt.order_by(Follow.created_at.desc(), Follow.id.desc()).limit(limit + 1)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].created_at, rows[-1].follow_id))
+    if ids_only:
+        return [r.id for r in rows]
+    return [{"id": r.id, "username": r.username, "avatar_url": r.avatar_url} for r in rows]
+
+
+def _visible_follow_owner(db: Session, me: User, user_id: int, detail: str) -> User:
+    target = db.get(User, user_id)
+    if not target:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not _can_view_shelves(db, me, target):
+        raise HTTPException(status_code=403, detail=detail)
+    return target
+
+
 @router.get("/me/following")
 def list_following(
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=1000, description=f"Capped at {FOLLOW_PAGE_MAX} unless `ids_only`"),
+    after: str | None = Query(default=None, description="Cursor from the X-Next-Cursor header"),
+    ids_only: bool = Query(default=False, description="Return only user ids, for membership checks"),
     me: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    rows = db.execute(
-        select(Follow)
-        .where(Follow.requester_id == me.id, Follow.status == "accepted")
-        .options(selectinload(Follow.target))
-        .order_by(Follow.created_at.desc())
-    ).scalars().all()
-
-    return [{"id": f.target.id, "username": f.target.username, "avatar_url": f.target.avatar_url} for f in rows]
+    return _follow_list(db, response, me.id, False, limit, after, ids_only)
 
 
 @router.get("/users/{user_id}/following")
 def list_user_following(
     user_id: int,
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=1000, description=f"Capped at {FOLLOW_PAGE_MAX} unless `ids_only`"),
+    after: str | None = Query(default=None, description="Cursor from the X-Next-Cursor header"),
+    ids_only: bool = Query(default=False, description="Return only user ids, for membership checks"),
     me: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    target = db.get(User, user_id)
-    if not target:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    if not _can_view_shelves(db, me, target):
-        raise HTTPException(status_code=403, detail="Not allowed to view following")
-
-    rows = db.execute(
-        select(Follow)
-        .where(Follow.requester_id == target.id, Follow.status == "accepted")
-        .options(selectinload(Follow.target))
-        .order_by(Follow.created_at.desc())
-    ).scalars().all()
-
-    return [{"id": f.target.id, "username": f.target.username, "avatar_url": f.target.avatar_url} for f in rows]
+    target = _visible_follow_owner(db, me, user_id, "Not allowed to view following")
+    return _follow_list(db, response, target.id, False, limit, after, ids_only)
 
 
 @router.get("/me/followers")
 def list_followers(
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=1000, description=f"Capped at {FOLLOW_PAGE_MAX} unless `ids_only`"),
+    after: str | None = Query(default=None, description="Cursor from the X-Next-Cursor header"),
+    ids_only: bool = Query(default=False, description="Return only user ids, for membership checks"),
     me: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    rows = db.execute(
-        select(Follow)
-        .where(Follow.target_id == me.id, Follow.status == "accepted")
-        .options(selectinload(Follow.requester))
-        .order_by(Follow.created_at.desc())
-    ).scalars().all()
-
-    return [{"id": f.requester.id, "username": f.requester.username, "avatar_url": f.requester.avatar_url} for f in rows]
+    return _follow_list(db, response, me.id, True, limit, after, ids_only)
 
 
 @router.get("/users/{user_id}/followers")
 def list_user_followers(
     user_id: int,
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=1000, description=f"Capped at {FOLLOW_PAGE_MAX} unless `ids_only`"),
+    after: str | None = Query(default=None, description="Cursor from the X-Next-Cursor header"),
+    ids_only: bool = Query(default=False, description="Return only user ids, for membership checks"),
     me: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    target = db.get(User, user_id)
-    if not target:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    if not _can_view_shelves(db, me, target):
-        raise HTTPException(status_code=403, detail="Not allowed to view followers")
-
-    rows = db.execute(
-        select(Follow)
-        .where(Follow.target_id == target.id, Follow.status == "accepted")
-        .options(selectinload(Follow.requester))
-        .order_by(Follow.created_at.desc())
-    ).scalars().all()
-
-    return [{"id": f.requester.id, "username": f.requester.username, "avatar_url": f.requester.avatar_url} for f in rows]
+    target = _visible_follow_owner(db, me, user_id, "Not allowed to view followers")
+    return _follow_list(db, response, target.id, True, limit, after, ids_only)
 
 
 def _can_view_shelves(db: Session, me: User, target: User) -> bool:
@@ -452,6 +443,16 @@ def _can_view_shelves(db: Session, me: User, target: User) -> bool:
     return _is_following(db, me.id, target.id)
 
 
+def _shelves_visible_clause(me_id: int):
+    """`_can_view_shelves` as a filter on `User` rows."""
+    following = (
+        select(Follow.id)
+        .where(Follow.requester_id == me_id, Follow.target_id == User.id, Follow.status == "accepted")
+        .exists()
+    )
+    return or_(User.id == me_id, User.is_private == False, following)  # noqa: E712
+
+
 def _format_shared_row(row) -> dict:
     return {
         "book_id": row.book_id,
@@ -534,95 +535,11 @@ def taste_compare(
     if not _can_view_shelves(db, me, target):
         raise HTTPException(status_code=403, detail="Not allowed to compare taste")
 
-    viewer_review = aliased(Review)
-    target_review = aliased(Review)
-
-    shared_subq = (
-        select(
-            viewer_review.book_id.label("book_id"),
-            Book.title.label("title"),
-            viewer_review.rating.label("viewer_rating"),
-            target_review.rating.label("target_rating"),
-            func.abs(viewer_review.rating - target_review.rating).label("diff"),
-        )
-        .select_from(viewer_review)
-        .join(
-            target_review,
-            and_(
-                target_review.book_id == viewer_review.book_id,
-                target_review.user_id == target.id,
-                target_review.is_hidden == False,  # noqa: E712
-            ),
-        )
-        .join(Book, Book.id == viewer_review.book_id)
-        .where(
-            viewer_review.user_id == me.id,
-            viewer_review.is_hidden == False,  # noqa: E712
-        )
-        .subquery()
-    )
-
-    common_count = db.execute(select(func.count()).select_from(shared_subq)).scalar_one() or 0
-    mean_abs_diff = db.execute(select(func.avg(shared_subq.c.diff))).scalar_one()
-    mean_abs_diff_value = float(mean_abs_diff or 0.0)
-
-    similarity_score = compute_similarity_score(mean_abs_diff_value, int(common_count or 0))
-
-    pearson: float | None = None
-    if common_count and common_count >= 5:
-        sums = db.execute(
-            select(
-                func.sum(shared_subq.c.viewer_rating),
-                func.sum(shared_subq.c.target_rating),
-                func.sum(shared_subq.c.viewer_rating * shared_subq.c.viewer_rating),
-                func.sum(shared_subq.c.target_rating * shared_subq.c.target_rating),
-                func.sum(shared_subq.c.viewer_rating * shared_subq.c.target_rating),
-            )
-        ).one()
-        pearson = compute_pearson_from_aggregates(
-            int(common_count),
-            float(sums[0] or 0.0),
-            float(sums[1] or 0.0),
-            float(sums[2] or 0.0),
-            float(sums[3] or 0.0),
-            float(sums[4] or 0.0),
-        )
-
-    agreements_rows = db.execute(
-        select(shared_subq)
-        .order_by(
-            shared_subq.c.diff.asc(),
-            ((shared_subq.c.viewer_rating + shared_subq.c.target_rating) / 2).desc(),
-            shared_subq.c.title.asc(),
-        )
-        .limit(5)
-    ).all()
-    disagreements_rows = db.execute(
-        select(shared_subq)
-        .order_by(
-            shared_subq.c.diff.desc(),
-            case(
-                (shared_subq.c.viewer_rating >= shared_subq.c.target_rating, shared_subq.c.viewer_rating),
-                else_=shared_subq.c.target_rating,
-            ).desc(),
-            shared_subq.c.title.asc(),
-        )
-        .limit(5)
-    ).all()
-
-    shared_sort_map = {
-        "diff_desc": [shared_subq.c.diff.desc(), shared_subq.c.title.asc()],
-        "diff_asc": [shared_subq.c.diff.asc(), shared_subq.c.title.asc()],
-        "title": [shared_subq.c.title.asc()],
-        "viewer_rating": [shared_subq.c.viewer_rating.desc(), shared_subq.c.title.asc()],
-        "target_rating": [shared_subq.c.target_rating.desc(), shared_subq.c.title.asc()],
-    }
-    if sort not in shared_sort_map:
+    if sort not in SHARED_SORTS:
         raise HTTPException(status_code=400, detail="Invalid sort option")
 
-    shared_rows = db.execute(
-        select(shared_subq).order_by(*shared_sort_map[sort]).limit(limit).offset(offset)
-    ).all()
+    summary = pair_summary(db, me, target)
+    shared_rows = shared_page(summary, sort, limit, offset)
 
     viewer_loved_review = aliased(Review)
     viewer_loved_target_review = aliased(Review)
@@ -703,12 +620,12 @@ def taste_compare(
     return {
         "viewer": {"id": me.id, "username": me.username, "avatar_url": me.avatar_url},
         "target": {"id": target.id, "username": target.username, "avatar_url": target.avatar_url},
-        "common_count": int(common_count or 0),
-        "similarity_score": similarity_score,
-        "mean_abs_diff": mean_abs_diff_value,
-        "pearson": pearson,
-        "agreements": [_format_shared_row(row) for row in agreements_rows],
-        "disagreements": [_format_shared_row(row) for row in disagreements_rows],
+        "common_count": summary.common_count,
+        "similarity_score": summary.similarity_score,
+        "mean_abs_diff": summary.mean_abs_diff,
+        "pearson": summary.pearson,
+        "agreements": [_format_shared_row(row) for row in summary.agreements],
+        "disagreements": [_format_shared_row(row) for row in summary.disagreements],
         "viewer_loved_target_unread": [
             {
                 "book_id": book.id,
@@ -733,6 +650,63 @@ def taste_compare(
     }
 
 
+@router.get("/me/taste-compatibility", response_model=list[TasteCompatibilityOut])
+def taste_compatibility(
+    me: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Taste compare scores against every accepted followee, best match first."""
+    followees = db.execute(
+        select(User.id, User.username, User.avatar_url, User.reviews_version)
+        .join(Follow, Follow.target_id == User.id)
+        .where(Follow.requester_id == me.id, Follow.status == "accepted")
+    ).all()
+    users = {u.id: u for u in followees}
+    results = followee_compatibility(db, me, [(u.id, u.reviews_version) for u in followees])
+    results = sorted(results, key=lambda c: (-c.similarity_score, -c.common_count, users[c.user_id].username))
+    return [
+        {
+            "user": {
+                "id": c.user_id,
+                "username": users[c.user_id].username,
+                "avatar_url": users[c.user_id].avatar_url,
+            },
+            "common_count": c.common_count,
+            "similarity_score": c.similarity_score,
+            "pearson": c.pearson,
+        }
+        for c in results
+    ]
+
+
+@router.get("/me/similar-readers", response_model=list[SimilarReaderOut])
+def similar_readers(
+    limit: int = Query(default=20, ge=1, le=50),
+    me: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Readers whose ratings point the same way as mine, from the nightly neighbor index."""
+    rows = db.execute(
+        select(User.id, User.username, User.avatar_url, UserNeighbor.score, UserNeighbor.common_count)
+        .join(User, User.id == UserNeighbor.neighbor_id)
+        .where(
+            UserNeighbor.user_id == me.id,
+            User.is_active == True,  # noqa: E712
+            _shelves_visible_clause(me.id),
+        )
+        .order_by(UserNeighbor.score.desc(), UserNeighbor.neighbor_id.asc())
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "user": {"id": r.id, "username": r.username, "avatar_url": r.avatar_url},
+            "score": r.score,
+            "common_count": r.common_count,
+        }
+        for r in rows
+    ]
+
+
 @router.get("/users/{user_id}/liked-authors", response_model=list[LikedAuthorOut])
 def list_user_liked_authors(
     user_id: int,
@@ -772,8 +746,10 @@ def list_user_liked_authors(
 @router.get("/users/{user_id}/activity", response_model=list[ActivityItem])
 def user_activity_feed(
     user_id: int,
+    response: Response,
     limit: int = Query(default=10, ge=1, le=50),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, description="Deprecated, use `after`"),
+    after: str | None = Query(default=None, description="Cursor from the X-Next-Cursor header"),
     me: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -784,149 +760,21 @@ def user_activity_feed(
     if not _can_view_shelves(db, me, target):
         raise HTTPException(status_code=403, detail="Not allowed to view activity")
 
-    status_rows = db.execute(
-        select(ReadingStatus)
-        .where(ReadingStatus.user_id == target.id)
-        .options(selectinload(ReadingStatus.book).selectinload(Book.authors))
-    ).scalars().all()
-
-    review_rows = db.execute(
-        select(Review)
-        .where(Review.user_id == target.id)
-        .where(Review.is_hidden == False)  # noqa: E712
-        .options(selectinload(Review.book).selectinload(Book.authors), selectinload(Review.user))
-    ).scalars().all()
-
-    items: list[ActivityItem] = []
-
-    review_map = {(r.user_id, r.book_id): r for r in review_rows}
-
-    for rs in status_rows:
-        review = review_map.get((rs.user_id, rs.book_id))
-        items.append(
-            ActivityItem(
-                type="status",
-                user={
-                    "id": target.id,
-                    "username": target.username,
-                    "avatar_url": target.avatar_url,
-                },
-                book={
-                    "id": rs.book.id,
-                    "title": rs.book.title,
-                    "cover_url": getattr(rs.book, "cover_url", None),
-                    "authors": [{"id": a.id, "name": a.name} for a in (rs.book.authors or [])],
-                },
-                status=rs.status,
-                rating=review.rating if review and rs.status == "finished" else None,
-                updated_at=rs.updated_at,
-            )
-        )
-
-    for r in review_rows:
-        items.append(
-            ActivityItem(
-                type="review",
-                user={
-                    "id": target.id,
-                    "username": target.username,
-                    "avatar_url": target.avatar_url,
-                },
-                book={
-                    "id": r.book.id,
-                    "title": r.book.title,
-                    "cover_url": getattr(r.book, "cover_url", None),
-                    "authors": [{"id": a.id, "name": a.name} for a in (r.book.authors or [])],
-                },
-                rating=r.rating,
-                body=r.body,
-                updated_at=r.updated_at,
-            )
-        )
-
-    items.sort(key=lambda x: x.updated_at, reverse=True)
-    return items[offset : offset + limit]
+    rows, next_cursor = user_activity_page(db, target.id, limit, after=after, offset=0 if after else offset)
+    set_next_cursor(response, next_cursor)
+    return activity_items(db, rows)
 
 
 @router.get("/me/activity", response_model=list[ActivityItem])
 def activity_feed(
+    response: Response,
     limit: int = Query(default=20, ge=1, le=50),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, description="Deprecated, use `after`"),
+    after: str | None = Query(default=None, description="Cursor from the X-Next-Cursor header"),
     me: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    follow_ids = db.execute(
-        select(Follow.target_id).where(Follow.requester_id == me.id, Follow.status == "accepted")
-    ).scalars().all()
-    user_ids = list(set(follow_ids))
-
-    if not user_ids:
-        return []
-
-    status_rows = db.execute(
-        select(ReadingStatus)
-        .where(ReadingStatus.user_id.in_(user_ids))
-        .options(selectinload(ReadingStatus.book).selectinload(Book.authors))
-    ).scalars().all()
-
-    review_rows = db.execute(
-        select(Review)
-        .where(Review.user_id.in_(user_ids))
-        .where(Review.is_hidden == False)  # noqa: E712
-        .options(selectinload(Review.book).selectinload(Book.authors), selectinload(Review.user))
-    ).scalars().all()
-
-    items: list[ActivityItem] = []
-
-    # Build user lookup
-    users = db.execute(select(User).where(User.id.in_(user_ids))).scalars().all()
-    user_map = {u.id: u.username for u in users}
-    user_avatar_map = {u.id: u.avatar_url for u in users}
-
-    review_map = {(r.user_id, r.book_id): r for r in review_rows}
-
-    for rs in status_rows:
-        review = review_map.get((rs.user_id, rs.book_id))
-        items.append(
-            ActivityItem(
-                type="status",
-                user={
-                    "id": rs.user_id,
-                    "username": user_map.get(rs.user_id, "user"),
-                    "avatar_url": user_avatar_map.get(rs.user_id),
-                },
-                book={
-                    "id": rs.book.id,
-                    "title": rs.book.title,
-                    "cover_url": getattr(rs.book, "cover_url", None),
-                    "authors": [{"id": a.id, "name": a.name} for a in (rs.book.authors or [])],
-                },
-                status=rs.status,
-                rating=review.rating if review and rs.status == "finished" else None,
-                updated_at=rs.updated_at,
-            )
-        )
-
-    for r in review_rows:
-        items.append(
-            ActivityItem(
-                type="review",
-                user={
-                    "id": r.user_id,
-                    "username": r.user.username,
-                    "avatar_url": r.user.avatar_url,
-                },
-                book={
-                    "id": r.book.id,
-                    "title": r.book.title,
-                    "cover_url": getattr(r.book, "cover_url", None),
-                    "authors": [{"id": a.id, "name": a.name} for a in (r.book.authors or [])],
-                },
-                rating=r.rating,
-                body=r.body,
-                updated_at=r.updated_at,
-            )
-        )
-
-    items.sort(key=lambda x: x.updated_at, reverse=True)
-    return items[offset : offset + limit]
+    followees = select(Follow.target_id).where(Follow.requester_id == me.id, Follow.status == "accepted")
+    events, next_cursor = activity_page(db, followees, limit, after=after, offset=0 if after else offset)
+    set_next_cursor(response, next_cursor)
+    return activity_items(db, events)
@@ -17,6 +17,8 @@ from .social import (
     PrivacyUpdateIn,
     LikedAuthorOut,
     TasteCompareOut,
+    TasteCompatibilityOut,
+    SimilarReaderOut,
 )
 
 __all__ = [
@@ -47,4 +49,6 @@ __all__ = [
     "PrivacyUpdateIn",
     "LikedAuthorOut",
     "TasteCompareOut",
+    "TasteCompatibilityOut",
+    "SimilarReaderOut",
 ]
@@ -103,3 +103,16 @@ class TasteCompareOut(BaseModel):
     viewer_loved_target_unread: list[TasteCompareViewerLoved]
     target_loved_viewer_unread: list[TasteCompareTargetLoved]
     shared_ratings: list[TasteCompareRating]
+
+
+class TasteCompatibilityOut(BaseModel):
+    user: TasteCompareUser
+    common_count: int
+    similarity_score: float
+    pearson: float | None = None
+
+
+class SimilarReaderOut(BaseModel):
+    user: TasteCompareUser
+    score: float
+    common_count: int
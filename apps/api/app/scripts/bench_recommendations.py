@@ -0,0 +1,332 @@
+"""Offline quality and latency benchmark for the recommendation endpoints.
+
+Builds a throwaway in-memory SQLite database (synthetic, or copied from
+`--source-url`), hides a share of each evaluated user's liked books, and
+replays those users against `/me/recommendations`, its sections and
+`/books/{id}/similar`. Reports precision@k / recall@k against the hidden
+books together with p50/p95 latency and SQL statement counts.
+
+    python -m app.scripts.bench_recommendations --books 5000 --users 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.book_neighbors import rebuild_book_neighbors
+from app.core.book_stats import rebuild_book_rating_stats
+from app.core.cf_model import train_item_knn
+from app.core.config import settings
+from app.core.query_stats import collect_queries
+from app.core.recommendations import recommendation_cache
+from app.core.trait_index import trait_index
+from app.db.base import Base
+from app.models import (
+    Author,
+    Book,
+    Genre,
+    Review,
+    Shelf,
+    Tag,
+    User,
+    book_authors,
+    book_genres,
+    book_tags,
+    shelf_books,
+)
+from app.routers.books import similar_books
+from app.routers.recommendations import recommendation_list, recommendation_sections
+
+LIKED_RATING = 4
+
+
+def _bulk(db: Session, table, rows: list[dict], chunk: int = 5000) -> None:
+    for start in range(0, len(rows), chunk):
+        db.execute(insert(table), rows[start : start + chunk])
+
+
+def generate_dataset(db: Session, books: int, users: int, reads_per_user: int, seed: int) -> None:
+    """Synthetic catalog where each book belongs to one of a few topics.
+
+    Topics share genres, tags and a pool of authors; readers favour one or two
+    topics and rate those books higher, so both trait and collaborative
+    signals exist.
+    """
+    rng = random.Random(seed)
+    topics = max(4, books // 250)
+    authors_per_topic = 12
+
+    _bulk(db, Genre.__table__, [{"id": t + 1, "name": f"Genre {t}"} for t in range(topics)])
+    _bulk(db, Tag.__table__, [{"id": i + 1, "name": f"Tag {i}"} for i in range(topics * 3)])
+    _bulk(
+        db,
+        Author.__table__,
+        [{"id": i + 1, "name": f"Author {i}"} for i in range(topics * authors_per_topic)],
+    )
+
+    book_topic = [rng.randrange(topics) for _ in range(books)]
+    _bulk(db, Book.__table__, [{"id": b + 1, "title": f"Book {b}"} for b in range(books)])
+    _bulk(db, book_genres, [{"book_id": b + 1, "genre_id": t + 1} for b, t in enumerate(book_topic)])
+    _bulk(
+        db,
+        book_authors,
+        [
+            {"book_id": b + 1, "author_id": t * authors_per_topic + rng.randrange(authors_per_topic) + 1}
+            for b, t in enumerate(book_topic)
+        ],
+    )
+    _bulk(
+        db,
+        book_tags,
+        [
+            {"book_id": b + 1, "tag_id": t * 3 + k + 1}
+            for b, t in enumerate(book_topic)
+            for k in rng.sample(range(3), rng.randint(1, 2))
+        ],
+    )
+
+    by_topic: dict[int, list[int]] = {}
+    for b, t in enumerate(book_topic):
+        by_topic.setdefault(t, []).append(b + 1)
+    # a long-tailed popularity inside each topic, like real catalogs
+    popularity = {book_id: 1.0 / (rank + 1) ** 0.8 for pool in by_topic.values() for rank, book_id in enumerate(pool)}
+
+    _bulk(
+        db,
+        User.__table__,
+        [
+            {"id": u + 1, "email": f"reader{u}@example.com", "username": f"reader{u}", "hashed_password": "-"}
+            for u in range(users)
+        ],
+    )
+    _bulk(db, Shelf.__table__, [{"id": u + 1, "user_id": u + 1, "name": "read", "is_system": True} for u in range(users)])
+
+    memberships: list[dict] = []
+    reviews: list[dict] = []
+    for u in range(users):
+        favourites = rng.sample(range(topics), k=min(topics, rng.choice((1, 2))))
+        picked: set[int] = set()
+        for _ in range(reads_per_user):
+            pool = by_topic[rng.choice(favourites)] if rng.random() < 0.8 else by_topic[rng.randrange(topics)]
+            picked.add(rng.choices(pool, weights=[popularity[b] for b in pool])[0])
+        for book_id in picked:
+            liked_topic = book_topic[book_id - 1] in favourites
+            rating = rng.choice((4, 5, 5)) if liked_topic else rng.choice((1, 2, 3, 4))
+            memberships.append({"shelf_id": u + 1, "book_id": book_id})
+            reviews.append({"user_id": u + 1, "book_id": book_id, "rating": rating})
+    _bulk(db, shelf_books, memberships)
+    _bulk(db, Review.__table__, reviews)
+    db.commit()
+
+
+def copy_dataset(db: Session, source_url: str) -> None:
+    """Copy every table of an existing database into the benchmark database."""
+    source = create_engine(source_url)
+    with source.connect() as conn:
+        for table in Base.metadata.sorted_tables:
+            rows = [dict(r._mapping) for r in conn.execute(select(table))]
+            if rows:
+                _bulk(db, table, rows)
+    source.dispose()
+    db.commit()
+
+
+def hold_out(db: Session, fraction: float, min_liked: int, max_users: int, seed: int) -> dict[int, set[int]]:
+    """Hide a share of liked (read and rated >= 4) books for up to `max_users` users."""
+    rng = random.Random(seed)
+    liked: dict[int, list[int]] = {}
+    rows = db.execute(
+        select(Review.user_id, Review.book_id)
+        .join(Shelf, Shelf.user_id == Review.user_id)
+        .join(shelf_books, (shelf_books.c.shelf_id == Shelf.id) & (shelf_books.c.book_id == Review.book_id))
+        .where(Shelf.name == "read", Review.rating >= LIKED_RATING, Review.is_hidden == False)  # noqa: E712
+        .order_by(Review.user_id, Review.book_id)
+    )
+    for user_id, book_id in rows:
+        liked.setdefault(user_id, []).append(book_id)
+
+    eligible = sorted(u for u, books in liked.items() if len(books) >= min_liked)
+    chosen = sorted(rng.sample(eligible, min(max_users, len(eligible))))
+
+    held: dict[int, set[int]] = {}
+    for user_id in chosen:
+        books = liked[user_id]
+        held[user_id] = set(rng.sample(books, max(1, int(len(books) * fraction))))
+        shelf_ids = select(Shelf.id).where(Shelf.user_id == user_id)
+        db.execute(
+            delete(shelf_books).where(shelf_books.c.shelf_id.in_(shelf_ids), shelf_books.c.book_id.in_(held[user_id]))
+        )
+        db.execute(delete(Review).where(Review.user_id == user_id, Review.book_id.in_(held[user_id])))
+    db.commit()
+    return held
+
+
+@dataclass
+class EndpointResult:
+    name: str
+    k: int
+    precision: list[float] = field(default_factory=list)
+    recall: list[float] = field(default_factory=list)
+    latency_ms: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+
+    def record(self, returned: list[int], held: set[int], elapsed: float, query_count: int) -> None:
+        hits = len(set(returned[: self.k]) & held)
+        self.precision.append(hits / self.k)
+        self.recall.append(hits / len(held))
+        self.latency_ms.append(elapsed * 1000)
+        self.queries.append(query_count)
+
+    def summary(self) -> dict:
+        if not self.latency_ms:
+            return {"endpoint": self.name, "users": 0}
+        latencies = sorted(self.latency_ms)
+        return {
+            "endpoint": self.name,
+            "users": len(latencies),
+            f"precision@{self.k}": round(statistics.fmean(self.precision), 4),
+            f"recall@{self.k}": round(statistics.fmean(self.recall), 4),
+            "p50_ms": round(latencies[len(latencies) // 2], 2),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+            "mean_queries": round(statistics.fmean(self.queries), 1),
+            "max_queries": max(self.queries),
+        }
+
+
+def _measure(db: Session, call: Callable[[], list[int]]) -> tuple[list[int], float, int]:
+    recommendation_cache.clear()  # benchmark the computation, not cache hits
+    db.expire_all()
+    with collect_queries() as stats:
+        started = time.perf_counter()
+        returned = call()
+        elapsed = time.perf_counter() - started
+    return returned, elapsed, stats.count
+
+
+def evaluate(db: Session, held: dict[int, set[int]], k: int) -> list[EndpointResult]:
+    sections, per = 3, 3
+    results = {
+        "list": EndpointResult("/me/recommendations", k),
+        "sections": EndpointResult("/me/recommendations/sections", sections * per),
+        "similar": EndpointResult("/books/{id}/similar", min(k, 20)),
+    }
+
+    for user_id, hidden in held.items():
+        user = db.get(User, user_id)
+
+        returned, elapsed, count = _measure(
+            db, lambda: [b["id"] for b in recommendation_list(limit=k, offset=0, fields=None, user=user, db=db)]
+        )
+        results["list"].record(returned, hidden, elapsed, count)
+
+        returned, elapsed, count = _measure(
+            db,
+            lambda: [
+                b["id"]
+                for s in recommendation_sections(sections=sections, per=per, fields=None, user=user, db=db)
+                for b in s["items"]
+            ],
+        )
+        results["sections"].record(returned, hidden, elapsed, count)
+
+        query_book = db.execute(
+            select(Review.book_id)
+            .where(Review.user_id == user_id, Review.rating >= LIKED_RATING)
+            .order_by(Review.rating.desc(), Review.book_id)
+            .limit(1)
+        ).scalar_one_or_none()
+        if query_book is not None:
+            similar = results["similar"]
+            returned, elapsed, count = _measure(
+                db, lambda: [r["book"]["id"] for r in similar_books(query_book, limit=similar.k, fields=None, db=db)]
+            )
+            similar.record(returned, hidden, elapsed, count)
+
+    return list(results.values())
+
+
+def run(args: argparse.Namespace) -> dict:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+    try:
+        started = time.perf_counter()
+        if args.source_url:
+            copy_dataset(db, args.source_url)
+        else:
+            generate_dataset(db, args.books, args.users, args.reads_per_user, args.seed)
+        held = hold_out(db, args.holdout, args.min_liked, args.eval_users, args.seed)
+        rebuild_book_rating_stats(db)
+        rebuild_book_neighbors(db)
+        if args.trait_index:
+            trait_index.rebuild(db)
+        prepared = time.perf_counter() - started
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = Path(tmp) / "item_knn.npz"
+            if args.cf:
+                train_item_knn(db).save(model_path)
+            with mock.patch.object(settings, "CF_MODEL_PATH", str(model_path)):
+                results = evaluate(db, held, args.k)
+
+        return {
+            "dataset": "copy" if args.source_url else "synthetic",
+            "eval_users": len(held),
+            "collaborative": bool(args.cf),
+            "trait_index": bool(args.trait_index),
+            "prepare_seconds": round(prepared, 1),
+            "results": [r.summary() for r in results],
+        }
+    finally:
+        recommendation_cache.clear()
+        trait_index.clear()
+        db.close()
+        engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source-url", help="copy this database instead of generating one (read only)")
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--reads-per-user", type=int, default=30)
+    parser.add_argument("--eval-users", type=int, default=200)
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of liked books hidden per user")
+    parser.add_argument("--min-liked", type=int, default=5)
+    parser.add_argument("--k", type=int, default=12)
+    parser.add_argument("--cf", action="store_true", help="train and serve the collaborative model")
+    parser.add_argument("--trait-index", action="store_true", help="generate candidates from the in-memory index")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(
+        f"{report['dataset']} dataset, {report['eval_users']} users evaluated, "
+        f"collaborative={'on' if report['collaborative'] else 'off'}, "
+        f"trait index={'on' if report['trait_index'] else 'off'}, prepared in {report['prepare_seconds']}s"
+    )
+    for row in report["results"]:
+        print("  " + "  ".join(f"{key}={value}" for key, value in row.items()))
+
+
+if __name__ == "__main__":
+    main()
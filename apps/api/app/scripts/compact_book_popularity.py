@@ -0,0 +1,27 @@
+import argparse
+
+from sqlalchemy.orm import Session
+
+from app.core.trending import compact_book_popularity, rebuild_book_popularity
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prune decayed trending scores")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every score from reviews and statuses")
+    args = parser.parse_args()
+
+    db: Session = SessionLocal()
+
+    try:
+        if args.rebuild:
+            written = rebuild_book_popularity(db)
+            print(f"Rebuilt popularity for {written} books")
+        removed = compact_book_popularity(db)
+        print(f"Removed {removed} decayed popularity rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
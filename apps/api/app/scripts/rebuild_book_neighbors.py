@@ -0,0 +1,24 @@
+import resource
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.book_neighbors import rebuild_book_neighbors
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    db: Session = SessionLocal()
+
+    try:
+        started = time.perf_counter()
+        written = rebuild_book_neighbors(db)
+        elapsed = time.perf_counter() - started
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"Wrote {written} book neighbors in {elapsed:.1f}s (peak RSS {peak_mb:.0f} MB)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from sqlalchemy.orm import Session
+
+from app.core.book_stats import rebuild_book_rating_stats
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    db: Session = SessionLocal()
+
+    try:
+        written = rebuild_book_rating_stats(db)
+        print(f"Rebuilt rating stats for {written} books")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
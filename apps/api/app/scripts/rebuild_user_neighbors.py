@@ -0,0 +1,33 @@
+import argparse
+import resource
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.user_neighbors import LSH_BITS, LSH_TABLES, NEIGHBORS_PER_USER, rebuild_user_neighbors
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the similar-readers index")
+    parser.add_argument("--k", type=int, default=NEIGHBORS_PER_USER)
+    parser.add_argument("--lsh", action="store_true", help="approximate with random-projection LSH (large user bases)")
+    parser.add_argument("--tables", type=int, default=LSH_TABLES)
+    parser.add_argument("--bits", type=int, default=LSH_BITS)
+    args = parser.parse_args()
+
+    db: Session = SessionLocal()
+
+    try:
+        started = time.perf_counter()
+        options = {"tables": args.tables, "bits": args.bits} if args.lsh else {}
+        written = rebuild_user_neighbors(db, args.k, lsh=args.lsh, **options)
+        elapsed = time.perf_counter() - started
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"Wrote {written} user neighbors in {elapsed:.1f}s (peak RSS {peak_mb:.0f} MB)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import argparse
+
+from sqlalchemy.orm import Session
+
+from app.core.follow_counts import repair_follow_counts
+from app.core.notifications import repair_notification_counters
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute denormalized per-user counters")
+    parser.add_argument("--user", type=int, action="append", dest="user_ids", help="only this user (repeatable)")
+    args = parser.parse_args()
+
+    db: Session = SessionLocal()
+
+    try:
+        updated = repair_follow_counts(db, args.user_ids)
+        print(f"Repaired follower/following counts for {updated} users")
+        updated = repair_notification_counters(db, args.user_ids)
+        print(f"Repaired unread notification counters for {updated} users")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import resource
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.cf_model import train_item_knn
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+
+def main() -> None:
+    db: Session = SessionLocal()
+
+    try:
+        started = time.perf_counter()
+        model = train_item_knn(db)
+        model.save(settings.CF_MODEL_PATH)
+        elapsed = time.perf_counter() - started
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        meta = model.meta
+        print(
+            f"Trained item-kNN on {meta.get('interactions', 0)} interactions "
+            f"({meta.get('users', 0)} users, {meta.get('items', 0)} books) in {elapsed:.1f}s "
+            f"(peak RSS {peak_mb:.0f} MB) -> {settings.CF_MODEL_PATH}"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
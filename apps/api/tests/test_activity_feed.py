@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_stats import query_budget
+from app.db.base import Base
+from app.deps import get_current_user, get_db
+from app.main import app
+from app.models import Author, Book, Follow, ReadingStatus, Review, User
+
+
+class ActivityFeedTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.me = User(email="me@example.com", username="me", hashed_password="hashed")
+        self.friend = User(email="friend@example.com", username="friend", hashed_password="hashed")
+        self.stranger = User(email="stranger@example.com", username="stranger", hashed_password="hashed")
+        herbert = Author(name="Frank Herbert")
+        self.books = [Book(title=f"Book {i}", authors=[herbert]) for i in range(6)]
+        self.db.add_all([self.me, self.friend, self.stranger, *self.books])
+        self.db.flush()
+        self.db.add(Follow(requester_id=self.me.id, target_id=self.friend.id, status="accepted"))
+        self.db.commit()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _as(self, user: User) -> None:
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    def _feed(self, **params) -> tuple[list[tuple[str, str]], str | None]:
+        self._as(self.me)
+        res = self.client.get("/me/activity", params=params)
+        self.assertEqual(res.status_code, 200)
+        return [(i["type"], i["book"]["title"]) for i in res.json()], res.headers.get(NEXT_CURSOR_HEADER)
+
+    def test_writes_feed_followers_newest_first_with_cursor(self) -> None:
+        self._as(self.friend)
+        for book in self.books[:4]:
+            self.client.post(f"/books/{book.id}/status", json={"status": "reading"})
+        self.client.post(f"/books/{self.books[0].id}/reviews", json={"rating": 5, "body": "Great"})
+        self.client.post(f"/books/{self.books[1].id}/status", json={"status": "finished"})
+        self._as(self.stranger)
+        self.client.post(f"/books/{self.books[5].id}/status", json={"status": "reading"})
+
+        first, cursor = self._feed(limit=3)
+        self.assertEqual(
+            first, [("status", "Book 1"), ("review", "Book 0"), ("status", "Book 3")]
+        )
+        second, cursor = self._feed(limit=3, after=cursor)
+        self.assertEqual(second, [("status", "Book 2"), ("status", "Book 0")])
+        self.assertIsNone(cursor)
+
+    def test_deleted_and_hidden_activity_drops_out(self) -> None:
+        self._as(self.friend)
+        self.client.post(f"/books/{self.books[0].id}/status", json={"status": "reading"})
+        self.client.post(f"/books/{self.books[1].id}/reviews", json={"rating": 4})
+        self.client.post(f"/books/{self.books[2].id}/reviews", json={"rating": 2})
+        self.client.delete(f"/books/{self.books[0].id}/status")
+        review = self.db.query(Review).filter_by(book_id=self.books[2].id).one()
+        review.is_hidden = True
+        self.db.commit()
+
+        self.assertEqual(self._feed()[0], [("review", "Book 1")])
+
+    def test_query_count_does_not_depend_on_history(self) -> None:
+        self._as(self.friend)
+        for book in self.books:
+            self.client.post(f"/books/{book.id}/status", json={"status": "reading"})
+            self.client.post(f"/books/{book.id}/reviews", json={"rating": 4})
+        self.db.expire_all()
+
+        with query_budget(6):
+            items, _ = self._feed(limit=2)
+        self.assertEqual(len(items), 2)
+
+
+    def test_profile_activity_merges_statuses_and_reviews_in_sql(self) -> None:
+        start = datetime(2026, 5, 1)
+        for i, book in enumerate(self.books):
+            self.db.add(
+                ReadingStatus(
+                    user_id=self.friend.id, book_id=book.id, status="finished", updated_at=start + timedelta(hours=2 * i)
+                )
+            )
+            self.db.add(
+                Review(
+                    user_id=self.friend.id,
+                    book_id=book.id,
+                    rating=4,
+                    is_hidden=i == 3,
+                    updated_at=start + timedelta(hours=2 * i + 1),
+                )
+            )
+        self.db.commit()
+        self.db.expire_all()
+        self._as(self.me)
+        path = f"/users/{self.friend.id}/activity"
+
+        seen: list[tuple[str, str]] = []
+        cursor = None
+        while True:
+            with query_budget(9):
+                res = self.client.get(path, params={"limit": 4, **({"after": cursor} if cursor else {})})
+            seen += [(i["type"], i["book"]["title"]) for i in res.json()]
+            cursor = res.headers.get(NEXT_CURSOR_HEADER)
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 11)  # one hidden review left out
+        self.assertEqual(seen[:3], [("review", "Book 5"), ("status", "Book 5"), ("review", "Book 4")])
+        self.assertNotIn(("review", "Book 3"), seen)
+        self.assertEqual(seen[-1], ("status", "Book 0"))
+        offset_page = self.client.get(path, params={"limit": 2, "offset": 2}).json()
+        self.assertEqual([(i["type"], i["book"]["title"]) for i in offset_page], seen[2:4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.autocomplete import AutocompleteIndex, autocomplete_index
+from app.db.base import Base
+from app.deps import get_db, require_admin
+from app.main import app
+from app.models import Author, Book, BookRatingStats, User
+
+
+class AutocompleteIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.herbert = Author(name="Frank Herbert")
+        self.dune = Book(title="Dune", authors=[self.herbert])
+        self.messiah = Book(title="Dune Messiah", authors=[self.herbert])
+        self.children = Book(title="Children of Dune", authors=[self.herbert])
+        self.heretics = Book(title="Heretics of Dune", authors=[self.herbert])
+        self.admin = User(email="admin@example.com", username="admin", hashed_password="hashed", role="admin")
+        self.db.add_all([self.herbert, self.dune, self.messiah, self.children, self.heretics, self.admin])
+        self.db.commit()
+        self.db.add(BookRatingStats(book_id=self.children.id, rating_sum=50, rating_count=10, rating_avg=5.0))
+        self.db.commit()
+
+        self.index = AutocompleteIndex()
+        self.index.rebuild(self.db)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        autocomplete_index.clear()
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def test_prefix_ranking(self) -> None:
+        self.assertEqual([e.label for e in self.index.search("book", "Dün", 5)][0], "Dune")
+        labels = [e.label for e in self.index.search("book", "du", 2)]
+        self.assertEqual(labels, ["Dune", "Dune Messiah"])
+        self.assertEqual([e.label for e in self.index.search("book", "dune chi", 5)], ["Children of Dune"])
+
+    def test_popularity_breaks_ties(self) -> None:
+        labels = [e.label for e in self.index.search("book", "of", 5)]
+        self.assertEqual(labels, ["Children of Dune", "Heretics of Dune"])
+
+    def test_incremental_updates(self) -> None:
+        self.messiah.title = "Messiah"
+        self.index.upsert_book(self.messiah)
+        labels = [e.label for e in self.index.search("book", "dune", 5)]
+        self.assertEqual(labels, ["Dune", "Children of Dune", "Heretics of Dune"])
+
+        self.index.remove("book", self.dune.id)
+        self.assertNotIn("Dune", [e.label for e in self.index.search("book", "dune", 5)])
+        self.assertEqual(self.index.stats()["book_entries"], 3)
+
+    def test_search_endpoint_uses_index(self) -> None:
+        autocomplete_index.rebuild(self.db)
+
+        def no_db():
+            # any attribute access on the session would fail the request
+            yield None
+
+        app.dependency_overrides[get_db] = no_db
+        app.dependency_overrides[require_admin] = lambda: self.admin
+        client = TestClient(app)
+
+        payload = client.get("/search", params={"q": "frank"}).json()
+        self.assertEqual([a["name"] for a in payload["authors"]], ["Frank Herbert"])
+        payload = client.get("/search", params={"q": "dune"}).json()
+        self.assertEqual(payload["books"][0]["authors"][0]["name"], "Frank Herbert")
+        self.assertEqual(client.get("/search", params={"q": "@adm"}).json()["users"][0]["username"], "admin")
+
+        stats = client.get("/admin/search-index").json()
+        self.assertTrue(stats["ready"])
+        self.assertEqual(stats["author_entries"], 1)
+        self.assertGreater(stats["approx_bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
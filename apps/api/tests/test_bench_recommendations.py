@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import unittest
+
+from app.scripts import bench_recommendations as bench
+
+
+class BenchRecommendationsTests(unittest.TestCase):
+    def test_small_synthetic_run_reports_every_endpoint(self) -> None:
+        args = bench.argparse.Namespace(
+            source_url=None,
+            books=120,
+            users=40,
+            reads_per_user=12,
+            eval_users=10,
+            holdout=0.2,
+            min_liked=5,
+            k=5,
+            cf=True,
+            trait_index=True,
+            seed=3,
+        )
+        report = bench.run(args)
+
+        self.assertEqual(report["eval_users"], 10)
+        by_name = {row["endpoint"]: row for row in report["results"]}
+        self.assertEqual(set(by_name), {"/me/recommendations", "/me/recommendations/sections", "/books/{id}/similar"})
+        listing = by_name["/me/recommendations"]
+        self.assertEqual(listing["users"], 10)
+        self.assertTrue(0.0 <= listing["precision@5"] <= 1.0)
+        self.assertGreater(listing["max_queries"], 0)
+        self.assertLessEqual(listing["p50_ms"], listing["p95_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
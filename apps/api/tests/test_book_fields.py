@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db.base import Base
+from app.deps import get_db
+from app.main import app
+from app.models import Author, Book, Genre, Tag
+
+
+class SparseFieldsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        author = Author(name="N. K. Jemisin")
+        self.books = [
+            Book(
+                title=f"Book {i}",
+                description="long text",
+                authors=[author],
+                tags=[Tag(name=f"t{i}")],
+                genres=[Genre(name=f"g{i}")],
+            )
+            for i in range(3)
+        ]
+        self.db.add_all(self.books)
+        self.db.commit()
+        self.book_id = self.books[0].id
+        self.db.expunge_all()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _get(self, path: str, **params):
+        statements: list[str] = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            res = self.client.get(path, params=params)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.db.expunge_all()
+        return res, statements
+
+    def test_only_requested_fields_are_loaded_and_returned(self) -> None:
+        res, statements = self._get("/books", fields="title,cover_url", limit=2)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([set(b) for b in res.json()], [{"id", "title", "cover_url"}] * 2)
+        self.assertIn(NEXT_CURSOR_HEADER, res.headers)
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn("description", statements[0])
+
+        res, statements = self._get("/books", fields="title,authors")
+        self.assertEqual(res.json()[0]["authors"][0]["name"], "N. K. Jemisin")
+        self.assertEqual(len(statements), 2)
+
+    def test_default_response_unchanged(self) -> None:
+        res, statements = self._get(f"/books/{self.book_id}")
+        self.assertEqual(res.json()["genres"][0]["name"], "g0")
+        self.assertEqual(res.json()["description"], "long text")
+
+        trimmed, _ = self._get(f"/books/{self.book_id}", fields="rating_avg")
+        self.assertEqual(trimmed.json(), {"id": self.book_id, "rating_avg": None})
+        self.assertNotEqual(trimmed.headers["ETag"], res.headers["ETag"])
+
+    def test_unknown_field_rejected(self) -> None:
+        res, _ = self._get("/books", fields="title,isbn")
+        self.assertEqual(res.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.book_neighbors import REASON_AUTHOR, REASON_GENRE, rebuild_book_neighbors
+from app.core.query_stats import query_budget
+from app.db.base import Base
+from app.deps import get_db, require_admin
+from app.main import app
+from app.models import Author, Book, BookNeighbor, BookRatingStats, Genre, Tag, User
+
+
+class BookNeighborsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        le_guin = Author(name="Ursula K. Le Guin")
+        other = Author(name="Someone Else")
+        self.sf = sf = Genre(name="Science fiction")
+        fantasy = Genre(name="Fantasy")
+        self.anarchy = Tag(name="anarchy")
+        self.seed = Book(title="The Dispossessed", authors=[le_guin], genres=[sf], tags=[self.anarchy])
+        self.same_author = Book(title="The Left Hand of Darkness", authors=[le_guin], genres=[sf])
+        self.same_genre = Book(title="Dune", authors=[other], genres=[sf])
+        self.unrelated = Book(title="The Hobbit", genres=[fantasy])
+        self.admin = User(email="admin@example.com", username="admin", hashed_password="hashed", role="admin")
+        self.db.add_all([self.seed, self.same_author, self.same_genre, self.unrelated, self.admin])
+        self.db.commit()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[require_admin] = lambda: self.admin
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _neighbors(self, book_id: int) -> dict[int, tuple[float, int]]:
+        rows = self.db.execute(select(BookNeighbor).where(BookNeighbor.book_id == book_id)).scalars()
+        return {r.neighbor_id: (r.score, r.reasons) for r in rows}
+
+    def test_rebuild_scores_shared_traits(self) -> None:
+        rebuild_book_neighbors(self.db)
+
+        neighbors = self._neighbors(self.seed.id)
+        self.assertEqual(neighbors[self.same_author.id], (3.0, REASON_AUTHOR | REASON_GENRE))
+        self.assertEqual(neighbors[self.same_genre.id], (1.0, REASON_GENRE))
+        self.assertNotIn(self.unrelated.id, neighbors)
+        self.assertNotIn(self.seed.id, neighbors)
+
+    def test_endpoint_reranks_with_live_rating(self) -> None:
+        rebuild_book_neighbors(self.db)
+        self.db.add(BookRatingStats(book_id=self.same_genre.id, rating_sum=5, rating_count=1, rating_avg=5.0))
+        self.db.commit()
+        path = f"/books/{self.seed.id}/similar"
+        self.db.expire_all()
+
+        with query_budget(5):
+            payload = self.client.get(path).json()
+        self.assertEqual([item["book"]["title"] for item in payload], ["The Left Hand of Darkness", "Dune"])
+        self.assertEqual(payload[0]["reasons"], ["Same author", "Same genre"])
+        self.assertEqual(payload[1]["reasons"], ["Same genre", "Highly rated"])
+
+    def test_admin_trait_change_refreshes_both_directions(self) -> None:
+        rebuild_book_neighbors(self.db)
+        res = self.client.patch(f"/admin/books/{self.unrelated.id}", json={"tag_ids": [self.anarchy.id]})
+        self.assertEqual(res.status_code, 200)
+
+        self.assertIn(self.seed.id, self._neighbors(self.unrelated.id))
+        self.assertIn(self.unrelated.id, self._neighbors(self.seed.id))
+
+        self.client.patch(f"/admin/books/{self.unrelated.id}", json={"tag_ids": []})
+        self.assertEqual(self._neighbors(self.unrelated.id), {})
+        self.assertNotIn(self.unrelated.id, self._neighbors(self.seed.id))
+
+    def test_deleting_a_genre_rescores_pairs_that_shared_it(self) -> None:
+        rebuild_book_neighbors(self.db)
+        res = self.client.delete(f"/admin/genres/{self.sf.id}")
+        self.assertEqual(res.status_code, 204)
+
+        neighbors = self._neighbors(self.seed.id)
+        self.assertEqual(neighbors, {self.same_author.id: (2.0, REASON_AUTHOR)})
+        self.assertEqual(self._neighbors(self.same_genre.id), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
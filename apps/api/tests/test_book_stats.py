@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.book_stats import rebuild_book_rating_stats
+from app.db.base import Base
+from app.db.upsert import insert_if_missing
+from app.deps import get_current_user, get_db
+from app.main import app
+from app.models import Book, BookRatingStats, Review, User
+
+
+class BookRatingStatsApiTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.reader = User(email="reader@example.com", username="reader", hashed_password="hashed")
+        self.other = User(email="other@example.com", username="other", hashed_password="hashed")
+        self.book = Book(title="Dune", description=None, published_year=1965)
+        self.db.add_all([self.reader, self.other, self.book])
+        self.db.commit()
+        self.db.refresh(self.reader)
+        self.db.refresh(self.other)
+        self.db.refresh(self.book)
+
+        self.current_user = self.reader
+
+        def override_get_db():
+            try:
+                yield self.db
+            finally:
+                pass
+
+        def override_get_current_user():
+            return self.current_user
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = override_get_current_user
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _stats(self) -> BookRatingStats | None:
+        self.db.expire_all()
+        return self.db.get(BookRatingStats, self.book.id)
+
+    def test_review_writes_maintain_stats(self) -> None:
+        self.client.post(f"/books/{self.book.id}/reviews", json={"rating": 5})
+        self.current_user = self.other
+        self.client.post(f"/books/{self.book.id}/reviews", json={"rating": 2})
+
+        stats = self._stats()
+        self.assertIsNotNone(stats)
+        self.assertEqual((stats.rating_sum, stats.rating_count), (7, 2))
+        self.assertEqual((stats.rating_2_count, stats.rating_5_count), (1, 1))
+        self.assertAlmostEqual(stats.rating_avg, 3.5)
+
+        self.client.post(f"/books/{self.book.id}/reviews", json={"rating": 4})
+        stats = self._stats()
+        self.assertEqual((stats.rating_sum, stats.rating_count), (9, 2))
+        self.assertEqual((stats.rating_2_count, stats.rating_4_count), (0, 1))
+
+        self.client.delete(f"/books/{self.book.id}/reviews/me")
+        stats = self._stats()
+        self.assertEqual((stats.rating_sum, stats.rating_count), (5, 1))
+        self.assertAlmostEqual(stats.rating_avg, 5.0)
+
+        payload = self.client.get(f"/books/{self.book.id}").json()
+        self.assertAlmostEqual(payload["rating_avg"], 5.0)
+        self.assertEqual(payload["rating_count"], 1)
+
+    def test_hidden_review_counts_again_after_edit(self) -> None:
+        self.db.add(Review(user_id=self.reader.id, book_id=self.book.id, rating=3, is_hidden=True))
+        self.db.commit()
+
+        self.client.post(f"/books/{self.book.id}/reviews", json={"rating": 4})
+        stats = self._stats()
+        self.assertEqual((stats.rating_sum, stats.rating_count, stats.rating_3_count), (4, 1, 0))
+
+    def test_row_created_concurrently_is_locked_not_reinserted(self) -> None:
+        # another transaction committed the book's first rating in the meantime
+        created = insert_if_missing(self.db, BookRatingStats, book_id=self.book.id, rating_sum=4, rating_count=1)
+        self.assertTrue(created)
+        self.assertFalse(insert_if_missing(self.db, BookRatingStats, book_id=self.book.id))
+        self.db.commit()
+
+        res = self.client.post(f"/books/{self.book.id}/reviews", json={"rating": 2})
+        self.assertEqual(res.status_code, 200)
+        stats = self._stats()
+        self.assertEqual((stats.rating_sum, stats.rating_count), (6, 2))
+
+    def test_rebuild_matches_reviews(self) -> None:
+        self.db.add_all(
+            [
+                Review(user_id=self.reader.id, book_id=self.book.id, rating=1),
+                Review(user_id=self.other.id, book_id=self.book.id, rating=4),
+            ]
+        )
+        self.db.commit()
+
+        self.assertEqual(rebuild_book_rating_stats(self.db), 1)
+        stats = self._stats()
+        self.assertEqual((stats.rating_sum, stats.rating_count), (5, 2))
+        self.assertEqual((stats.rating_1_count, stats.rating_4_count), (1, 1))
+        self.assertAlmostEqual(stats.rating_avg, 2.5)
+
+        books = self.client.get("/books").json()
+        self.assertEqual(books[0]["rating_count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
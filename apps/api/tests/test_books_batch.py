@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.deps import get_db
+from app.main import app
+from app.models import Author, Book, Tag
+
+
+class BookBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        author = Author(name="Octavia Butler")
+        tag = Tag(name="sf")
+        self.books = [Book(title=f"Book {i}", authors=[author], tags=[tag]) for i in range(30)]
+        self.db.add_all(self.books)
+        self.db.commit()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _count_statements(self, path: str) -> tuple[list, int]:
+        self.db.expire_all()
+        statements: list[str] = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            payload = self.client.get(path).json()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        return payload, len(statements)
+
+    def test_input_order_and_missing_ids(self) -> None:
+        ids = [self.books[5].id, 9999, self.books[0].id, self.books[5].id]
+        payload = self.client.get("/books", params={"ids": ",".join(map(str, ids))}).json()
+        self.assertEqual([b["id"] for b in payload], [self.books[5].id, self.books[0].id])
+        self.assertEqual(payload[0]["authors"][0]["name"], "Octavia Butler")
+
+    def test_constant_query_count(self) -> None:
+        _, few = self._count_statements(f"/books?ids={self.books[0].id}")
+        payload, many = self._count_statements("/books?ids=" + ",".join(str(b.id) for b in self.books))
+        self.assertEqual(len(payload), 30)
+        self.assertEqual(few, many)
+
+    def test_rejects_bad_ids(self) -> None:
+        self.assertEqual(self.client.get("/books", params={"ids": "1,x"}).status_code, 422)
+        self.assertEqual(self.client.get("/books", params={"ids": "1,\u00b2"}).status_code, 422)
+        self.assertEqual(self.client.get("/books", params={"ids": "1,99999999999999999999"}).status_code, 422)
+        too_many = ",".join(str(i) for i in range(1, 202))
+        self.assertEqual(self.client.get("/books", params={"ids": too_many}).status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
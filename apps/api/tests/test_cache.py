@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.core.cache import GroupedTTLCache
+
+
+class GroupedTTLCacheTests(unittest.TestCase):
+    def test_concurrent_misses_compute_once(self) -> None:
+        cache = GroupedTTLCache("test", ttl_seconds=60)
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return [1, 2, 3]
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute(1, "list", compute)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[1, 2, 3]] * 8)
+
+    def test_ttl_expiry_recomputes(self) -> None:
+        cache = GroupedTTLCache("test", ttl_seconds=10)
+        with mock.patch("app.core.cache.time.monotonic", return_value=100.0):
+            self.assertEqual(cache.get_or_compute(1, "k", lambda: "old"), "old")
+            self.assertEqual(cache.get_or_compute(1, "k", lambda: "new"), "old")
+        with mock.patch("app.core.cache.time.monotonic", return_value=111.0):
+            self.assertEqual(cache.get_or_compute(1, "k", lambda: "new"), "new")
+
+    def test_invalidate_drops_group_and_in_flight_result(self) -> None:
+        cache = GroupedTTLCache("test", ttl_seconds=60)
+        cache.get_or_compute(2, "k", lambda: "other user")
+
+        def compute_then_write():
+            cache.invalidate(1)  # a write lands while this computation is running
+            return "stale"
+
+        self.assertEqual(cache.get_or_compute(1, "k", compute_then_write), "stale")
+        self.assertEqual(cache.get_or_compute(1, "k", lambda: "fresh"), "fresh")
+        self.assertEqual(cache.get_or_compute(2, "k", lambda: "recomputed"), "other user")
+
+    def test_latest_key_only_replaces_older_versions(self) -> None:
+        cache = GroupedTTLCache("test", ttl_seconds=60, latest_key_only=True)
+        cache.get_or_compute(1, ("v", 1), lambda: "first")
+        cache.get_or_compute(1, ("v", 2), lambda: "second")
+
+        self.assertEqual(list(cache._entries[1]), [("v", 2)])
+        self.assertEqual(cache.get_or_compute(1, ("v", 1), lambda: "recomputed"), "recomputed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.cf_model import ItemKnnModel, train_item_knn
+from app.core.config import settings
+from app.core.recommendations import recommendation_cache
+from app.db.base import Base
+from app.deps import get_current_user, get_db
+from app.main import app
+from app.models import Book, Genre, Review, Shelf, User
+
+
+class CfModelTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+        recommendation_cache.clear()
+
+        sf = Genre(name="Science fiction")
+        self.books = {t: Book(title=t, genres=[sf]) for t in ("A", "B", "C", "D", "E", "F")}
+        self.users = [User(email=f"u{i}@example.com", username=f"u{i}", hashed_password="hashed") for i in range(4)]
+        self.db.add_all([*self.books.values(), *self.users])
+
+        # readers of A and B also read C; D is only read alongside E
+        self._read(self.users[0], "A", "B", "C")
+        self._read(self.users[1], "A", "B", "C", "D")
+        self._read(self.users[2], "D", "E")
+        self.target = self.users[3]
+        self._read(self.target, "A", "B", "F")
+        self.db.add(Review(user=self.target, book=self.books["F"], rating=1))
+        self.db.commit()
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model_path = Path(self.tmp.name) / "item_knn.npz"
+        patcher = mock.patch.object(settings, "CF_MODEL_PATH", str(self.model_path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: self.target
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _read(self, user: User, *titles: str, shelf: str = "read") -> None:
+        self.db.add(Shelf(user=user, name=shelf, is_system=True, books=[self.books[t] for t in titles]))
+
+    def test_save_load_round_trip(self) -> None:
+        model = train_item_knn(self.db)
+        model.save(self.model_path)
+        loaded = ItemKnnModel.load(self.model_path)
+
+        self.assertEqual(loaded.item_ids.tolist(), model.item_ids.tolist())
+        self.assertEqual((loaded.neighbors != model.neighbors).nnz, 0)
+        self.assertEqual(loaded.meta["users"], 4)
+
+    def test_low_rating_is_not_a_positive_signal(self) -> None:
+        model = train_item_knn(self.db)
+        # F was only shelved by the target, who rated it 1
+        self.assertNotIn(self.books["F"].id, model.item_ids.tolist())
+
+    def test_warm_user_gets_collaborative_ranking(self) -> None:
+        train_item_knn(self.db).save(self.model_path)
+        self._read(self.target, "E", shelf="to-read")
+        self.db.commit()
+
+        titles = [b["title"] for b in self.client.get("/me/recommendations").json()]
+        self.assertEqual(titles[:2], ["C", "D"])
+        self.assertNotIn("E", titles)
+
+    def test_cold_user_falls_back_to_traits(self) -> None:
+        train_item_knn(self.db).save(self.model_path)
+        newcomer = User(email="new@example.com", username="new", hashed_password="hashed")
+        self._read(newcomer, "A")
+        self.db.add(Review(user=newcomer, book=self.books["A"], rating=5))
+        self.db.commit()
+        app.dependency_overrides[get_current_user] = lambda: newcomer
+
+        titles = [b["title"] for b in self.client.get("/me/recommendations").json()]
+        self.assertEqual(titles, ["B", "C", "D", "E", "F"])
+
+
+if __name__ == "__main__":
+    unittest.main()
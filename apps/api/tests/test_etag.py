@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.deps import get_current_user, get_db, require_admin
+from app.main import app
+from app.models import Author, Book, User
+
+
+class ConditionalGetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.author = Author(name="Ursula K. Le Guin")
+        self.book = Book(title="The Dispossessed", authors=[self.author])
+        self.admin = User(email="admin@example.com", username="admin", hashed_password="hashed", role="admin")
+        self.reader = User(email="reader@example.com", username="reader", hashed_password="hashed")
+        self.db.add_all([self.author, self.book, self.admin, self.reader])
+        self.db.commit()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: self.reader
+        app.dependency_overrides[require_admin] = lambda: self.admin
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _revalidate(self, path: str) -> tuple[str, int]:
+        etag = self.client.get(path).headers["ETag"]
+        return etag, self.client.get(path, headers={"If-None-Match": etag}).status_code
+
+    def test_not_modified_skips_body_queries(self) -> None:
+        etag = self.client.get(f"/books/{self.book.id}").headers["ETag"]
+
+        statements: list[str] = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            res = self.client.get(f"/books/{self.book.id}", headers={"If-None-Match": etag})
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.headers["ETag"], etag)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(len(statements), 1)
+
+    def test_review_write_changes_book_and_reviews_etags(self) -> None:
+        book_etag, status = self._revalidate(f"/books/{self.book.id}")
+        self.assertEqual(status, 304)
+        reviews_etag, status = self._revalidate(f"/books/{self.book.id}/reviews")
+        self.assertEqual(status, 304)
+
+        self.client.post(f"/books/{self.book.id}/reviews", json={"rating": 5})
+
+        res = self.client.get(f"/books/{self.book.id}", headers={"If-None-Match": book_etag})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["rating_count"], 1)
+        res = self.client.get(f"/books/{self.book.id}/reviews", headers={"If-None-Match": reviews_etag})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()), 1)
+
+    def test_author_edit_changes_author_and_book_etags(self) -> None:
+        author_etag, _ = self._revalidate(f"/authors/{self.author.id}")
+        books_etag, status = self._revalidate(f"/authors/{self.author.id}/books")
+        self.assertEqual(status, 304)
+        book_etag, _ = self._revalidate(f"/books/{self.book.id}")
+
+        self.client.patch(f"/admin/authors/{self.author.id}", json={"name": "Ursula Le Guin"})
+
+        for path, etag in (
+            (f"/authors/{self.author.id}", author_etag),
+            (f"/authors/{self.author.id}/books", books_etag),
+            (f"/books/{self.book.id}", book_etag),
+        ):
+            self.assertEqual(self.client.get(path, headers={"If-None-Match": etag}).status_code, 200, path)
+
+    def test_new_book_changes_author_books_etag(self) -> None:
+        books_etag, _ = self._revalidate(f"/authors/{self.author.id}/books")
+        self.client.post("/admin/books", json={"title": "The Lathe of Heaven", "author_ids": [self.author.id]})
+
+        res = self.client.get(f"/authors/{self.author.id}/books", headers={"If-None-Match": books_etag})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import events
+from app.core.activity import record_activity
+from app.core.events import event_broker, event_stream, queue_event
+from app.db.base import Base
+from app.models import Book, Follow, User
+
+
+class EventBrokerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.me = User(email="me@example.com", username="me", hashed_password="hashed")
+        self.friend = User(email="friend@example.com", username="friend", hashed_password="hashed")
+        self.book = Book(title="Dune")
+        self.db.add_all([self.me, self.friend, self.book])
+        self.db.flush()
+        self.db.add(Follow(requester_id=self.me.id, target_id=self.friend.id, status="accepted"))
+        self.db.commit()
+
+    def tearDown(self) -> None:
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _run(self, scenario) -> None:
+        async def main() -> None:
+            event_broker.start(self.SessionLocal)
+            try:
+                await scenario()
+            finally:
+                await event_broker.stop()
+
+        asyncio.run(main())
+
+    def test_committed_activity_reaches_followers_streams(self) -> None:
+        async def scenario() -> None:
+            async with event_broker.subscribe(self.me.id) as mine, event_broker.subscribe(self.friend.id) as theirs:
+                record_activity(self.db, self.friend.id, "status", self.book.id, status="reading")
+                self.db.commit()
+
+                name, item = await asyncio.wait_for(mine.get(), timeout=2)
+                self.assertEqual(name, "activity")
+                self.assertEqual((item["type"], item["status"], item["book"]["title"]), ("status", "reading", "Dune"))
+                self.assertEqual(await asyncio.wait_for(mine.get(), timeout=2), ("notifications", {"requests": 0, "activity": 1}))
+
+                await asyncio.sleep(0.05)
+                self.assertTrue(theirs.empty())
+            self.assertEqual(event_broker.connections, 0)
+
+        self._run(scenario)
+
+    def test_rolled_back_writes_publish_nothing(self) -> None:
+        async def scenario() -> None:
+            async with event_broker.subscribe(self.me.id) as mine:
+                queue_event(self.db, {"user": self.me.id})
+                self.db.rollback()
+                self.db.commit()
+                await asyncio.sleep(0.05)
+                self.assertTrue(mine.empty())
+
+        self._run(scenario)
+
+    def test_stream_starts_with_counters_and_sends_heartbeats(self) -> None:
+        async def scenario() -> None:
+            queue: asyncio.Queue = asyncio.Queue()
+            connected = [True, True, True, False]
+
+            async def is_disconnected() -> bool:
+                return not connected.pop(0)
+
+            await queue.put(("notifications", {"requests": 1, "activity": 0}))
+            with mock.patch.object(events, "HEARTBEAT_SECONDS", 0.01):
+                frames = [f async for f in event_stream(queue, {"requests": 0, "activity": 2}, is_disconnected)]
+
+            self.assertEqual(
+                frames,
+                [
+                    "retry: 5000\n\n",
+                    'event: notifications\ndata: {"requests": 0, "activity": 2}\n\n',
+                    'event: notifications\ndata: {"requests": 1, "activity": 0}\n\n',
+                    ": ping\n\n",
+                    ": ping\n\n",
+                ],
+            )
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
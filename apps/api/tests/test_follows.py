@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.follow_counts import repair_follow_counts
+from app.core.query_stats import query_budget
+from app.db.base import Base
+from app.deps import get_current_user, get_db
+from app.main import app
+from app.models import Follow, User
+
+
+class FollowTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.me = User(email="me@example.com", username="me", hashed_password="hashed")
+        self.star = User(email="star@example.com", username="star", hashed_password="hashed", is_private=True)
+        self.fans = [User(email=f"fan{i}@example.com", username=f"fan{i}", hashed_password="hashed") for i in range(3)]
+        self.db.add_all([self.me, self.star, *self.fans])
+        self.db.commit()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _as(self, user: User) -> None:
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    def _profile(self, user: User) -> dict:
+        self._as(self.me)
+        self.db.refresh(self.me)  # get_current_user has already loaded it
+        url = f"/users/{user.id}"
+        with query_budget(1):
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def test_counts_follow_every_transition(self) -> None:
+        for fan in self.fans:
+            self._as(fan)
+            self.client.post(f"/users/{self.me.id}/follow")
+            self.client.post(f"/users/{self.star.id}/follow")
+        self._as(self.me)
+        self.client.post(f"/users/{self.star.id}/follow")
+
+        self.assertEqual(self._profile(self.me)["followers_count"], 3)
+        star = self._profile(self.star)
+        self.assertEqual((star["followers_count"], star["follow_status"]), (0, "pending"))
+
+        self._as(self.star)
+        requests = {r["requester"]["username"]: r["id"] for r in self.client.get("/me/follow-requests").json()}
+        self.client.post(f"/me/follow-requests/{requests['me']}/approve")
+        self.client.post(f"/me/follow-requests/{requests['fan0']}/approve")
+        self.client.post(f"/me/follow-requests/{requests['fan0']}/approve")  # repeated, no double count
+        self.client.post(f"/me/follow-requests/{requests['fan1']}/deny")
+        self.client.post(f"/me/follow-requests/{requests['fan0']}/deny")  # removes an accepted follower
+
+        star = self._profile(self.star)
+        self.assertEqual((star["followers_count"], star["follow_status"]), (1, "accepted"))
+        me = self._profile(self.me)
+        self.assertEqual((me["followers_count"], me["following_count"], me["follow_status"]), (3, 1, "none"))
+
+        self._as(self.fans[2])
+        self.client.post(f"/users/{self.me.id}/unfollow")
+        self.client.post(f"/users/{self.me.id}/unfollow")
+        self.assertEqual(self._profile(self.me)["followers_count"], 2)
+        self.assertEqual(self._profile(self.fans[2])["following_count"], 0)  # fan2's star request is still pending
+
+    def test_repair_recomputes_counts(self) -> None:
+        self.db.add_all(
+            [
+                Follow(requester_id=fan.id, target_id=self.me.id, status="accepted")
+                for fan in self.fans
+            ]
+            + [Follow(requester_id=self.me.id, target_id=self.star.id, status="pending")]
+        )
+        self.db.commit()
+        self.assertEqual(self._profile(self.me)["followers_count"], 0)
+
+        repair_follow_counts(self.db)
+        self.assertEqual(self._profile(self.me)["followers_count"], 3)
+        self.assertEqual(self._profile(self.fans[0])["following_count"], 1)
+        self.assertEqual(self._profile(self.me)["following_count"], 0)
+
+    def test_lists_page_by_cursor(self) -> None:
+        fans = [User(email=f"extra{i}@example.com", username=f"extra{i}", hashed_password="hashed") for i in range(4)]
+        self.db.add_all(fans)
+        self.db.flush()
+        fans = self.fans + fans
+        at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.db.add_all(
+            [
+                Follow(requester_id=fan.id, target_id=self.me.id, status="accepted", created_at=at + timedelta(days=i // 2))
+                for i, fan in enumerate(fans)
+            ]
+        )
+        self.db.add(Follow(requester_id=self.star.id, target_id=self.me.id, status="pending", created_at=at))
+        self.db.commit()
+        expected = [fan.id for fan in reversed(fans)]  # newest first, ties broken by id
+
+        self._as(self.me)
+        self.db.refresh(self.me)
+        seen, after = [], None
+        for _ in range(len(fans)):
+            params = {"limit": 3} | ({"after": after} if after else {})
+            with query_budget(1):
+                res = self.client.get("/me/followers", params=params)
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(set(res.json()[0]), {"id", "username", "avatar_url"})
+            seen += [u["id"] for u in res.json()]
+            after = res.headers.get("X-Next-Cursor")
+            if not after:
+                break
+        self.assertEqual(seen, expected)
+
+        res = self.client.get(f"/users/{self.me.id}/followers", params={"ids_only": True})
+        self.assertEqual(res.json(), expected)
+        res = self.client.get(f"/users/{fans[0].id}/following", params={"ids_only": True})
+        self.assertEqual(res.json(), [self.me.id])
+        self.assertEqual(self.client.get("/me/followers", params={"after": "junk"}).status_code, 400)
+        self.assertEqual(self.client.get(f"/users/{self.star.id}/followers").status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
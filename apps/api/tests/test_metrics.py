@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.metrics import Histogram
+from app.db.base import Base
+from app.deps import get_db
+from app.main import app
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def test_requests_are_labelled_by_route_template(self) -> None:
+        self.client.get("/books/12345")
+        self.client.get("/books/67890")
+        self.client.get("/no/such/path")
+
+        body = self.client.get("/metrics").text
+        self.assertIn('http_requests_total{method="GET",route="/books/{book_id}",status="404"}', body)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",route="/books/{book_id}",le="+Inf"}', body)
+        self.assertIn('route="unmatched"', body)
+        self.assertNotIn("/books/12345", body)
+        self.assertIn('http_requests_in_flight{method="GET",route="/books/{book_id}"} 0', body)
+        self.assertIn("# TYPE db_pool_checkout_wait_seconds histogram", body)
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        hist = Histogram("demo_seconds", "Demo.", ("size",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            hist.observe(value, "sm")
+
+        lines = hist.render()
+        self.assertIn('demo_seconds_bucket{size="sm",le="0.1"} 1', lines)
+        self.assertIn('demo_seconds_bucket{size="sm",le="1"} 3', lines)
+        self.assertIn('demo_seconds_bucket{size="sm",le="+Inf"} 4', lines)
+        self.assertIn('demo_seconds_count{size="sm"} 4', lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.notifications import repair_notification_counters
+from app.core.query_stats import query_budget
+from app.db.base import Base
+from app.deps import get_current_user, get_db
+from app.main import app
+from app.models import Book, Follow, User
+
+
+class NotificationCounterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.me = User(email="me@example.com", username="me", hashed_password="hashed", is_private=True)
+        self.friend = User(email="friend@example.com", username="friend", hashed_password="hashed")
+        self.fan = User(email="fan@example.com", username="fan", hashed_password="hashed")
+        self.books = [Book(title=f"Book {i}") for i in range(8)]
+        self.db.add_all([self.me, self.friend, self.fan, *self.books])
+        self.db.commit()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _as(self, user: User) -> None:
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    def _counts(self) -> dict:
+        self._as(self.me)
+        return self.client.get("/me/notifications").json()
+
+    def _stored_counts(self) -> tuple[int, int]:
+        self.db.refresh(self.me)
+        return self.me.unread_requests_count, self.me.unread_activity_count
+
+    def test_counters_follow_writes_and_reset_on_seen(self) -> None:
+        self._as(self.me)
+        self.client.post(f"/users/{self.friend.id}/follow")
+        self._as(self.friend)
+        self.client.post(f"/books/{self.books[0].id}/status", json={"status": "reading"})
+        self.client.post(f"/books/{self.books[0].id}/status", json={"status": "finished"})
+        self.client.post(f"/books/{self.books[0].id}/reviews", json={"rating": 5})
+        self.client.post(f"/books/{self.books[1].id}/status", json={"status": "reading"})
+        self._as(self.fan)
+        self.client.post(f"/users/{self.me.id}/follow")
+
+        # a rewritten status is still one unseen item
+        self.assertEqual(self._counts(), {"requests": 1, "activity": 3})
+
+        self.client.post("/me/notifications/seen", json={"activity": True})
+        self.assertEqual(self._counts(), {"requests": 1, "activity": 0})
+
+        self._as(self.friend)
+        self.client.post(f"/books/{self.books[0].id}/status", json={"status": "reading"})
+        self.client.delete(f"/books/{self.books[1].id}/status")  # seen already, no change
+        self.assertEqual(self._counts(), {"requests": 1, "activity": 1})
+        self._as(self.friend)
+        self.client.delete(f"/books/{self.books[0].id}/status")
+        self.assertEqual(self._counts(), {"requests": 1, "activity": 0})
+
+        self._as(self.fan)
+        self.client.post(f"/users/{self.me.id}/unfollow")
+        self.assertEqual(self._counts(), {"requests": 0, "activity": 0})
+
+    def test_follow_changes_bring_and_drop_unseen_activity(self) -> None:
+        self._as(self.friend)
+        self.client.post(f"/books/{self.books[0].id}/status", json={"status": "reading"})
+        self.client.post(f"/books/{self.books[1].id}/reviews", json={"rating": 4})
+
+        self._as(self.me)
+        self.client.post(f"/users/{self.friend.id}/follow")
+        self.assertEqual(self._counts()["activity"], 2)
+        self.client.post(f"/users/{self.friend.id}/unfollow")
+        self.assertEqual(self._counts()["activity"], 0)
+
+        self._as(self.fan)
+        self.client.post(f"/users/{self.me.id}/follow")
+        self.assertEqual(self._counts()["requests"], 1)
+        request_id = self.client.get("/me/follow-requests").json()[0]["id"]
+        self.client.post(f"/me/follow-requests/{request_id}/approve")
+        self.assertEqual(self._counts()["requests"], 0)
+
+    def test_preview_is_bounded_and_matches_repair(self) -> None:
+        self.db.add(Follow(requester_id=self.me.id, target_id=self.friend.id, status="accepted"))
+        self.db.commit()
+        self._as(self.friend)
+        for book in self.books:
+            self.client.post(f"/books/{book.id}/status", json={"status": "reading"})
+
+        self.assertEqual(self._stored_counts(), (0, len(self.books)))
+        self.me.unread_requests_count, self.me.unread_activity_count = 3, 0  # drifted
+        self.db.commit()
+        repair_notification_counters(self.db)
+        self.assertEqual(self._stored_counts(), (0, len(self.books)))
+
+        self._as(self.me)
+        with query_budget(6):
+            res = self.client.get("/me/notifications/preview")
+        self.assertEqual(res.status_code, 200)
+        titles = [i["book"]["title"] for i in res.json()["activity"]]
+        self.assertEqual(titles, ["Book 7", "Book 6", "Book 5", "Book 4", "Book 3"])
+
+        self.client.post("/me/notifications/seen", json={"activity": True})
+        self.assertEqual(self.client.get("/me/notifications/preview").json()["activity"], [])
+
+        repair_notification_counters(self.db)
+        self.assertEqual(self._stored_counts(), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.db.base import Base
+from app.deps import get_db
+from app.main import app
+from app.models import Author, Book
+
+
+class CursorTests(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        self.assertEqual(decode_cursor(encode_cursor(42, "x"), int, str), (42, "x"))
+
+    def test_rejects_garbage(self) -> None:
+        from fastapi import HTTPException
+
+        for cursor in ["not-a-cursor", encode_cursor("42"), encode_cursor(1, 2)]:
+            with self.assertRaises(HTTPException):
+                decode_cursor(cursor, int)
+
+
+class CatalogKeysetApiTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.db.add_all([Book(title=f"Book {i}") for i in range(7)])
+        self.db.add_all([Author(name=f"Author {i}") for i in range(5)])
+        self.db.commit()
+
+        def override_get_db():
+            try:
+                yield self.db
+            finally:
+                pass
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _walk(self, path: str, limit: int) -> list[int]:
+        seen: list[int] = []
+        url = f"{path}?limit={limit}"
+        while True:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+            seen.extend(item["id"] for item in res.json())
+            cursor = res.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                return seen
+            url = f"{path}?limit={limit}&after={cursor}"
+
+    def test_books_walk_all_pages(self) -> None:
+        ids = self._walk("/books", 3)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+
+    def test_authors_walk_all_pages(self) -> None:
+        ids = self._walk("/authors", 2)
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_exact_page_has_no_cursor(self) -> None:
+        res = self.client.get("/authors?limit=5")
+        self.assertEqual(len(res.json()), 5)
+        self.assertNotIn(NEXT_CURSOR_HEADER, res.headers)
+
+    def test_offset_still_supported(self) -> None:
+        first = self.client.get("/books?limit=2").json()
+        second = self.client.get("/books?limit=2&offset=2").json()
+        self.assertGreater(first[-1]["id"], second[0]["id"])
+
+    def test_invalid_cursor(self) -> None:
+        self.assertEqual(self.client.get("/books?after=bogus").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.query_stats import (
+    DB_QUERIES_HEADER,
+    SERVER_TIMING_HEADER,
+    QueryStatsMiddleware,
+    query_budget,
+    statement_shape,
+)
+from app.db.base import Base
+from app.deps import get_db
+from app.main import app
+from app.models import Book
+
+
+class QueryStatsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+        self.db.add_all([Book(title=f"Book {i}") for i in range(6)])
+        self.db.commit()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def test_headers_report_statement_count(self) -> None:
+        self.db.expire_all()
+        res = self.client.get("/books", params={"limit": 3})
+        self.assertEqual(res.headers[DB_QUERIES_HEADER], "4")
+        self.assertIn('desc="4 queries"', res.headers[SERVER_TIMING_HEADER])
+
+    def test_query_budget(self) -> None:
+        with query_budget(4) as stats:
+            self.client.get("/books", params={"limit": 3})
+        self.assertGreater(stats.count, 0)
+
+        with self.assertRaises(AssertionError):
+            with query_budget(1):
+                self.client.get("/books", params={"limit": 3})
+
+    def test_repeated_shapes_logged_as_n_plus_one(self) -> None:
+        probe = FastAPI()
+        probe.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=5)
+
+        @probe.get("/loop")
+        def loop():
+            for i in range(6):
+                self.db.execute(select(Book.title).where(Book.id == i)).all()
+            return {}
+
+        with self.assertLogs("app.core.query_stats", level="WARNING") as logs:
+            TestClient(probe).get("/loop")
+        self.assertIn("Possible N+1 on GET /loop: 6 x", logs.output[0])
+
+    def test_statement_shape_collapses_in_lists(self) -> None:
+        self.assertEqual(
+            statement_shape("SELECT x\n FROM t WHERE id IN (?, ?, ?)"),
+            statement_shape("SELECT x FROM t WHERE id IN (?)"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.query_stats import query_budget
+from app.core.recommendations import recommendation_cache
+from app.db.base import Base
+from app.deps import get_current_user, get_db
+from app.main import app
+from app.models import Author, Book, BookRatingStats, Genre, Review, Shelf, Tag, User
+
+
+class RecommendationEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+        recommendation_cache.clear()
+
+        herbert = Author(name="Frank Herbert")
+        banks = Author(name="Iain M. Banks")
+        sf = Genre(name="Science fiction")
+        space = Tag(name="space opera")
+        self.user = User(email="reader@example.com", username="reader", hashed_password="hashed")
+
+        self.dune = Book(title="Dune", authors=[herbert], genres=[sf])
+        self.phlebas = Book(title="Consider Phlebas", authors=[banks], tags=[space])
+        self.messiah = Book(title="Dune Messiah", authors=[herbert], genres=[sf])
+        self.player = Book(title="The Player of Games", authors=[banks], tags=[space], genres=[sf])
+        self.hyperion = Book(title="Hyperion", genres=[sf])
+        self.foundation = Book(title="Foundation", genres=[sf])
+        self.on_shelf = Book(title="Children of Dune", authors=[herbert], genres=[sf])
+        self.read = Shelf(user=self.user, name="read", is_system=True)
+        self.read.books = [self.dune, self.phlebas]
+        to_read = Shelf(user=self.user, name="to-read", is_system=True)
+        to_read.books = [self.on_shelf]
+
+        self.db.add_all([self.read, to_read, self.messiah, self.player, self.hyperion, self.foundation])
+        self.db.add_all(
+            [
+                Review(user=self.user, book=self.dune, rating=5),
+                Review(user=self.user, book=self.phlebas, rating=4),
+            ]
+        )
+        self.db.commit()
+        self.db.add(BookRatingStats(book_id=self.foundation.id, rating_sum=5, rating_count=1, rating_avg=5.0))
+        self.db.commit()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: self.user
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def test_merged_ranking_excludes_shelved_books(self) -> None:
+        titles = [b["title"] for b in self.client.get("/me/recommendations").json()]
+        # Player of Games: author + tag for Phlebas (3), genre for Dune (1) -> best 3
+        # Messiah: author + genre for Dune (3); Foundation: genre (1) + rating 5/5 (1)
+        self.assertEqual(titles, ["Dune Messiah", "The Player of Games", "Foundation", "Hyperion"])
+
+        page = self.client.get("/me/recommendations", params={"limit": 2, "offset": 2}).json()
+        self.assertEqual([b["title"] for b in page], ["Foundation", "Hyperion"])
+
+    def test_sections_rank_per_seed(self) -> None:
+        payload = self.client.get("/me/recommendations/sections", params={"per": 2}).json()
+        by_seed = {s["seed"]["title"]: [b["title"] for b in s["items"]] for s in payload}
+        self.assertEqual(by_seed["Dune"], ["Dune Messiah", "Foundation"])
+        self.assertEqual(by_seed["Consider Phlebas"], ["The Player of Games"])
+
+    def test_cached_list_is_invalidated_by_shelving(self) -> None:
+        self.assertEqual(self.client.get("/me/recommendations").json()[0]["title"], "Dune Messiah")
+        with query_budget(1):  # a cache hit only loads the page's books
+            self.client.get("/me/recommendations", params={"fields": "title"})
+
+        self.client.post(f"/shelves/{self.read.id}/books/{self.messiah.id}")
+        titles = [b["title"] for b in self.client.get("/me/recommendations").json()]
+        self.assertNotIn("Dune Messiah", titles)
+
+    def test_query_count_does_not_grow_with_seeds(self) -> None:
+        genre = self.db.get(Genre, self.dune.genres[0].id)
+        for i in range(20):
+            book = Book(title=f"Seed {i}", genres=[genre])
+            self.read.books.append(book)
+            self.db.add(Review(user=self.user, book=book, rating=5))
+        self.db.commit()
+        self.db.expire_all()
+
+        with query_budget(12):
+            self.assertEqual(self.client.get("/me/recommendations").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
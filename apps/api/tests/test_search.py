@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.deps import get_db
+from app.main import app
+from app.models import Author, Book, User
+
+
+class SearchApiTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        herbert = Author(name="Frank Herbert")
+        self.db.add_all(
+            [
+                herbert,
+                Author(name="Frances Hardinge"),
+                Book(title="Children of Dune", authors=[herbert]),
+                Book(title="Dune", authors=[herbert]),
+                Book(title="Dune Messiah", authors=[herbert]),
+                Book(title="The Hobbit"),
+                User(email="ana@example.com", username="ana_reads", hashed_password="hashed"),
+                User(email="bob@example.com", username="bob", hashed_password="hashed"),
+            ]
+        )
+        self.db.commit()
+
+        def override_get_db():
+            try:
+                yield self.db
+            finally:
+                pass
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def test_books_ranked_by_relevance(self) -> None:
+        payload = self.client.get("/search", params={"q": "dune"}).json()
+        titles = [b["title"] for b in payload["books"]]
+        self.assertEqual(titles[0], "Dune")
+        self.assertEqual(titles[1], "Dune Messiah")
+        self.assertEqual(set(titles), {"Dune", "Dune Messiah", "Children of Dune"})
+        self.assertEqual(payload["books"][0]["authors"][0]["name"], "Frank Herbert")
+
+    def test_prefix_tokens_match_authors(self) -> None:
+        payload = self.client.get("/search", params={"q": "fran her"}).json()
+        self.assertEqual([a["name"] for a in payload["authors"]], ["Frank Herbert"])
+
+    def test_index_follows_updates(self) -> None:
+        book = self.db.query(Book).filter(Book.title == "The Hobbit").one()
+        book.title = "There and Back Again"
+        self.db.commit()
+
+        self.assertEqual(self.client.get("/search", params={"q": "hobbit"}).json()["books"], [])
+        titles = [b["title"] for b in self.client.get("/search", params={"q": "back"}).json()["books"]]
+        self.assertEqual(titles, ["There and Back Again"])
+
+    def test_user_search(self) -> None:
+        payload = self.client.get("/search", params={"q": "@ana"}).json()
+        self.assertEqual([u["username"] for u in payload["users"]], ["ana_reads"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import random
 import unittest
+from unittest import mock
+
+import numpy as np
 
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-
-from app.core.taste_compare import compute_pearson_from_aggregates, compute_similarity_score
+from sqlalchemy.pool import StaticPool
+
+from app.core import taste_compare
+from app.core.taste_compare import (
+    compute_pearson_from_aggregates,
+    compute_similarity_score,
+    pair_summary_cache,
+    pearson_from_aggregates,
+    similarity_scores,
+)
 from app.db.base import Base
-from app.deps import get_current_user, get_db
+from app.deps import get_current_user, get_db, require_admin
 from app.main import app
 from app.models import Book, Follow, Review, User
 
@@ -23,10 +35,37 @@ class TasteCompareMathTests(unittest.TestCase):
         result = compute_pearson_from_aggregates(1, 5.0, 5.0, 25.0, 25.0, 25.0)
         self.assertIsNone(result)
 
+    def test_array_versions_match_scalar_ones(self) -> None:
+        rng = random.Random(3)
+        pairs = [
+            [(rng.randint(1, 5), rng.randint(1, 5)) for _ in range(n)] for n in (0, 1, 4, 5, 5, 9, 30)
+        ]
+        pairs.append([(3, 3)] * 6)  # zero variance
+        count = np.array([len(p) for p in pairs])
+        sums = [np.array([float(sum(f(x, y) for x, y in p)) for p in pairs]) for f in (
+            lambda x, y: x, lambda x, y: y, lambda x, y: x * x, lambda x, y: y * y, lambda x, y: x * y
+        )]
+        diffs = np.array([sum(abs(x - y) for x, y in p) / len(p) if p else 0.0 for p in pairs])
+
+        pearson = pearson_from_aggregates(count, *sums)
+        scores = similarity_scores(diffs, count)
+        for i in range(len(pairs)):
+            expected = compute_pearson_from_aggregates(int(count[i]), *(float(s[i]) for s in sums))
+            if expected is None:
+                self.assertTrue(np.isnan(pearson[i]))
+            else:
+                self.assertAlmostEqual(pearson[i], expected)
+            self.assertEqual(scores[i], compute_similarity_score(float(diffs[i]), int(count[i])))
+
 
 class TasteCompareApiTests(unittest.TestCase):
     def setUp(self) -> None:
-        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+        pair_summary_cache.clear()
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
         self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
         Base.metadata.create_all(bind=self.engine)
         self.db = self.SessionLocal()
@@ -122,6 +161,91 @@ class TasteCompareApiTests(unittest.TestCase):
             self.assertIn("cover_url", row)
             self.assertIn("authors", row)
 
+    def test_summary_is_cached_until_either_user_reviews(self) -> None:
+        self.db.add(Follow(requester_id=self.viewer.id, target_id=self.target.id, status="accepted"))
+        books = [Book(title=f"Book {i}") for i in range(6)]
+        self.db.add_all(books)
+        self.db.flush()
+        for i, book in enumerate(books):
+            self.db.add(Review(user_id=self.viewer.id, book_id=book.id, rating=1 + i % 5))
+            self.db.add(Review(user_id=self.target.id, book_id=book.id, rating=5 - i % 5))
+        self.db.commit()
+
+        with mock.patch.object(
+            taste_compare, "compute_pair_summary", wraps=taste_compare.compute_pair_summary
+        ) as compute:
+            first = self.client.get(f"/users/{self.target.id}/taste-compare", params={"limit": 4}).json()
+            second = self.client.get(
+                f"/users/{self.target.id}/taste-compare", params={"limit": 4, "offset": 4, "sort": "title"}
+            ).json()
+            self.assertEqual(compute.call_count, 1)
+            self.assertEqual(first["pearson"], second["pearson"])
+            self.assertEqual([r["title"] for r in second["shared_ratings"]], ["Book 4", "Book 5"])
+            self.assertEqual(first["shared_ratings"][0]["diff"], 4)
+
+            app.dependency_overrides[get_current_user] = lambda: self.target
+            self.client.post(f"/books/{books[0].id}/reviews", json={"rating": 1})
+            app.dependency_overrides[get_current_user] = lambda: self.viewer
+            self.db.refresh(self.target)
+            third = self.client.get(f"/users/{self.target.id}/taste-compare").json()
+            self.assertEqual(compute.call_count, 2)
+            self.assertEqual([r["title"] for r in third["agreements"][:2]], ["Book 2", "Book 0"])
+
+    def test_book_title_edit_and_delete_refresh_cached_summary(self) -> None:
+        self.db.add(Follow(requester_id=self.viewer.id, target_id=self.target.id, status="accepted"))
+        books = [Book(title=f"Book {i}") for i in range(3)]
+        self.db.add_all(books)
+        self.db.flush()
+        for book in books:
+            self.db.add(Review(user_id=self.viewer.id, book_id=book.id, rating=4))
+            self.db.add(Review(user_id=self.target.id, book_id=book.id, rating=5))
+        self.db.commit()
+        app.dependency_overrides[require_admin] = lambda: self.viewer
+
+        def titles() -> list[str]:
+            self.db.refresh(self.viewer)
+            self.db.refresh(self.target)
+            payload = self.client.get(f"/users/{self.target.id}/taste-compare", params={"sort": "title"}).json()
+            return [r["title"] for r in payload["shared_ratings"]]
+
+        self.assertEqual(titles(), ["Book 0", "Book 1", "Book 2"])
+        self.client.patch(f"/admin/books/{books[0].id}", json={"title": "Renamed"})
+        self.assertEqual(titles(), ["Book 1", "Book 2", "Renamed"])
+        self.client.delete(f"/admin/books/{books[1].id}")
+        self.assertEqual(titles(), ["Book 2", "Renamed"])
+
+    def test_compatibility_with_every_followee_matches_pairwise_compare(self) -> None:
+        others = [
+            User(email=f"other{i}@example.com", username=f"other{i}", hashed_password="hashed") for i in range(3)
+        ]
+        books = [Book(title=f"Book {i}") for i in range(8)]
+        self.db.add_all([*others, *books])
+        self.db.flush()
+        rng = random.Random(5)
+        for user in [self.viewer, *others]:
+            for book in books[: 2 + 3 * (user.id % 3)]:
+                self.db.add(Review(user_id=user.id, book_id=book.id, rating=rng.randint(1, 5)))
+        for user in [self.target, *others]:
+            self.db.add(Follow(requester_id=self.viewer.id, target_id=user.id, status="accepted"))
+        self.db.commit()
+
+        res = self.client.get("/me/taste-compatibility")
+        self.assertEqual(res.status_code, 200)
+        rows = res.json()
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[-1]["user"]["username"], "target")  # no shared books
+        scores = [r["similarity_score"] for r in rows]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        for row in rows:
+            pair = self.client.get(f"/users/{row['user']['id']}/taste-compare").json()
+            self.assertEqual(row["common_count"], pair["common_count"])
+            self.assertEqual(row["similarity_score"], pair["similarity_score"])
+            if pair["pearson"] is None:
+                self.assertIsNone(row["pearson"])
+            else:
+                self.assertAlmostEqual(row["pearson"], pair["pearson"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.recommendations import score_candidates
+from app.core.trait_index import TOP_PER_TRAIT, trait_index
+from app.db.base import Base
+from app.deps import get_db, require_admin
+from app.main import app
+from app.models import Author, Book, BookRatingStats, Genre, Shelf, Tag, User, shelf_books
+
+
+class TraitIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.herbert = Author(name="Frank Herbert")
+        self.sf = Genre(name="Science fiction")
+        self.desert = Tag(name="desert")
+        self.user = User(email="reader@example.com", username="reader", hashed_password="hashed", role="admin")
+        self.dune = Book(title="Dune", authors=[self.herbert], genres=[self.sf], tags=[self.desert])
+        self.messiah = Book(title="Dune Messiah", authors=[self.herbert], genres=[self.sf])
+        self.hyperion = Book(title="Hyperion", genres=[self.sf])
+        self.arrakis = Book(title="Arrakis Guide", tags=[self.desert])
+        self.shelved = Book(title="Children of Dune", authors=[self.herbert])
+        self.db.add_all([self.dune, self.messiah, self.hyperion, self.arrakis, self.shelved])
+        self.db.add(Shelf(user=self.user, name="read", is_system=True, books=[self.dune, self.shelved]))
+        self.db.commit()
+        self.db.add(BookRatingStats(book_id=self.hyperion.id, rating_sum=4, rating_count=1, rating_avg=4.0))
+        self.db.commit()
+        trait_index.rebuild(self.db)
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[require_admin] = lambda: self.user
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        trait_index.clear()
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _excluded(self):
+        return select(shelf_books.c.book_id)
+
+    def _scores(self) -> dict[int, tuple[float, ...]]:
+        scores = score_candidates(self.db, [self.dune], self._excluded())
+        return {
+            book_id: (float(scores.trait_scores[i, 0]), float(scores.ratings[i]))
+            for i, book_id in enumerate(scores.book_ids.tolist())
+        }
+
+    def test_index_matches_database_scoring(self) -> None:
+        from_index = self._scores()
+        trait_index.clear()
+        from_db = self._scores()
+
+        self.assertEqual(from_index, from_db)
+        self.assertEqual(
+            from_index,
+            {
+                self.messiah.id: (3.0, 0.0),
+                self.hyperion.id: (1.0, 4.0),
+                self.arrakis.id: (1.0, 0.0),
+            },
+        )
+
+    def test_candidates_are_capped_per_trait(self) -> None:
+        emperor = Book(title="God Emperor of Dune", authors=[self.herbert])
+        self.db.add(emperor)
+        self.db.add(BookRatingStats(book_id=self.shelved.id, rating_sum=5, rating_count=1, rating_avg=5.0))
+        self.db.commit()
+        trait_index.top_per_trait = 1
+        try:
+            trait_index.rebuild(self.db)
+            from_index = self._scores()
+            trait_index.clear()
+            from_db = self._scores()
+        finally:
+            trait_index.top_per_trait = TOP_PER_TRAIT
+
+        # the shelved books lead Herbert's and desert's rankings but take no
+        # slot, so Dune Messiah and Arrakis Guide get them; God Emperor misses the cut
+        self.assertEqual(
+            from_index,
+            {
+                self.messiah.id: (3.0, 0.0),
+                self.hyperion.id: (1.0, 4.0),
+                self.arrakis.id: (1.0, 0.0),
+            },
+        )
+        self.assertEqual(from_db, from_index)
+
+    def test_admin_edit_updates_postings(self) -> None:
+        res = self.client.patch(f"/admin/books/{self.hyperion.id}", json={"tag_ids": [self.desert.id]})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self._scores()[self.hyperion.id][0], 2.0)
+
+        self.client.patch(f"/admin/books/{self.hyperion.id}", json={"genre_ids": [], "tag_ids": []})
+        self.assertNotIn(self.hyperion.id, self._scores())
+        self.assertEqual(trait_index.stats()["genre_links"], 2)
+
+        self.client.delete(f"/admin/books/{self.messiah.id}")
+        self.assertNotIn(self.messiah.id, self._scores())
+
+
+if __name__ == "__main__":
+    unittest.main()
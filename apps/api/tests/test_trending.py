@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.trending import compact_book_popularity, rebuild_book_popularity, record_popularity
+from app.db.base import Base
+from app.deps import get_current_user, get_db
+from app.main import app
+from app.models import Book, BookPopularity, BookPopularityEvent, Genre, Review, Shelf, User
+
+
+class TrendingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.sf = Genre(name="Science fiction")
+        self.user = User(email="reader@example.com", username="reader", hashed_password="hashed")
+        self.dune = Book(title="Dune", genres=[self.sf])
+        self.hobbit = Book(title="The Hobbit")
+        self.hyperion = Book(title="Hyperion", genres=[self.sf])
+        self.shelf = Shelf(user=self.user, name="to-read", is_system=True)
+        self.db.add_all([self.dune, self.hobbit, self.hyperion, self.shelf])
+        self.db.commit()
+
+        def override_get_db():
+            yield self.db
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: self.user
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _titles(self, **params) -> list[str]:
+        return [b["title"] for b in self.client.get("/books/trending", params=params).json()]
+
+    def test_activity_is_counted_incrementally_and_filtered_by_genre(self) -> None:
+        self.client.post(f"/books/{self.hobbit.id}/reviews", json={"rating": 5, "body": "Lovely"})
+        self.client.post(f"/shelves/{self.shelf.id}/books/{self.dune.id}")
+        self.client.post(f"/books/{self.dune.id}/status", json={"status": "reading"})
+        self.client.post(f"/books/{self.dune.id}/status", json={"status": "reading"})  # unchanged, not counted
+
+        # Dune: shelf 1 + status 2 ties the Hobbit's review 3; lower id wins
+        self.assertEqual(self._titles(), ["Dune", "The Hobbit"])
+        self.assertEqual(self._titles(genre_id=self.sf.id), ["Dune"])
+
+    def test_repeated_toggles_count_once_per_user(self) -> None:
+        self.client.post(f"/books/{self.dune.id}/status", json={"status": "reading"})
+        self.client.post(f"/shelves/{self.shelf.id}/books/{self.dune.id}")
+        score = self.db.get(BookPopularity, self.dune.id).score
+
+        for status in ("want_to_read", "reading", "finished"):
+            self.client.post(f"/books/{self.dune.id}/status", json={"status": status})
+        self.client.delete(f"/books/{self.dune.id}/status")
+        self.client.post(f"/books/{self.dune.id}/status", json={"status": "reading"})
+        for _ in range(3):
+            self.client.delete(f"/shelves/{self.shelf.id}/books/{self.dune.id}")
+            self.client.post(f"/shelves/{self.shelf.id}/books/{self.dune.id}")
+
+        self.db.expire_all()
+        self.assertEqual(self.db.get(BookPopularity, self.dune.id).score, score)
+
+    def test_rows_created_concurrently_are_not_reinserted(self) -> None:
+        # another transaction committed the user's first shelving in the meantime
+        now = datetime.now(timezone.utc)
+        self.db.add(BookPopularityEvent(user_id=self.user.id, book_id=self.dune.id, kind="shelf", created_at=now))
+        self.db.add(BookPopularity(book_id=self.dune.id, score=1.0))
+        self.db.commit()
+
+        record_popularity(self.db, self.user.id, self.dune.id, "shelf", at=now)
+        self.assertEqual(self.db.get(BookPopularity, self.dune.id).score, 1.0)
+        record_popularity(self.db, self.user.id, self.dune.id, "status", at=now)
+        self.db.commit()
+        self.assertGreater(self.db.get(BookPopularity, self.dune.id).score, 1.0)
+
+    def test_rebuild_counts_first_shelvings(self) -> None:
+        self.client.post(f"/shelves/{self.shelf.id}/books/{self.hobbit.id}")
+        self.client.delete(f"/shelves/{self.shelf.id}/books/{self.hobbit.id}")
+        self.client.post(f"/shelves/{self.shelf.id}/books/{self.hobbit.id}")
+        live = self.db.get(BookPopularity, self.hobbit.id).score
+
+        self.assertEqual(rebuild_book_popularity(self.db), 1)
+        self.assertAlmostEqual(self.db.get(BookPopularity, self.hobbit.id).score, live)
+
+    def test_old_events_decay_and_are_compacted(self) -> None:
+        now = datetime.now(timezone.utc)
+        readers = [User(email=f"r{i}@example.com", username=f"r{i}", hashed_password="hashed") for i in range(4)]
+        self.db.add_all(readers)
+        self.db.flush()
+        for reader in readers:
+            record_popularity(self.db, reader.id, self.hobbit.id, "review", at=now - timedelta(days=21))
+        record_popularity(self.db, self.user.id, self.hyperion.id, "shelf", at=now)
+        record_popularity(self.db, self.user.id, self.dune.id, "shelf", at=now - timedelta(days=60))
+        self.db.commit()
+
+        # 4 reviews three half-lives ago weigh 12 / 8 = 1.5 > one shelf add today
+        self.assertEqual(self._titles(), ["The Hobbit", "Hyperion", "Dune"])
+        self.assertEqual(compact_book_popularity(self.db, now), 1)
+        self.assertEqual(self._titles(), ["The Hobbit", "Hyperion"])
+
+    def test_rebuild_from_reviews(self) -> None:
+        self.db.add(Review(user=self.user, book=self.hyperion, rating=4))
+        self.db.commit()
+        self.assertEqual(rebuild_book_popularity(self.db), 1)
+        self.assertEqual(self.db.query(BookPopularity).one().book_id, self.hyperion.id)
+        self.assertEqual(self._titles(), ["Hyperion"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import random
+import unittest
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.user_neighbors import (
+    exact_neighbors,
+    load_rating_vectors,
+    lsh_neighbors,
+    rebuild_user_neighbors,
+)
+from app.db.base import Base
+from app.deps import get_current_user, get_db
+from app.main import app
+from app.models import Book, Follow, Review, User, UserNeighbor
+
+
+class UserNeighborTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = self.SessionLocal()
+
+    def tearDown(self) -> None:
+        app.dependency_overrides = {}
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+
+    def _readers(self, users: int, books: int = 60, seed: int = 1) -> None:
+        """Two camps rating the same books in opposite directions, plus noise."""
+        rng = random.Random(seed)
+        self.db.execute(insert(Book.__table__), [{"id": b + 1, "title": f"Book {b}"} for b in range(books)])
+        self.db.execute(
+            insert(User.__table__),
+            [
+                {"id": u + 1, "email": f"r{u}@example.com", "username": f"r{u}", "hashed_password": "-"}
+                for u in range(users)
+            ],
+        )
+        reviews = []
+        for u in range(users):
+            camp = u % 2
+            for b in rng.sample(range(books), 20):
+                liked = (b < books // 2) == (camp == 0)
+                rating = min(5, max(1, (5 if liked else 1) + rng.choice((-1, 0, 0, 1))))
+                reviews.append({"user_id": u + 1, "book_id": b + 1, "rating": rating})
+        self.db.execute(insert(Review.__table__), reviews)
+        self.db.commit()
+
+    def test_exact_neighbors_match_brute_force(self) -> None:
+        self._readers(40)
+        rv = load_rating_vectors(self.db)
+        rows = [r for batch in exact_neighbors(rv, k=5, block_size=7) for r in batch]
+
+        dense = rv.vectors.toarray().astype(np.float64)
+        common = rv.rated.toarray() @ rv.rated.toarray().T
+        sims = dense @ dense.T
+        sims[common < 3] = 0
+        np.fill_diagonal(sims, 0)
+        for i, user_id in enumerate(rv.user_ids.tolist()):
+            got = [r for r in rows if r["user_id"] == user_id]
+            expected = np.sort(sims[i][sims[i] > 0])[::-1][:5]
+            np.testing.assert_allclose([r["score"] for r in got], expected, rtol=1e-5)
+            for r in got:
+                j = int(np.searchsorted(rv.user_ids, r["neighbor_id"]))
+                self.assertEqual(r["common_count"], int(common[i, j]))
+                self.assertEqual(j % 2, i % 2)  # same camp
+
+    def test_lsh_recovers_most_exact_neighbors(self) -> None:
+        self._readers(200)
+        rv = load_rating_vectors(self.db)
+        exact = {(r["user_id"], r["neighbor_id"]) for b in exact_neighbors(rv, k=10) for r in b}
+        approx = [r for b in lsh_neighbors(rv, k=10, tables=12, bits=6) for r in b]
+
+        self.assertLessEqual(max(sum(1 for r in approx if r["user_id"] == u) for u in rv.user_ids.tolist()), 10)
+        recall = len(exact & {(r["user_id"], r["neighbor_id"]) for r in approx}) / len(exact)
+        self.assertGreater(recall, 0.5)
+        self.assertTrue(all(r["score"] > 0 for r in approx))
+
+        batches = list(lsh_neighbors(rv, k=10, tables=12, bits=6, block_size=16))
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(
+            sorted((r["user_id"], r["neighbor_id"]) for b in batches for r in b),
+            sorted((r["user_id"], r["neighbor_id"]) for r in approx),
+        )
+
+    def test_similar_readers_respects_privacy(self) -> None:
+        self._readers(8)
+        self.assertGreater(rebuild_user_neighbors(self.db, k=5), 0)
+        me = self.db.get(User, 1)
+        neighbors = self.db.execute(
+            select(UserNeighbor.neighbor_id).where(UserNeighbor.user_id == 1).order_by(UserNeighbor.score.desc())
+        ).scalars().all()
+        hidden, followed = (self.db.get(User, neighbors[0]), self.db.get(User, neighbors[1]))
+        hidden.is_private = followed.is_private = True
+        self.db.add(Follow(requester_id=me.id, target_id=followed.id, status="accepted"))
+        self.db.commit()
+
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_current_user] = lambda: me
+        res = TestClient(app).get("/me/similar-readers")
+        self.assertEqual(res.status_code, 200)
+        ids = [r["user"]["id"] for r in res.json()]
+        self.assertNotIn(hidden.id, ids)
+        self.assertIn(followed.id, ids)
+        self.assertEqual(len(ids), len(neighbors) - 1)
+        scores = [r["score"] for r in res.json()]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
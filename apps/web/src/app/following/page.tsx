@@ -2,10 +2,13 @@
 
 import Panel from "@/components/ui/Panel";
 import Avatar from "@/components/ui/Avatar";
+import Button from "@/components/ui/Button";
 import { useFollowList } from "@/hooks/useFollowList";
 
 export default function FollowingPage() {
-  const { items, status, backHref, backLabel, ownerLabel } = useFollowList({ kind: "following" });
+  const { items, status, backHref, backLabel, ownerLabel, hasMore, loadingMore, loadMore } = useFollowList({
+    kind: "following",
+  });
 
   return (
     <main className="space-y-4">
@@ -34,6 +37,20 @@ export default function FollowingPage() {
           ))}
         </ul>
       )}
+      {hasMore ? (
+        <div className="flex justify-center">
+          <Button
+            type="button"
+            onClick={() => void loadMore()}
+            disabled={loadingMore}
+            variant="outline"
+            radius="full"
+            size="sm"
+          >
+            {loadingMore ? "Loading…" : "Load more"}
+          </Button>
+        </div>
+      ) : null}
     </main>
   );
 }
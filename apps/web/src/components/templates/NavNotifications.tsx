@@ -4,6 +4,7 @@ import { useEffect, useRef, useState } from "react";
 import { BellIcon } from "@heroicons/react/24/outline";
 import { ChevronRightIcon } from "@heroicons/react/16/solid";
 import { apiGet, apiSend } from "@/lib/api";
+import { type NotificationCounts, useNotificationEvents } from "@/hooks/useNotificationEvents";
 import StarRating from "@/components/ui/StarRating";
 import Button from "@/components/ui/Button";
 import Panel from "@/components/ui/Panel";
@@ -22,6 +23,13 @@ type RequestPreview = {
   requester: { id: number; username: string; avatar_url?: string | null };
 };
 
+// matches PREVIEW_LIMIT on the API
+const PREVIEW_LIMIT = 5;
+
+function isSameActivity(a: ActivityPreview, b: ActivityPreview) {
+  return a.type === b.type && a.user.id === b.user.id && a.book.id === b.book.id;
+}
+
 type NavNotificationsProps = {
   token: string | null;
   meId: number;
@@ -29,10 +37,11 @@ type NavNotificationsProps = {
 
 export default function NavNotifications({ token, meId }: NavNotificationsProps) {
   const [open, setOpen] = useState(false);
-  const [notifCounts, setNotifCounts] = useState<{ requests: number; activity: number } | null>(null);
+  const [notifCounts, setNotifCounts] = useState<NotificationCounts | null>(null);
   const [activityItems, setActivityItems] = useState<ActivityPreview[]>([]);
   const [requestItems, setRequestItems] = useState<RequestPreview[]>([]);
   const notifRef = useRef<HTMLDivElement | null>(null);
+  const requestCountRef = useRef<number | null>(null);
 
   useEffect(() => {
     function onDocClick(e: MouseEvent) {
@@ -46,31 +55,45 @@ export default function NavNotifications({ token, meId }: NavNotificationsProps)
     return () => document.removeEventListener("mousedown", onDocClick);
   }, [open]);
 
-  useEffect(() => {
-    async function loadCounts() {
-      if (!token) return;
-      try {
-        const data = await apiGet<{
-          requests: number;
-          activity: number;
-        }>("/me/notifications", "browser", undefined, token);
-        setNotifCounts(data);
-        const preview = await apiGet<{
-          requests: RequestPreview[];
-          activity: ActivityPreview[];
-        }>("/me/notifications/preview", "browser", undefined, token);
-        setRequestItems(preview.requests);
-        setActivityItems(preview.activity);
-      } catch {
-        setNotifCounts(null);
-      }
+  async function loadPreview() {
+    if (!token) return;
+    try {
+      const preview = await apiGet<{
+        requests: RequestPreview[];
+        activity: ActivityPreview[];
+      }>("/me/notifications/preview", "browser", undefined, token);
+      setRequestItems(preview.requests);
+      setActivityItems(preview.activity);
+    } catch {
+      setNotifCounts(null);
     }
+  }
 
+  useEffect(() => {
     if (meId) {
-      void loadCounts();
+      void loadPreview();
     }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [meId, token]);
 
+  // counters and new feed items are pushed; only a new follow request refetches the preview
+  useNotificationEvents<ActivityPreview>(meId ? token : null, {
+    onCounts: (counts) => {
+      const previous = requestCountRef.current;
+      requestCountRef.current = counts.requests;
+      setNotifCounts(counts);
+      // everything was marked seen, possibly from another tab
+      if (counts.activity === 0) setActivityItems([]);
+      if (previous !== null && counts.requests > previous) void loadPreview();
+    },
+    onActivity: (item) => {
+      // a re-sent event (e.g. a changed status) replaces the older entry for it
+      setActivityItems((prev) =>
+        [item, ...prev.filter((a) => !isSameActivity(a, item))].slice(0, PREVIEW_LIMIT),
+      );
+    },
+  });
+
   return (
     <div ref={notifRef} className="relative">
       <Button
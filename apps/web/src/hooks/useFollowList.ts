@@ -1,7 +1,7 @@
 "use client";
 
-import { useEffect, useMemo, useState } from "react";
-import { apiGet } from "@/lib/api";
+import { useCallback, useEffect, useMemo, useState } from "react";
+import { apiGet, apiGetPage } from "@/lib/api";
 import { getToken } from "@/lib/auth";
 
 export type FollowRow = { id: number; username: string; avatar_url?: string | null };
@@ -17,6 +17,9 @@ export function useFollowList({ kind }: UseFollowListOptions) {
   const [backHref, setBackHref] = useState<string | null>(null);
   const [backLabel, setBackLabel] = useState<string | null>(null);
   const [ownerLabel, setOwnerLabel] = useState<string | null>(null);
+  const [endpoint, setEndpoint] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     let cancelled = false;
@@ -31,9 +34,13 @@ export function useFollowList({ kind }: UseFollowListOptions) {
         return;
       }
       try {
-        const endpoint = userId ? `/users/${userId}/${kind}` : `/me/${kind}`;
-        const data = await apiGet<FollowRow[]>(endpoint, "browser", undefined, token);
-        if (!cancelled) setItems(data);
+        const path = userId ? `/users/${userId}/${kind}` : `/me/${kind}`;
+        const page = await apiGetPage<FollowRow>(path, "browser", token);
+        if (!cancelled) {
+          setEndpoint(path);
+          setItems(page.items);
+          setNextCursor(page.nextCursor);
+        }
         if (userId) {
           try {
             const profile = await apiGet<{ username: string }>(`/users/${userId}`, "browser", undefined, token);
@@ -54,5 +61,32 @@ export function useFollowList({ kind }: UseFollowListOptions) {
     };
   }, [kind, token]);
 
-  return { items, status, backHref, backLabel, ownerLabel };
+  const loadMore = useCallback(async () => {
+    if (!endpoint || !nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await apiGetPage<FollowRow>(
+        `${endpoint}?after=${encodeURIComponent(nextCursor)}`,
+        "browser",
+        token
+      );
+      setItems((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (e: any) {
+      setStatus(e?.message ?? `Failed to load ${kind}`);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [endpoint, kind, loadingMore, nextCursor, token]);
+
+  return {
+    items,
+    status,
+    backHref,
+    backLabel,
+    ownerLabel,
+    hasMore: nextCursor !== null,
+    loadingMore,
+    loadMore,
+  };
 }
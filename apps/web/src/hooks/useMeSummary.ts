@@ -36,26 +36,16 @@ export function useMeSummary(token: string | null, options: UseMeSummaryOptions
         setMe(meData);
 
         try {
-          const followers = await apiGet<{ id: number; username: string }[]>(
-            "/me/followers",
+          const profile = await apiGet<{ followers_count: number; following_count: number }>(
+            `/users/${meData.id}`,
             "browser",
             undefined,
             token
           );
-          setFollowersCount(followers.length);
+          setFollowersCount(profile.followers_count);
+          setFollowingCount(profile.following_count);
         } catch {
           setFollowersCount(null);
-        }
-
-        try {
-          const following = await apiGet<{ id: number; username: string }[]>(
-            "/me/following",
-            "browser",
-            undefined,
-            token
-          );
-          setFollowingCount(following.length);
-        } catch {
           setFollowingCount(null);
         }
       } catch (e: any) {
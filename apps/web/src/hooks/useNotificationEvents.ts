@@ -0,0 +1,61 @@
+"use client";
+
+import { useEffect, useRef } from "react";
+import { ApiError, apiStream } from "@/lib/api";
+
+const RECONNECT_MS = 5000;
+
+export type NotificationCounts = {
+  requests: number;
+  activity: number;
+};
+
+type NotificationEventHandlers<A> = {
+  onCounts: (counts: NotificationCounts) => void;
+  onActivity: (item: A) => void;
+};
+
+/**
+ * Follows GET /me/events: unread counters on connect and on every change, plus
+ * each new feed item. Reconnects when the stream drops; stops on 401/403.
+ */
+export function useNotificationEvents<A>(token: string | null, handlers: NotificationEventHandlers<A>) {
+  const handlersRef = useRef(handlers);
+
+  useEffect(() => {
+    handlersRef.current = handlers;
+  });
+
+  useEffect(() => {
+    if (!token) return;
+    const controller = new AbortController();
+    let timer: ReturnType<typeof setTimeout> | undefined;
+
+    async function connect() {
+      try {
+        await apiStream(
+          "/me/events",
+          "browser",
+          ({ event, data }) => {
+            if (event === "notifications") handlersRef.current.onCounts(JSON.parse(data));
+            else if (event === "activity") handlersRef.current.onActivity(JSON.parse(data));
+          },
+          token,
+          controller.signal
+        );
+      } catch (e) {
+        if (e instanceof ApiError && (e.status === 401 || e.status === 403)) return;
+      }
+      if (!controller.signal.aborted) {
+        timer = setTimeout(() => void connect(), RECONNECT_MS);
+      }
+    }
+
+    void connect();
+
+    return () => {
+      controller.abort();
+      clearTimeout(timer);
+    };
+  }, [token]);
+}
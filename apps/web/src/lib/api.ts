@@ -63,6 +63,28 @@ export async function apiGet<T>(
   return (await res.json()) as T;
 }
 
+/**
+ * GET one page of a cursor-paginated list; pass `nextCursor` back as `after`.
+ */
+export async function apiGetPage<T>(
+  path: string,
+  mode: ApiMode,
+  token?: string | null
+): Promise<{ items: T[]; nextCursor: string | null }> {
+  const base = apiBase(mode);
+  const res = await fetch(`${base}${path}`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+    cache: "no-store",
+  });
+
+  if (!res.ok) {
+    const msg = await readError(res);
+    throw new ApiError(res.status, `GET ${path} failed: ${res.status}${msg ? ` ${msg}` : ""}`);
+  }
+
+  return { items: (await res.json()) as T[], nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
 export async function apiSend<T>(
   path: string,
   mode: ApiMode,
@@ -93,3 +115,56 @@ export async function apiSend<T>(
 
   return (await res.json()) as T;
 }
+
+export type ServerEvent = { event: string; data: string };
+
+/**
+ * Reads a server-sent events stream. Uses fetch rather than EventSource so the
+ * bearer header can be sent. Resolves when the server closes the stream.
+ */
+export async function apiStream(
+  path: string,
+  mode: ApiMode,
+  onEvent: (event: ServerEvent) => void,
+  token?: string | null,
+  signal?: AbortSignal
+): Promise<void> {
+  const base = apiBase(mode);
+  const res = await fetch(`${base}${path}`, {
+    headers: {
+      Accept: "text/event-stream",
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    cache: "no-store",
+    signal,
+  });
+
+  if (!res.ok || !res.body) {
+    const msg = await readError(res);
+    throw new ApiError(res.status, `GET ${path} failed: ${res.status}${msg ? ` ${msg}` : ""}`);
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) return;
+    buffer += value;
+
+    let end = buffer.indexOf("\n\n");
+    while (end !== -1) {
+      const frame = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      end = buffer.indexOf("\n\n");
+
+      // comment frames (": ping") carry no data and are skipped
+      let event = "message";
+      const data: string[] = [];
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+      }
+      if (data.length) onEvent({ event, data: data.join("\n") });
+    }
+  }
+}